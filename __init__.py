@@ -3,20 +3,60 @@ def init(
     log_name="Framer",
     hook_error=False,
     redirect_output=False,
+    modules=None,
+    worker=False,
 ):
 
     # python module import
     import sys
+    import time
     import types
     import functools
 
     # local module import
     from . import helper
+    from . import registry
+    from . import bus
+    from . import hooks
+    from . import offload
+    from . import scheduler
+    from . import metrics
+    from . import profiler
+    from . import memory
+    from . import reload
+
+    # spawned offload workers import the app main module again, an init
+    # outside of a main guard would run the whole app in every worker
+    mp = sys.modules.get("multiprocessing")
+    if mp is not None and getattr(mp.current_process(), "_inheriting", False):
+        raise RuntimeError(
+            "Framer.init() called while an offload worker imports the main module,"
+            ' please call it under `if __name__ == "__main__":`.'
+        )
+
+    # init phase timings
+    init_started = time.perf_counter()
+    phase_started = init_started
+    init_phases = metrics.registry.gauge(
+        "framer_init_phase_seconds", "Duration of Framer init phases", ("phase",)
+    )
+    module_seconds = metrics.registry.gauge(
+        "framer_module_init_seconds",
+        "Import and construct time per module",
+        ("module",),
+    )
+
+    def end_phase(phase):
+        nonlocal phase_started
+        now = time.perf_counter()
+        init_phases.labels(phase).set(now - phase_started)
+        phase_started = now
 
     # create framer
-    framer = types.SimpleNamespace()
-    framer.helper = helper
-    framer.link_to = link_to
+    framer = registry.Registry(helper, link_to)
+    framer.bus = bus.Bus()
+    framer.hooks = hooks.Hooks()
+    framer.metrics = metrics.registry
 
     # temporary logger for init
     init_logger = functools.partial(framer.helper.logger, "Init")
@@ -44,6 +84,8 @@ def init(
             )
         )
 
+    end_phase("env")
+
     # check framerpkg and framer_modules
     init_logger("Checking modules...")
 
@@ -54,10 +96,19 @@ def init(
 
     if framer.helper.no_framer_modules():
         framer.helper.clean_dir("./framer_modules")
-    sys.path.append("./framer_modules")
+    framer.helper.mount_modules()
 
     # check package config
     framerpkg = framer.helper.load_framerpkg()
+    framer.offload = offload.Offload(framerpkg.get("offload"))
+    framer.scheduler = scheduler.Scheduler(framerpkg.get("scheduler"))
+
+    # process services only in the main init, not in workers and subsets
+    main_init = modules is None and not worker
+    if main_init:
+        framer.metrics.start(framerpkg.get("metrics"), framer.scheduler)
+    framer.profiler = profiler.from_config(framerpkg.get("profiler"), main_init)
+    framer.memory = memory.from_config(framerpkg.get("memory"), main_init)
 
     installed_modules = helper.load_installed_modules()
     init_logger("Installed Modules: \n- {}".format("\n- ".join(installed_modules)))
@@ -70,7 +121,7 @@ def init(
     installed_modules_info = {}
     sorted_installed_modules = []
     for m in installed_modules:
-        moduleInfo = __import__(m).moduleInfo
+        moduleInfo = framer.helper.load_module_info(m)
         installed_modules_info[m] = moduleInfo
 
         # if is hooker
@@ -78,7 +129,28 @@ def init(
             sorted_installed_modules.insert(0, m)
         else:
             sorted_installed_modules.append(m)
-    installed_modules = sorted_installed_modules
+
+    # dependencies before dependents
+    installed_requires = {
+        m: framer.helper.load_require(m)["dependencies"]
+        for m in sorted_installed_modules
+    }
+    installed_modules = registry.dependency_order(
+        sorted_installed_modules, installed_requires
+    )
+
+    # subset of modules, with their dependencies and hookers
+    if modules is not None:
+        selected = set()
+        pending = list(modules) + [
+            m for m in installed_modules if installed_modules_info[m].get("hooker")
+        ]
+        while len(pending) > 0:
+            m = pending.pop()
+            if m not in selected and m in installed_requires:
+                selected.add(m)
+                pending += installed_requires[m]
+        installed_modules = [m for m in installed_modules if m in selected]
 
     # print installed modules info
     init_logger(
@@ -94,16 +166,24 @@ def init(
         )
     )
 
+    end_phase("modules")
+
     # import installed modules
+    hook = framer.hooks
+    vetoed_modules = set()
     for m in installed_modules:
         if m in disabled_modules:
             continue
 
-        # load require
-        require = framer.helper.load_require(m)
+        # vetoed dependency skips dependents too
+        vetoed = [dep for dep in installed_requires[m] if dep in vetoed_modules]
+        if len(vetoed) > 0:
+            init_logger(f"Skip module {m}, require vetoed {', '.join(vetoed)}")
+            vetoed_modules.add(m)
+            continue
 
         # check dependencies
-        for dep in require["dependencies"]:
+        for dep in installed_requires[m]:
 
             # if dependency not installed
             if dep not in installed_modules:
@@ -113,18 +193,30 @@ def init(
             if dep in disabled_modules:
                 raise ImportError(f"Module {m} require {dep}, but {dep} disabled.")
 
-        # import module
-        init_logger(f"Importing module {m}...")
-        m_obj = __import__(m)
-
-        # import module main
-        if not hasattr(m_obj, "moduleMain"):
-            raise ImportError(f"Module {m} has no Entry Point: moduleMain")
-        module = m_obj.moduleMain(framer, functools.partial(framer.helper.logger, m))
+        # import module, hookers may veto, wrap or replace
+        module_started = time.perf_counter()
+        try:
+            module = load_module(framer, m, installed_modules_info[m], log_name)
+        except hook.Veto as e:
+            init_logger(f"Module {m} vetoed: {e}")
+            vetoed_modules.add(m)
+            continue
 
         # add module to framer
         setattr(module, "moduleInfo", installed_modules_info[m])
-        setattr(framer, m, module)
+        framer.register(m, module, installed_modules_info[m])
+        module_seconds.labels(m).set(time.perf_counter() - module_started)
+
+    end_phase("import")
+
+    # module counts
+    module_counts = metrics.registry.gauge(
+        "framer_modules", "Framer modules by state", ("state",)
+    )
+    module_counts.labels("installed").set(len(installed_modules))
+    module_counts.labels("disabled").set(len(disabled_modules))
+    module_counts.labels("vetoed").set(len(vetoed_modules))
+    module_counts.labels("loaded").set(len(framer))
 
     # if disable error hook
     if not hook_error:
@@ -133,10 +225,92 @@ def init(
     # create main logger
     framer.logger = functools.partial(framer.helper.logger, log_name)
 
+    # hot reload, not for subset inits of workers and subinterpreters
+    framer.reload = reload.from_config(
+        framer, framerpkg.get("reload"), log_name, installed_requires
+    )
+    if main_init and framer.reload.config["enabled"]:
+        framer.reload.start(framer.scheduler)
+
     # return framer
+    init_phases.labels("total").set(time.perf_counter() - init_started)
     init_logger("Framer Init Complete!")
     if framer.link_to is not None:
-        for attr in dir(framer):
-            if not attr.startswith("__"):
-                sys.modules[framer.link_to].__dict__[attr] = getattr(framer, attr)
+        framer.link(framer.link_to)
+    if hook.init_complete is not None:
+        hook.init_complete(framer)
+    hook.watch_shutdown(framer)
     return framer
+
+
+# stop what init started, for processes that init again
+def shutdown(framer):
+    import atexit
+
+    from . import isolate
+
+    # modules clean up while the services still run
+    framer.hooks.fire_shutdown(framer)
+    atexit.unregister(framer.hooks.fire_shutdown)
+
+    framer.reload.stop()
+    framer.scheduler.shutdown()
+    framer.offload.shutdown()
+    framer.profiler.stop()
+    framer.memory.stop()
+    framer.metrics.close()
+    framer.bus.close()
+    for m in framer.module_names():
+        module = getattr(framer, m)
+        if isinstance(module, isolate.ModuleProxy):
+            module._interpreter.close()
+
+
+# import and construct one module, hookers may veto, wrap or replace
+def load_module(framer, m, module_info, log_name="Framer"):
+    import functools
+
+    from . import isolate
+
+    hook = framer.hooks
+    init_logger = functools.partial(framer.helper.logger, "Init")
+
+    # isolated modules get their own subinterpreter, or load in-process
+    def load_isolated():
+        if not isolate.available():
+            init_logger(f"Subinterpreters unavailable, loading {m} in-process")
+            return None
+        init_logger(f"Importing module {m} into subinterpreter...")
+        try:
+            return isolate.load(m, log_name)
+        except isolate.IsolateError as e:
+            init_logger(f"Isolating {m} failed, loading in-process: {e}")
+            return None
+
+    if hook.before_import is not None:
+        hook.before_import(m)
+
+    # subinterpreters load their own module in-process
+    isolated = module_info.get("isolated") == True
+    isolated = isolated and not isolate.isolate_state["inside"]
+    module = load_isolated() if isolated else None
+    if module is None:
+        init_logger(f"Importing module {m}...")
+        m_obj = __import__(m)
+        if hook.after_import is not None:
+            m_obj = hook.after_import(m, m_obj)
+
+        # import module main
+        if not hasattr(m_obj, "moduleMain"):
+            raise ImportError(f"Module {m} has no Entry Point: moduleMain")
+        module_main = m_obj.moduleMain
+        if hook.before_construct is not None:
+            module_main = hook.before_construct(m, module_main)
+        module = module_main(framer, functools.partial(framer.helper.logger, m))
+
+        # isolated modules keep the proxy interface in-process
+        if isolated:
+            module = isolate.wrap(m, module)
+    if hook.after_construct is not None:
+        module = hook.after_construct(m, module)
+    return module
@@ -0,0 +1,1158 @@
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import inspect
+import tempfile
+import argparse
+import threading
+import contextlib
+import subprocess
+
+from . import bus
+from . import helper
+from . import search
+from . import store
+from . import metrics
+from . import profiler
+from . import memory
+from . import mirror
+from . import scheduler
+
+
+# synthetic data
+def synthetic_words(count: int, seed: int = 0):
+    rnd = random.Random(seed)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return ["".join(rnd.choices(letters, k=rnd.randint(3, 8))) for _ in range(count)]
+
+
+def synthetic_origin_cache(size: int, origins: int = 4, seed: int = 0):
+    rnd = random.Random(seed)
+    words = synthetic_words(max(size // 10, 50), seed)
+    cache = {}
+    for i in range(size):
+        name = "{}_{}{}".format(rnd.choice(words), rnd.choice(words), i)
+        origin = f"origin{i % origins}"
+        cache[f"{name}@{origin}"] = {
+            "author": rnd.choice(words),
+            "description": " ".join(rnd.sample(words, 6)),
+            "hooker": False,
+            "download": f"http://127.0.0.1/{origin}/{name}/file.zip",
+            "require": {
+                "dependencies": rnd.sample(words, rnd.randint(0, 3)),
+                "option_dependencies": [],
+                "pip_dependencies": [],
+            },
+        }
+    return cache
+
+
+def make_project(
+    root: str, count: int, lines: int = 200, depth: int = 0, spread: int = 1
+):
+    os.makedirs(f"{root}/framer_modules", exist_ok=True)
+    modules = [f"mod{i}" for i in range(count)]
+    for i, name in enumerate(modules):
+
+        # chain every module on the previous ones up to depth
+        deps = modules[max(i - depth, 0) : i] if depth > 0 else []
+
+        # import cost grows with module size, spread varies it
+        body = "\n".join(
+            f"def func{j}(x):\n    return [x * {j} for _ in range(3)]"
+            for j in range(lines * (1 + i % spread) // 2)
+        )
+        os.makedirs(f"{root}/framer_modules/{name}")
+        helper.write_file(
+            f"{root}/framer_modules/{name}/__init__.py",
+            'moduleInfo = {"author": "bench", "description": "synthetic module"}\n'
+            "from .module import moduleMain\n",
+        )
+        helper.write_file(
+            f"{root}/framer_modules/{name}/module.py",
+            f"{body}\n\nclass moduleMain:\n"
+            "    def __init__(self, framer, logger):\n"
+            "        self.framer = framer\n",
+        )
+        helper.write_file(
+            f"{root}/framer_modules/{name}/require.json",
+            helper.json_dump(
+                {
+                    "dependencies": deps,
+                    "option_dependencies": [],
+                    "pip_dependencies": [],
+                }
+            ),
+        )
+    helper.write_file(
+        f"{root}/framerpkg.json",
+        helper.json_dump({"modules": modules, "disable": [], "origins": []}),
+    )
+    return modules
+
+
+def framer_subprocess(root: str, code: str, capture: bool = False):
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+    env = {**os.environ, "PYTHONPATH": os.path.dirname(package_dir)}
+    script = f"import {os.path.basename(package_dir)} as Framer\n{code}"
+    start = time.perf_counter()
+    process = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=root,
+        env=env,
+        check=True,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE if capture else subprocess.DEVNULL,
+        text=True,
+    )
+    elapsed = time.perf_counter() - start
+    return (elapsed, process.stdout) if capture else elapsed
+
+
+def framer_command(root: str, args: list, importtime: bool = False, module: str = None):
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+    env = {**os.environ, "PYTHONPATH": os.path.dirname(package_dir)}
+    flags = ["-X", "importtime"] if importtime else []
+    module = module or os.path.basename(package_dir)
+    start = time.perf_counter()
+    process = subprocess.run(
+        [sys.executable, *flags, "-m", module, *args],
+        cwd=root,
+        env=env,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    return time.perf_counter() - start, process.stderr
+
+
+def parse_importtime(stderr: str):
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, _, name = line[len("import time:") :].split("|")
+        if self_us.strip().isdigit():
+            modules[name.strip()] = int(self_us)
+    return modules
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+@contextlib.contextmanager
+def serve_directory(path: str, served: list = None):
+    import functools
+    import http.server
+
+    # quiet local origin on a free port, served files are recorded with size
+    class Handler(http.server.SimpleHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            super().do_GET()
+            file_path = self.translate_path(self.path)
+            if served is not None and os.path.isfile(file_path):
+                served.append((self.path, os.path.getsize(file_path)))
+
+    server = http.server.ThreadingHTTPServer(
+        ("127.0.0.1", 0), functools.partial(Handler, directory=path)
+    )
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@contextlib.contextmanager
+def serve_mirror(path: str, latency: float, rate: float, fail: str = None):
+    import http.server
+
+    # range capable origin with artificial latency and per connection rate
+    # fail "all" rejects every request, "fetch" only answers probes
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            time.sleep(latency)
+            file_path = os.path.join(path, self.path.lstrip("/"))
+            byte_range = self.headers.get("Range")
+            probe = byte_range == "bytes=0-0"
+            if fail == "all" or (fail == "fetch" and not probe):
+                self.send_error(503)
+                return
+            if not os.path.isfile(file_path):
+                self.send_error(404)
+                return
+            size = os.path.getsize(file_path)
+            start, end = 0, size - 1
+            if byte_range is not None:
+                start, end = map(int, byte_range.split("=", 1)[1].split("-"))
+                self.send_response(206)
+                self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+            else:
+                self.send_response(200)
+            self.send_header("Content-Length", str(end - start + 1))
+            self.end_headers()
+            with open(file_path, "rb") as f:
+                f.seek(start)
+                left, chunk_size = end - start + 1, 64 * 1024
+                while left > 0:
+                    chunk = f.read(min(chunk_size, left))
+                    self.wfile.write(chunk)
+                    left -= len(chunk)
+                    time.sleep(len(chunk) / rate)
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def in_project(root: str, func, *args):
+    cwd = os.getcwd()
+    os.chdir(root)
+    try:
+        return func(*args)
+    finally:
+        os.chdir(cwd)
+
+
+# benchmarks
+def bench_store(sizes=(1000, 10000, 100000), lookups: int = 1000):
+    results = []
+    for size in sizes:
+        cache = synthetic_origin_cache(size)
+        rnd = random.Random(size)
+        keys = rnd.sample(list(cache.keys()), min(lookups, size))
+        queries = [k.split("@")[0].split("_")[0] for k in keys[:20]]
+
+        with tempfile.TemporaryDirectory() as tmp:
+            json_path = f"{tmp}/origin-cache.json"
+            db_path = f"{tmp}/origin-cache.db"
+
+            # json baseline, parse whole file per command
+            helper.write_file(json_path, helper.json_dump(cache))
+            json_load, loaded = timed(
+                lambda: helper.json_load(helper.read_file(json_path))
+            )
+            json_lookup, _ = timed(lambda: [loaded[k] for k in keys])
+
+            # sqlite store
+            build, _ = timed(lambda: store.OriginStore(db_path).import_cache(cache))
+            db_open, db = timed(store.OriginStore, db_path)
+            db_lookup, _ = timed(lambda: [db.get(k) for k in keys])
+            db_search, _ = timed(lambda: [search.search(db, q) for q in queries])
+            db.close()
+
+        results.append(
+            {
+                "modules": size,
+                "json_load_s": json_load,
+                "json_lookup_s": json_lookup,
+                "store_build_s": build,
+                "store_open_s": db_open,
+                "store_lookup_s": db_lookup,
+                "store_search_avg_s": db_search / len(queries),
+                "lookups": len(keys),
+            }
+        )
+    return results
+
+
+def bench_cold_start(sizes=(10, 100, 1000), repeat: int = 3):
+    results = []
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as root:
+            modules = make_project(root, size)
+            init = "Framer.init()"
+
+            # no bytecode, every init compiles
+            cold = []
+            for _ in range(repeat):
+                for m in modules:
+                    shutil.rmtree(f"{root}/framer_modules/{m}/__pycache__", True)
+                cold.append(framer_subprocess(root, init))
+
+            # precompiled, as after install
+            compile_time, _ = in_project(
+                root, timed, helper.compile_modules, modules, True
+            )
+            warm = [framer_subprocess(root, init) for _ in range(repeat)]
+
+        results.append(
+            {
+                "modules": size,
+                "init_no_bytecode_s": min(cold),
+                "precompile_s": compile_time,
+                "init_precompiled_s": min(warm),
+            }
+        )
+    return results
+
+
+# common commands and heavy modules they must not import
+startup_heavy = (
+    "urllib.request",
+    "subprocess",
+    "zipfile",
+    "sqlite3",
+    "concurrent.futures",
+    "random",
+)
+startup_commands = {
+    "-v": startup_heavy,
+    "env --list": startup_heavy,
+    "module --list": startup_heavy,
+    "origin --list": startup_heavy,
+}
+
+
+def bench_startup(budget_ms: float = 50, repeat: int = 7):
+    import statistics
+
+    results = []
+    with tempfile.TemporaryDirectory() as root:
+        make_project(root, 10)
+        helper.write_file(f"{root}/env.json", "{}")
+
+        # interpreter running an empty -m module, everything else is the cli's
+        helper.write_file(f"{root}/startup_baseline.py", "")
+        baseline = set(
+            parse_importtime(framer_command(root, [], True, "startup_baseline")[1])
+        )
+        for command, forbidden in startup_commands.items():
+            walls, imports = [], []
+            for _ in range(repeat):
+                wall, stderr = framer_command(root, command.split(), True)
+                modules = parse_importtime(stderr)
+                walls.append(wall)
+                imports.append(
+                    sum(t for m, t in modules.items() if m not in baseline) / 1000
+                )
+            heavy = [m for m in forbidden if m in modules]
+            import_ms = statistics.median(imports)
+            results.append(
+                {
+                    "command": command,
+                    "import_ms": import_ms,
+                    "wall_ms": statistics.median(walls) * 1000,
+                    "budget_ms": budget_ms,
+                    "imports": sorted(m for m in modules if m not in baseline),
+                    "heavy_imports": heavy,
+                    "ok": import_ms <= budget_ms and len(heavy) == 0,
+                }
+            )
+    return results
+
+
+def bench_module_cli(import_delay: float = 0.5, repeat: int = 5):
+    with tempfile.TemporaryDirectory() as root:
+        make_project(root, 1)
+
+        # module with slow import state and a CLI entry
+        helper.write_file(
+            f"{root}/framer_modules/mod0/__init__.py",
+            f"import time\ntime.sleep({import_delay})\n"
+            'moduleInfo = {"author": "bench", "description": "synthetic module"}\n'
+            "from .module import moduleMain\n"
+            "def cliMain(args):\n    print(args)\n",
+        )
+        args = ["-m", "mod0", "a", "b"]
+        direct = [framer_command(root, args)[0] for _ in range(repeat)]
+
+        # resident daemon
+        framer_command(root, ["--daemon", "start"])
+        try:
+            daemon = [framer_command(root, args)[0] for _ in range(repeat)]
+        finally:
+            framer_command(root, ["--daemon", "stop"])
+
+    return [
+        {
+            "import_delay_s": import_delay,
+            "direct_s": min(direct),
+            "daemon_s": min(daemon),
+        }
+    ]
+
+
+def bench_init(sizes=(10, 100, 1000, 5000), depths=(0, 8), repeat: int = 3):
+    results = []
+    code = (
+        "import resource\n"
+        "Framer.init()\n"
+        "print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)"
+    )
+    for size in sizes:
+        for depth in depths:
+            with tempfile.TemporaryDirectory() as root:
+                modules = make_project(root, size, lines=100, depth=depth, spread=4)
+                in_project(root, helper.compile_modules, modules, True)
+
+                # best wall time, rss of that run
+                runs = [framer_subprocess(root, code, True) for _ in range(repeat)]
+                wall, stdout = min(runs)
+                rss_kb = int(stdout.strip().splitlines()[-1])
+
+            results.append(
+                {
+                    "modules": size,
+                    "depth": depth,
+                    "init_s": wall,
+                    "rss_mb": rss_kb / 1024,
+                }
+            )
+    return results
+
+
+def bench_origin(sizes=(10, 100, 1000), installs: int = 10, queries: int = 10):
+    results = []
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            source, consumer = f"{tmp}/source", f"{tmp}/consumer"
+
+            # origin from a synthetic project
+            make_project(source, size, lines=50, depth=2)
+            helper.write_file(
+                f"{source}/origin-maker.json",
+                helper.json_dump({"name": "bench", "base": "http://127.0.0.1"}),
+            )
+            make_full, _ = framer_command(source, ["origin", "--make"])
+            make_noop, _ = framer_command(source, ["origin", "--make"])
+
+            # consumer project against the served origin
+            with serve_directory(f"{source}/maker_release") as url:
+                os.makedirs(consumer)
+                framer_command(consumer, ["--init"])
+                framer_command(consumer, ["origin", "--add", url])
+                sync, _ = framer_command(consumer, ["origin", "--sync"])
+                sync_noop, _ = framer_command(consumer, ["origin", "--sync"])
+
+                # search, mixed exact and fuzzy keywords
+                rnd = random.Random(size)
+                keywords = [f"mod{rnd.randrange(size)}" for _ in range(queries)]
+                keywords = [k if i % 2 else k[1:] for i, k in enumerate(keywords)]
+                search_s = sum(
+                    framer_command(consumer, ["module", "--search", k])[0]
+                    for k in keywords
+                )
+
+                # installs pull their dependency chains
+                targets = rnd.sample(range(size), min(installs, size))
+                install_s = sum(
+                    framer_command(consumer, ["module", "-i", f"mod{i}"])[0]
+                    for i in targets
+                )
+                installed = len(helper.list_tree(f"{consumer}/framer_modules"))
+                sync_back_noop, _ = framer_command(consumer, ["module", "--sync-back"])
+                shutil.rmtree(f"{consumer}/framer_modules")
+                sync_back_full, _ = framer_command(consumer, ["module", "--sync-back"])
+
+        results.append(
+            {
+                "modules": size,
+                "make_s": make_full,
+                "make_noop_s": make_noop,
+                "sync_s": sync,
+                "sync_noop_s": sync_noop,
+                "search_avg_s": search_s / len(keywords),
+                "install_avg_s": install_s / len(targets),
+                "installed_files": installed,
+                "sync_back_noop_s": sync_back_noop,
+                "sync_back_full_s": sync_back_full,
+            }
+        )
+    return results
+
+
+def bench_delta(sizes=(200, 2000)):
+    results = []
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            source, consumer = f"{tmp}/source", f"{tmp}/consumer"
+            module_dir = f"{source}/framer_modules/mod0"
+            make_project(source, 1)
+
+            # data that does not compress away, size lines of it
+            rnd = random.Random(size)
+            helper.write_file(
+                f"{module_dir}/data.py",
+                "".join(f"DATA{i} = {rnd.getrandbits(192):#x}\n" for i in range(size)),
+            )
+            helper.write_file(
+                f"{source}/origin-maker.json",
+                helper.json_dump({"name": "bench", "base": "http://127.0.0.1"}),
+            )
+            framer_command(source, ["origin", "--make"])
+
+            served = []
+            with serve_directory(f"{source}/maker_release", served) as url:
+                os.makedirs(consumer)
+                framer_command(consumer, ["--init"])
+                framer_command(consumer, ["origin", "--add", url])
+                framer_command(consumer, ["origin", "--sync"])
+                framer_command(consumer, ["module", "-i", "mod0"])
+
+                # small change in a large module, --overwrite then --sync-back
+                steps = []
+                for i, args in enumerate(
+                    (["--overwrite", "-i", "mod0"], ["--overwrite", "--sync-back"])
+                ):
+                    with open(f"{module_dir}/__init__.py", "a") as f:
+                        f.write(f"# change {i}\n")
+                    framer_command(source, ["origin", "--make"])
+                    framer_command(consumer, ["origin", "--sync"])
+                    full = os.path.getsize(f"{source}/maker_release/mod0/file.zip")
+                    served.clear()
+                    update_s, _ = framer_command(consumer, ["module", *args])
+                    fetched = [(p, n) for p, n in served if "/mod0/" in p]
+                    steps.append(
+                        {
+                            "command": " ".join(args),
+                            "update_s": update_s,
+                            "full_bytes": full,
+                            "fetched_bytes": sum(n for _, n in fetched),
+                            "by_delta": any("/delta/" in p for p, _ in fetched)
+                            and not any(p.endswith("/file.zip") for p, _ in fetched),
+                            "applied": helper.hash_tree(module_dir)
+                            == helper.hash_tree(f"{consumer}/framer_modules/mod0"),
+                        }
+                    )
+
+        for step in steps:
+            results.append(
+                {
+                    "lines": size,
+                    **step,
+                    "ok": step["applied"]
+                    and step["by_delta"]
+                    and step["fetched_bytes"] < step["full_bytes"],
+                }
+            )
+    return results
+
+
+def bench_logger(sizes=(10000,)):
+    results = []
+    for count in sizes:
+        single = "module loaded"
+        multi = "\n".join(f"- mod{i} => value" for i in range(8))
+        sink = []
+        custom = helper.CustomStdout(sink.append)
+
+        with open(os.devnull, "w") as devnull:
+            with contextlib.redirect_stdout(devnull):
+                single_s, _ = timed(
+                    lambda: [helper.logger("Bench", single, 80) for _ in range(count)]
+                )
+                multi_s, _ = timed(
+                    lambda: [helper.logger("Bench", multi, 80) for _ in range(count)]
+                )
+            with contextlib.redirect_stdout(custom):
+                custom_s, _ = timed(
+                    lambda: [helper.logger("Bench", single, 80) for _ in range(count)]
+                )
+        print_s, _ = timed(lambda: [print(single, file=custom) for _ in range(count)])
+
+        results.append(
+            {
+                "calls": count,
+                "logger_single_per_s": count / single_s,
+                "logger_multi_per_s": count / multi_s,
+                "logger_custom_stdout_per_s": count / custom_s,
+                "custom_stdout_print_per_s": count / print_s,
+            }
+        )
+    return results
+
+
+def bench_bus(sizes=(200000,)):
+    import asyncio
+
+    def handler(topic, payload):
+        pass
+
+    def batch_handler(topic, payloads):
+        for payload in payloads:
+            handler(topic, payload)
+
+    def run(count, subscribe, publish):
+        event_bus = bus.Bus()
+        subscriptions = subscribe(event_bus)
+
+        # queued subscribers are drained before the clock stops
+        start = time.perf_counter()
+        publish(event_bus, count)
+        for subscription in subscriptions:
+            subscription.close()
+            if hasattr(subscription, "worker"):
+                subscription.worker.join()
+        return count / (time.perf_counter() - start)
+
+    def publish_each(event_bus, count):
+        for i in range(count):
+            event_bus.publish("bench.event", i)
+
+    def publish_batches(event_bus, count):
+        batch = list(range(100))
+        for _ in range(count // 100):
+            event_bus.publish_many("bench.event", batch)
+
+    async def publish_async(count):
+        received = []
+
+        async def async_handler(topic, payload):
+            received.append(payload)
+
+        event_bus = bus.Bus()
+        event_bus.subscribe("bench.*", async_handler, queue_size=4096, policy="block")
+        start = time.perf_counter()
+        for i in range(count):
+            event_bus.publish("bench.event", i)
+            if i % 1024 == 0:
+                await asyncio.sleep(0)
+        while len(received) < count:
+            await asyncio.sleep(0)
+        return count / (time.perf_counter() - start)
+
+    results = []
+    for count in sizes:
+        results.append(
+            {
+                "events": count,
+                "inline_exact_per_s": run(
+                    count,
+                    lambda b: [b.subscribe("bench.event", handler)],
+                    publish_each,
+                ),
+                "inline_4_wildcard_per_s": run(
+                    count,
+                    lambda b: [
+                        b.subscribe(p, handler)
+                        for p in ("bench.event", "bench.*", "bench.#", "#")
+                    ],
+                    publish_each,
+                ),
+                "queued_per_s": run(
+                    count,
+                    lambda b: [b.subscribe("bench.*", handler, queue_size=4096)],
+                    publish_each,
+                ),
+                "queued_batch_per_s": run(
+                    count,
+                    lambda b: [
+                        b.subscribe(
+                            "bench.*", batch_handler, queue_size=4096, batch=True
+                        )
+                    ],
+                    publish_each,
+                ),
+                "publish_many_per_s": run(
+                    count,
+                    lambda b: [b.subscribe("bench.*", batch_handler, batch=True)],
+                    publish_batches,
+                ),
+                "async_per_s": asyncio.run(publish_async(count)),
+            }
+        )
+    return results
+
+
+def bench_offload(sizes=(1, 50, 200), calls: int = 50):
+    results = []
+    code = (
+        "import json, time, pickle\n"
+        "framer = Framer.init()\n"
+        "import mod0\n"
+        "pool = framer.offload\n"
+        "list(pool.map(mod0.measure, [b''] * 4))\n"
+        "start = time.perf_counter()\n"
+        f"for _ in range({calls}):\n"
+        "    pool(mod0.measure, b'').result()\n"
+        f"call_s = (time.perf_counter() - start) / {calls}\n"
+        "start = time.perf_counter()\n"
+        f"list(pool.map(mod0.measure, [b''] * {calls * 20}, chunksize=50))\n"
+        f"map_per_s = {calls * 20} / (time.perf_counter() - start)\n"
+        "data = bytearray(int(SIZE_MB * 1024 * 1024))\n"
+        "def round_trip(payload, threshold):\n"
+        "    Framer.offload.SHM_THRESHOLD = threshold\n"
+        "    start = time.perf_counter()\n"
+        "    pool(mod0.measure, payload).result()\n"
+        "    return time.perf_counter() - start\n"
+        "print(json.dumps({\n"
+        "    'call_ms': call_s * 1000,\n"
+        "    'map_per_s': map_per_s,\n"
+        "    'pipe_s': round_trip(data, 1 << 62),\n"
+        "    'shm_copy_s': round_trip(data, 64 * 1024),\n"
+        "    'shm_view_s': round_trip(pickle.PickleBuffer(data), 64 * 1024),\n"
+        "}))\n"
+        "pool.shutdown()\n"
+    )
+    with tempfile.TemporaryDirectory() as root:
+        make_project(root, 1)
+        helper.write_file(
+            f"{root}/framer_modules/mod0/__init__.py",
+            'moduleInfo = {"author": "bench", "description": "synthetic module"}\n'
+            "from .module import moduleMain\n"
+            "def measure(data):\n    return len(data)\n",
+        )
+        framerpkg = helper.json_load(helper.read_file(f"{root}/framerpkg.json"))
+        framerpkg["offload"] = {"workers": 2, "modules": ["mod0"]}
+        helper.write_file(f"{root}/framerpkg.json", helper.json_dump(framerpkg))
+
+        for size in sizes:
+            _, stdout = framer_subprocess(
+                root, code.replace("SIZE_MB", str(size)), True
+            )
+            results.append(
+                {"buffer_mb": size, **helper.json_load(stdout.strip().splitlines()[-1])}
+            )
+    return results
+
+
+def bench_isolate(sizes=(1, 2, 4), work: int = 2000000):
+    results = []
+    code = (
+        "import json, time, threading\n"
+        "framer = Framer.init()\n"
+        "def run(count, prefix):\n"
+        "    threads = [\n"
+        "        threading.Thread(\n"
+        "            target=getattr(framer, f'{prefix}{i}').burn,\n"
+        f"            args=({work},),\n"
+        "        )\n"
+        "        for i in range(count)\n"
+        "    ]\n"
+        "    start = time.perf_counter()\n"
+        "    [thread.start() for thread in threads]\n"
+        "    [thread.join() for thread in threads]\n"
+        "    return time.perf_counter() - start\n"
+        "print(json.dumps({\n"
+        "    'subinterpreters': Framer.isolate.available(),\n"
+        "    'in_process_s': run(COUNT, 'local'),\n"
+        "    'isolated_s': run(COUNT, 'mod'),\n"
+        "}))\n"
+    )
+    for count in sizes:
+        with tempfile.TemporaryDirectory() as root:
+            modules = make_project(root, count)
+
+            # cpu-bound module, isolated and in-process copies
+            for name in modules:
+                for isolated, target in ((True, name), (False, f"local{name[3:]}")):
+                    os.makedirs(f"{root}/framer_modules/{target}", exist_ok=True)
+                    helper.write_file(
+                        f"{root}/framer_modules/{target}/require.json",
+                        helper.json_dump(
+                            {
+                                "dependencies": [],
+                                "option_dependencies": [],
+                                "pip_dependencies": [],
+                            }
+                        ),
+                    )
+                    helper.write_file(
+                        f"{root}/framer_modules/{target}/__init__.py",
+                        "moduleInfo = {"
+                        f'"author": "bench", "description": "cpu", "isolated": {isolated}'
+                        "}\n"
+                        "class moduleMain:\n"
+                        "    def __init__(self, framer, logger):\n"
+                        "        pass\n"
+                        "    def burn(self, n):\n"
+                        "        total = 0\n"
+                        "        for i in range(n):\n"
+                        "            total += i\n"
+                        "        return total\n",
+                    )
+            modules += [f"local{name[3:]}" for name in modules]
+            helper.write_file(
+                f"{root}/framerpkg.json",
+                helper.json_dump({"modules": modules, "disable": [], "origins": []}),
+            )
+
+            # one concurrent call per module
+            _, stdout = framer_subprocess(root, code.replace("COUNT", str(count)), True)
+            result = helper.json_load(stdout.strip().splitlines()[-1])
+            results.append(
+                {
+                    "modules": count,
+                    "cpus": os.cpu_count(),
+                    **result,
+                    "speedup": result["in_process_s"] / result["isolated_s"],
+                }
+            )
+    return results
+
+
+def bench_scheduler(sizes=(100, 1000, 10000), duration: float = 2.0):
+    results = []
+    for count in sizes:
+        jobs = scheduler.Scheduler()
+        threads = threading.active_count()
+
+        # many small periodic jobs share one timer and a bounded pool
+        for i in range(count):
+            jobs.every(0.1, int, name=f"job{i}", jitter=0.05, delay=i / count * 0.1)
+        time.sleep(duration)
+        stats = jobs.stats()
+        threads = threading.active_count() - threads
+        jobs.shutdown()
+
+        runs = sum(s["runs"] for s in stats.values())
+        results.append(
+            {
+                "jobs": count,
+                "threads": threads,
+                "runs_per_s": runs / duration,
+                "expected_per_s": count / 0.1,
+                "lag_avg_ms": sum(s["lag_avg_s"] for s in stats.values())
+                / count
+                * 1000,
+                "lag_max_ms": max(s["lag_max_s"] for s in stats.values()) * 1000,
+                "skipped": sum(s["skipped"] for s in stats.values()),
+            }
+        )
+    return results
+
+
+def bench_metrics(sizes=(1000000,), threads: tuple = (1, 4)):
+    results = []
+    lock = threading.Lock()
+    locked = [0]
+
+    def locked_inc():
+        with lock:
+            locked[0] += 1
+
+    for count in sizes:
+        for thread_count in threads:
+            registry = metrics.Metrics()
+            counter = registry.counter("bench_total")
+            labeled = registry.counter("bench_labeled_total", labels=("module",))
+            histogram = registry.histogram("bench_seconds")
+            operations = {
+                "counter": counter.inc,
+                "counter_labeled": lambda: labeled.labels("bench").inc(),
+                "histogram": lambda: histogram.observe(0.02),
+                "locked_baseline": locked_inc,
+            }
+            per_thread = count // thread_count
+            result = {"operations": per_thread * thread_count, "threads": thread_count}
+            for name, operation in operations.items():
+
+                # ns per operation across all threads
+                def run():
+                    for _ in range(per_thread):
+                        operation()
+
+                workers = [threading.Thread(target=run) for _ in range(thread_count)]
+                start = time.perf_counter()
+                [worker.start() for worker in workers]
+                [worker.join() for worker in workers]
+                result[f"{name}_ns"] = (time.perf_counter() - start) / count * 1e9
+
+            # finished threads are folded into the totals
+            export_s, text = timed(registry.export)
+            result["export_ms"] = export_s * 1000
+            result["counter_exact"] = f"bench_total {result['operations']}" in text
+            results.append(result)
+    return results
+
+
+def bench_profiler(sizes=(97, 250), threads: int = 8, repeat: int = 7):
+    results = []
+    idle = threading.Event()
+    for _ in range(threads):
+        threading.Thread(target=idle.wait, daemon=True).start()
+
+    # cpu-bound work under a deep stack
+    def work(depth):
+        if depth > 0:
+            return work(depth - 1)
+        return sum(i * i for i in range(20000))
+
+    def run():
+        return timed(lambda: [work(40) for _ in range(300)])[0]
+
+    for rate in sizes:
+        sampler = profiler.Profiler({"rate": rate, "signal": None})
+
+        # alternate runs so machine noise hits both sides
+        baseline, profiled = [], []
+        for _ in range(repeat):
+            baseline.append(run())
+            sampler.start()
+            profiled.append(run())
+            sampler.stop(dump=False)
+        results.append(
+            {
+                "rate_hz": rate,
+                "threads": threads + 1,
+                "baseline_s": min(baseline),
+                "profiled_s": min(profiled),
+                "slowdown_pct": (min(profiled) / min(baseline) - 1) * 100,
+                "sampling_pct": sampler.overhead() * 100,
+                "samples": sampler.samples,
+            }
+        )
+    idle.set()
+    return results
+
+
+def bench_memory(sizes=(10000, 100000), frames: tuple = (1, 8)):
+    import tracemalloc
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+
+        # a module that keeps what it allocates
+        module_dir = os.path.join(tmp, "framer_modules", "bench_leak")
+        os.makedirs(module_dir)
+        helper.write_file(
+            os.path.join(module_dir, "__init__.py"),
+            "kept = []\n"
+            "def leak(count):\n"
+            "    kept.extend({'i': i} for i in range(count))\n"
+            "def churn(count):\n"
+            "    return sum(len({'i': i}) for i in range(count))\n",
+        )
+        sys.path.insert(0, os.path.dirname(module_dir))
+        try:
+            import bench_leak
+        finally:
+            sys.path.remove(os.path.dirname(module_dir))
+
+        for count in sizes:
+            untraced = timed(bench_leak.churn, count)[0]
+            for depth in frames:
+                inspector = memory.Inspector({"frames": depth, "signal": None})
+                tracemalloc.start(depth)
+                try:
+                    traced = timed(bench_leak.churn, count)[0]
+                    inspector.report()
+                    bench_leak.leak(count)
+                    report_s, result = timed(inspector.report)
+                finally:
+                    tracemalloc.stop()
+                    bench_leak.kept.clear()
+                results.append(
+                    {
+                        "allocations": count,
+                        "frames": depth,
+                        "tracing_slowdown": traced / untraced,
+                        "report_ms": report_s * 1000,
+                        "leak_growth_kib": result["bench_leak"]["growth"] / 1024,
+                        "top_growth": max(result, key=lambda m: result[m]["growth"]),
+                    }
+                )
+    return results
+
+
+def bench_reload(sizes=(10, 100), depth: int = 2, repeat: int = 3):
+    results = []
+    code = (
+        "import io, json, time, contextlib\n"
+        "with contextlib.redirect_stdout(io.StringIO()):\n"
+        "    start = time.perf_counter()\n"
+        "    f = Framer.init()\n"
+        "    init_s = time.perf_counter() - start\n"
+        "    timings = {}\n"
+        "    for name in (NAMES):\n"
+        "        runs = []\n"
+        "        for _ in range(REPEAT):\n"
+        "            start = time.perf_counter()\n"
+        "            reloaded = f.reload.reload(name)\n"
+        "            runs.append(time.perf_counter() - start)\n"
+        "        timings[name] = (min(runs), len(reloaded))\n"
+        "print(json.dumps([init_s, timings]))"
+    )
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as root:
+            modules = make_project(root, size, lines=100, depth=depth, spread=4)
+
+            # leaf has no dependents, the first module is required by all
+            names = (modules[-1], modules[0])
+            script = code.replace("NAMES", repr(names)).replace("REPEAT", str(repeat))
+            stdout = framer_subprocess(root, script, True)[1]
+            init_s, timings = json.loads(stdout.strip().splitlines()[-1])
+        results.append(
+            {
+                "modules": size,
+                "init_s": init_s,
+                "leaf_reload_s": timings[names[0]][0],
+                "leaf_reloaded": timings[names[0]][1],
+                "root_reload_s": timings[names[1]][0],
+                "root_reloaded": timings[names[1]][1],
+            }
+        )
+    return results
+
+
+def bench_capture(sizes=(200000, 2000000), line_bytes: int = 100):
+    results = []
+    with tempfile.TemporaryDirectory() as root:
+
+        # child writing at full speed, reports its own time on stderr
+        helper.write_file(
+            f"{root}/flood.py",
+            "import sys, time\n"
+            "count, line = int(sys.argv[1]), 'x' * int(sys.argv[2]) + '\\n'\n"
+            "start = time.perf_counter()\n"
+            "for _ in range(count):\n"
+            "    sys.stdout.write(line)\n"
+            "sys.stdout.flush()\n"
+            "print(time.perf_counter() - start, file=sys.stderr)\n",
+        )
+        for count in sizes:
+            result = {"lines": count, "mb": count * (line_bytes + 1) / 1e6}
+            for name, flags in (("direct", ["--no-capture"]), ("captured", [])):
+                args = ["runner", "--exit-on-finish", *flags, "--start"]
+                wall, stderr = framer_command(
+                    root, args + ["flood.py", str(count), str(line_bytes)]
+                )
+                child = float(stderr.strip().split()[-1])
+                result[f"{name}_child_s"] = child
+                result[f"{name}_wall_s"] = wall
+            result["captured_mb_s"] = result["mb"] / result["captured_wall_s"]
+            results.append(result)
+    return results
+
+
+def bench_mirror(sizes=(1000000, 16000000), repeat: int = 3):
+    results = []
+
+    # name => latency, bytes per second, failure mode
+    profiles = {
+        "near": (0.01, 10e6, None),
+        "slow": (0.05, 5e6, None),
+        "far": (0.3, 10e6, None),
+        "flaky": (0.002, 10e6, "fetch"),
+        "down": (0.0, 10e6, "all"),
+    }
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as root, contextlib.ExitStack() as stack:
+            os.makedirs(f"{root}/release/mod")
+            with open(f"{root}/release/mod/file.zip", "wb") as f:
+                f.write(os.urandom(size))
+            content_hash = helper.hash_file(f"{root}/release/mod/file.zip")
+            urls = {
+                name: stack.enter_context(serve_mirror(f"{root}/release", *profile))
+                + "/mod/file.zip"
+                for name, profile in profiles.items()
+            }
+            names = {mirror.origin_of(url): name for name, url in urls.items()}
+
+            def download(candidates, **config):
+                config = {**mirror.mirror_defaults, **config}
+                downloader = mirror.Downloader(candidates, config, lambda m: None)
+                start = time.perf_counter()
+                url = downloader.download(f"{root}/file.zip", content_hash)
+                return time.perf_counter() - start, names[mirror.origin_of(url)]
+
+            def run(*args, **config):
+                return in_project(root, lambda: download(*args, **config))
+
+            # cold health, every mirror only probed
+            cold_s, cold = run(list(urls.values()))
+            timings = [run(list(urls.values())) for _ in range(repeat)]
+            warm_s, warm = min(timings)
+            single_s, _ = run([urls["near"]])
+            unsplit_s, _ = run(list(urls.values()), split_size=size + 1)
+        results.append(
+            {
+                "bytes": size,
+                "cold_s": cold_s,
+                "cold_mirror": cold,
+                "warm_s": warm_s,
+                "warm_mirror": warm,
+                "single_origin_s": single_s,
+                "unsplit_s": unsplit_s,
+                "split_speedup": unsplit_s / warm_s,
+            }
+        )
+    return results
+
+
+benchmarks = {
+    "init": bench_init,
+    "origin": bench_origin,
+    "delta": bench_delta,
+    "logger": bench_logger,
+    "bus": bench_bus,
+    "store": bench_store,
+    "cold_start": bench_cold_start,
+    "startup": bench_startup,
+    "module_cli": bench_module_cli,
+    "offload": bench_offload,
+    "isolate": bench_isolate,
+    "scheduler": bench_scheduler,
+    "metrics": bench_metrics,
+    "profiler": bench_profiler,
+    "memory": bench_memory,
+    "reload": bench_reload,
+    "capture": bench_capture,
+    "mirror": bench_mirror,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="bench", description="Framer Benchmarks")
+    parser.add_argument("names", nargs="*", default=list(benchmarks.keys()))
+    parser.add_argument("--sizes", help="Comma Separated Sizes", default=None)
+    parser.add_argument("--out", help="Write JSON Result To File", default=None)
+    args = parser.parse_args(argv)
+
+    # run benchmarks
+    report = {"python": sys.version.split()[0], "results": {}}
+    for name in args.names:
+        kwargs = {}
+
+        # benchmarks without sizes keep their own parameters
+        if args.sizes is not None:
+            if "sizes" in inspect.signature(benchmarks[name]).parameters:
+                kwargs["sizes"] = [int(s) for s in args.sizes.split(",")]
+            else:
+                helper.logger("Bench", f"{name} Takes No Sizes, Ignoring --sizes")
+        helper.logger("Bench", f"Running {name}...")
+        report["results"][name] = benchmarks[name](**kwargs)
+
+    # output
+    if args.out is not None:
+        helper.write_file(args.out, helper.json_dump(report))
+    print(helper.json_dump(report))
+
+    # budget checks fail the run
+    failed = [
+        result
+        for results in report["results"].values()
+        for result in results
+        if result.get("ok") == False
+    ]
+    if len(failed) > 0:
+        helper.logger("Bench", f"{len(failed)} Checks Over Budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
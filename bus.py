@@ -0,0 +1,347 @@
+import re
+import time
+import threading
+import collections
+
+from . import helper
+
+# latency histogram, bucket i holds latencies below 2**i microseconds
+HISTOGRAM_BUCKETS = 32
+
+# stats fields
+STAT_PUBLISHED = 0
+STAT_DELIVERED = 1
+STAT_DROPPED = 2
+STAT_ERRORS = 3
+STAT_LATENCY_NS = 4
+STAT_HISTOGRAM = 5
+STAT_LOCK = 6
+
+# cached routes, cleared when any topic string could grow it without end
+MAX_ROUTES = 4096
+
+# topics with their own stats, later topics share one entry
+MAX_TOPICS = 4096
+OTHER_TOPICS = "[other topics]"
+
+
+def compile_pattern(pattern: str):
+
+    # exact topics skip regex matching
+    if "*" not in pattern and "#" not in pattern:
+        return None
+
+    # "*" is one topic segment, "#" any number of segments
+    # matched against "." + topic, so every segment has a leading dot
+    parts = []
+    for segment in pattern.split("."):
+        if segment == "#":
+            parts.append(r"(?:\.[^.]+)*")
+        elif segment == "*":
+            parts.append(r"\.[^.]+")
+        else:
+            parts.append(r"\." + re.escape(segment))
+    return re.compile("".join(parts))
+
+
+def coalesce(items: list) -> list:
+
+    # consecutive items of one topic become one batch
+    result = []
+    for topic, payloads, started_ns, stats in items:
+        if len(result) > 0 and result[-1][0] == topic:
+            result[-1][1].extend(payloads)
+        else:
+            result.append((topic, list(payloads), started_ns, stats))
+    return result
+
+
+def new_stats():
+    return [0, 0, 0, 0, 0, [0] * HISTOGRAM_BUCKETS, threading.Lock()]
+
+
+# publishers and subscriber workers update one topic's stats concurrently
+def add_stat(stats, field: int, n: int = 1):
+    with stats[STAT_LOCK]:
+        stats[field] += n
+
+
+def record(stats, started_ns: int, count: int):
+    latency_ns = time.perf_counter_ns() - started_ns
+    with stats[STAT_LOCK]:
+        stats[STAT_DELIVERED] += count
+        stats[STAT_LATENCY_NS] += latency_ns * count
+        stats[STAT_HISTOGRAM][min((latency_ns // 1000).bit_length(), 31)] += count
+
+
+class Subscription:
+    def __init__(self, bus, pattern, handler, queue_size, policy, batch, loop):
+        self.bus = bus
+        self.pattern = pattern
+        self.matcher = compile_pattern(pattern)
+        self.handler = handler
+        self.queue_size = queue_size
+        self.policy = policy
+        self.batch = batch
+        self.loop = loop
+        self.closed = False
+
+        # queued delivery, worker thread or event loop task
+        self.queue = collections.deque()
+        self.condition = threading.Condition()
+        if loop is not None:
+            import asyncio
+
+            self.slots = threading.BoundedSemaphore(queue_size)
+            self.wakeup = asyncio.Event()
+
+            # publishes from the loop thread are known before the task starts
+            self.loop_thread = None
+            try:
+                if asyncio.get_running_loop() is loop:
+                    self.loop_thread = threading.get_ident()
+            except RuntimeError:
+                pass
+            loop.call_soon_threadsafe(self.start_task)
+            self.deliver = self.deliver_async
+        elif queue_size > 0:
+            self.worker = threading.Thread(
+                target=self.run_worker, name=f"bus:{pattern}", daemon=True
+            )
+            self.worker.start()
+            self.deliver = self.deliver_queued
+        else:
+            self.deliver = self.deliver_inline
+
+    def matches(self, topic: str) -> bool:
+        if self.matcher is None:
+            return topic == self.pattern
+        return self.matcher.fullmatch("." + topic) is not None
+
+    def call(self, topic: str, payloads: list, started_ns: int, stats):
+        try:
+            if self.batch:
+                self.handler(topic, payloads)
+            else:
+                for payload in payloads:
+                    self.handler(topic, payload)
+        except Exception as e:
+            add_stat(stats, STAT_ERRORS)
+            helper.logger("Bus", f"Subscriber {self.pattern} Failed On {topic}: {e}")
+            return
+        record(stats, started_ns, len(payloads))
+
+    # inline, runs in the publisher thread
+    def deliver_inline(self, topic, payloads, started_ns, stats):
+        self.call(topic, payloads, started_ns, stats)
+        return True
+
+    # bounded queue, full queue blocks or drops
+    def deliver_queued(self, topic, payloads, started_ns, stats):
+        with self.condition:
+            while len(self.queue) >= self.queue_size and not self.closed:
+                if self.policy == "drop":
+                    add_stat(stats, STAT_DROPPED, len(payloads))
+                    return False
+                self.condition.wait()
+            if self.closed:
+                return False
+            self.queue.append((topic, payloads, started_ns, stats))
+            if len(self.queue) == 1:
+                self.condition.notify_all()
+        return True
+
+    def run_worker(self):
+        while True:
+            with self.condition:
+                while len(self.queue) == 0 and not self.closed:
+                    self.condition.wait()
+                if len(self.queue) == 0:
+                    return
+
+                # drain everything queued in one wakeup
+                items = list(self.queue)
+                self.queue.clear()
+                self.condition.notify_all()
+            if self.batch:
+                items = coalesce(items)
+            for topic, payloads, started_ns, stats in items:
+                self.call(topic, payloads, started_ns, stats)
+
+    # asyncio, slots bound the items in flight
+    # the loop thread waiting on its own task would never wake up
+    def deliver_async(self, topic, payloads, started_ns, stats):
+        in_loop = self.loop_thread == threading.get_ident()
+        if self.slots.acquire(False):
+            pass
+        elif self.policy == "drop":
+            add_stat(stats, STAT_DROPPED, len(payloads))
+            return False
+        elif in_loop:
+            raise RuntimeError(
+                f"Bus subscriber {self.pattern} is full, a blocking publish from"
+                " its own event loop would deadlock."
+            )
+        else:
+            self.slots.acquire()
+        item = (topic, payloads, started_ns, stats)
+        if in_loop:
+            self.queue.append(item)
+            self.wakeup.set()
+        else:
+            self.loop.call_soon_threadsafe(self.enqueue_async, item)
+        return True
+
+    def start_task(self):
+        self.loop_thread = threading.get_ident()
+        self.task = self.loop.create_task(self.run_task())
+
+    def enqueue_async(self, item):
+        self.queue.append(item)
+        self.wakeup.set()
+
+    def wake(self):
+        self.wakeup.set()
+
+    async def run_task(self):
+        while not self.closed or len(self.queue) > 0:
+            if len(self.queue) == 0:
+                self.wakeup.clear()
+                await self.wakeup.wait()
+                continue
+            topic, payloads, started_ns, stats = self.queue.popleft()
+            try:
+                if self.batch:
+                    await self.handler(topic, payloads)
+                else:
+                    for payload in payloads:
+                        await self.handler(topic, payload)
+            except Exception as e:
+                add_stat(stats, STAT_ERRORS)
+                helper.logger(
+                    "Bus", f"Subscriber {self.pattern} Failed On {topic}: {e}"
+                )
+            else:
+                record(stats, started_ns, len(payloads))
+            finally:
+                self.slots.release()
+
+    def close(self):
+        self.bus.unsubscribe(self)
+
+
+class Bus:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscriptions = []
+        self.routes = {}
+        self.topic_stats = {}
+
+    def subscribe(
+        self,
+        pattern: str,
+        handler,
+        queue_size: int = 0,
+        policy: str = "block",
+        batch: bool = False,
+        loop=None,
+    ) -> Subscription:
+        import inspect
+
+        if policy not in ("block", "drop"):
+            raise ValueError(f"Invalid policy: {policy}")
+
+        # coroutine handlers run on their event loop
+        if inspect.iscoroutinefunction(handler):
+            import asyncio
+
+            if loop is None:
+                loop = asyncio.get_running_loop()
+            queue_size = queue_size or 1024
+        else:
+            loop = None
+
+        subscription = Subscription(
+            self, pattern, handler, queue_size, policy, batch, loop
+        )
+        with self.lock:
+            self.subscriptions = self.subscriptions + [subscription]
+            self.routes = {}
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self.lock:
+            self.subscriptions = [
+                s for s in self.subscriptions if s is not subscription
+            ]
+            self.routes = {}
+
+        # let queued items finish
+        with subscription.condition:
+            subscription.closed = True
+            subscription.condition.notify_all()
+        if subscription.loop is not None:
+            subscription.loop.call_soon_threadsafe(subscription.wake)
+
+    # routes are read once, a subscribe in between replaces the dict and
+    # the route computed from the old subscribers stays in the old one
+    def route(self, topic: str):
+        routes = self.routes
+        subscriptions = routes.get(topic)
+        if subscriptions is None:
+            subscriptions = tuple(s for s in self.subscriptions if s.matches(topic))
+            if len(routes) >= MAX_ROUTES:
+                routes.clear()
+            routes[topic] = subscriptions
+        return subscriptions
+
+    def stats_for(self, topic: str):
+        stats = self.topic_stats.get(topic)
+        if stats is None:
+            with self.lock:
+                if (
+                    topic not in self.topic_stats
+                    and len(self.topic_stats) >= MAX_TOPICS
+                ):
+                    topic = OTHER_TOPICS
+                stats = self.topic_stats.setdefault(topic, new_stats())
+        return stats
+
+    def publish(self, topic: str, payload=None) -> int:
+        return self.publish_many(topic, [payload])
+
+    def publish_many(self, topic: str, payloads: list) -> int:
+        started_ns = time.perf_counter_ns()
+        stats = self.stats_for(topic)
+        add_stat(stats, STAT_PUBLISHED, len(payloads))
+        delivered = 0
+        for subscription in self.route(topic):
+            if subscription.deliver(topic, payloads, started_ns, stats):
+                delivered += 1
+        return delivered
+
+    def stats(self, topic: str = None) -> dict:
+        topics = list(self.topic_stats) if topic is None else [topic]
+        result = {}
+        for t in topics:
+            stats = self.topic_stats.get(t, new_stats())
+            histogram = stats[STAT_HISTOGRAM]
+            result[t] = {
+                "published": stats[STAT_PUBLISHED],
+                "delivered": stats[STAT_DELIVERED],
+                "dropped": stats[STAT_DROPPED],
+                "errors": stats[STAT_ERRORS],
+                "latency_avg_us": (
+                    stats[STAT_LATENCY_NS] / stats[STAT_DELIVERED] / 1000
+                    if stats[STAT_DELIVERED] > 0
+                    else 0
+                ),
+                "latency_us": {
+                    f"<{2 ** i}": count for i, count in enumerate(histogram) if count
+                },
+            }
+        return result
+
+    def close(self):
+        for subscription in list(self.subscriptions):
+            self.unsubscribe(subscription)
@@ -0,0 +1,401 @@
+import sys
+import argparse
+import functools
+import importlib
+
+# import helper
+from .. import helper
+
+# python executable
+python = sys.executable
+
+# CLI init
+logger = functools.partial(helper.logger, "CLI")
+
+
+# parser class
+class LoggerParser(argparse.ArgumentParser):
+    def error(self, message):
+        logger(message)
+        sys.exit(1)
+
+
+# actions load their command module on first use
+class LazyAction(argparse.Action):
+    def __init__(self, target, **kwargs):
+        super().__init__(**kwargs)
+        self.target = target
+        self.kwargs = kwargs
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        module_name, action_name = self.target.split(":")
+        module = importlib.import_module(f".{module_name}", __name__)
+        action = getattr(module, action_name)(**self.kwargs)
+        action(parser, namespace, values, option_string)
+
+
+def lazy(target: str):
+    return functools.partial(LazyAction, target)
+
+
+class ShowHelpAction(argparse.Action):
+    def __call__(self, parser, namespace, values, option_string=None):
+        logger(parser.format_help())
+
+
+# parsers
+def build_main_parser():
+    main_parser = LoggerParser(description="Framer CLI", add_help=False)
+    main_parser.add_argument(
+        "-h", "--help", help="Show Help", action=ShowHelpAction, nargs=0
+    )
+    main_parser.add_argument(
+        "-v",
+        "--version",
+        help="Show Version",
+        action="version",
+        version="1.0 (Official)",
+    )
+    main_parser.add_argument(
+        "--shell",
+        help="Open Framer Shell, Run Commands From SCRIPT or Stdin If Given",
+        action=lazy("core:OpenShellAction"),
+        nargs="?",
+        metavar="SCRIPT",
+    )
+    main_parser.add_argument(
+        "-t",
+        "--test",
+        help="Test Framer",
+        action=lazy("core:TestFramerAction"),
+        nargs=0,
+    )
+    main_parser.add_argument(
+        "--init", help="Init Project", action=lazy("core:InitProjectAction"), nargs=0
+    )
+    main_parser.add_argument(
+        "-m",
+        "--module",
+        help="Load Module CLI",
+        action=lazy("core:ModuleCLIAction"),
+        nargs=argparse.REMAINDER,
+    )
+    main_parser.add_argument(
+        "--daemon",
+        help="Control Resident Daemon Serving Module CLI Calls",
+        action=lazy("daemon:DaemonAction"),
+        nargs=1,
+        choices=["start", "stop", "status", "serve"],
+    )
+    main_parser.add_argument(
+        "--memory",
+        help="Request Per-Module Memory Report From Running Process",
+        action=lazy("memory:MemoryReportAction"),
+        nargs=1,
+        metavar="PID",
+    )
+    main_parser.add_argument(
+        "--update",
+        help="Update Framer",
+        action=lazy("core:FramerUpdateAction"),
+        nargs=0,
+    )
+    return main_parser
+
+
+@functools.cache
+def build_env_parser():
+    env_parser = LoggerParser(prog="env", description="Framer CLI", add_help=False)
+    env_parser.add_argument(
+        "-h", "--help", help="Show Help", action=ShowHelpAction, nargs=0
+    )
+    env_parser.add_argument(
+        "--init", help="Init Env File", action=lazy("env:EnvInitAction"), nargs=0
+    )
+    env_parser.add_argument(
+        "-l",
+        "--list",
+        help="List Environments",
+        action=lazy("env:EnvListAction"),
+        nargs=0,
+    )
+    env_parser.add_argument(
+        "--set",
+        help="Set Environment, TYPE can be 'str', 'int', 'float', 'bool', Default 'str'",
+        action=lazy("env:EnvSetAction"),
+        nargs=2,
+        metavar=("KEY", "[TYPE:]VALUE"),
+    )
+    env_parser.add_argument(
+        "--del",
+        help="Delete Environment",
+        action=lazy("env:EnvDelAction"),
+        nargs=1,
+        metavar="KEY",
+    )
+    return env_parser
+
+
+@functools.cache
+def build_runner_parser():
+    runner_parser = LoggerParser(
+        prog="runner", description="Framer CLI", add_help=False
+    )
+    runner_parser.add_argument(
+        "-h", "--help", help="Show Help", action=ShowHelpAction, nargs=0
+    )
+    runner_parser.add_argument(
+        "--exit-on-finish",
+        help="Exit on Finish",
+        action=lazy("runner:RunnerConfigAction"),
+        nargs=0,
+    )
+    runner_parser.add_argument(
+        "--restart-on-error",
+        help="Restart on Error",
+        action=lazy("runner:RunnerConfigAction"),
+        nargs=0,
+    )
+    runner_parser.add_argument(
+        "--restart-sleep",
+        help="Restart Sleep Seconds",
+        action=lazy("runner:RunnerConfigAction"),
+        nargs=1,
+        metavar="SECONDS",
+    )
+    runner_parser.add_argument(
+        "--restart-on-file-change",
+        help="Restart on File Change",
+        action=lazy("runner:RunnerConfigAction"),
+        nargs=0,
+    )
+    runner_parser.add_argument(
+        "--no-capture",
+        help="Child Uses the Terminal Directly, No Output Capture",
+        action=lazy("runner:RunnerConfigAction"),
+        nargs=0,
+    )
+    runner_parser.add_argument(
+        "--crash-lines",
+        help="Output Lines Kept and Shown When the Child Fails, Default 200",
+        action=lazy("runner:RunnerConfigAction"),
+        nargs=1,
+        metavar="LINES",
+    )
+    runner_parser.add_argument(
+        "--hot-reload",
+        help="Reload Changed Modules In Process Instead of Restart",
+        action=lazy("runner:RunnerConfigAction"),
+        nargs=0,
+    )
+    runner_parser.add_argument(
+        "--profile",
+        help="Profile the Runner Child, Optional Sample Rate",
+        action=lazy("runner:RunnerConfigAction"),
+        nargs="?",
+        metavar="RATE",
+    )
+    runner_parser.add_argument(
+        "--start",
+        help="Start Runner",
+        action=lazy("runner:RunnerStartAction"),
+        nargs=argparse.REMAINDER,
+    )
+    return runner_parser
+
+
+@functools.cache
+def build_origin_parser():
+    origin_parser = LoggerParser(
+        prog="origin", description="Framer CLI", add_help=False
+    )
+    origin_parser.add_argument(
+        "-h", "--help", help="Show Help", action=ShowHelpAction, nargs=0
+    )
+    origin_parser.add_argument(
+        "--add",
+        help="Add Origin",
+        action=lazy("origin:OriginAddAction"),
+        nargs=1,
+        metavar="ORIGIN",
+    )
+    origin_parser.add_argument(
+        "-l",
+        "--list",
+        help="List Origins",
+        action=lazy("origin:OriginListAction"),
+        nargs=0,
+    )
+    origin_parser.add_argument(
+        "--del",
+        help="Delete Origin",
+        action=lazy("origin:OriginDelAction"),
+        nargs=1,
+        metavar="ORIGIN",
+    )
+    origin_parser.add_argument(
+        "--sync", help="Sync Origin", action=lazy("origin:OriginSyncAction"), nargs=0
+    )
+    origin_parser.add_argument(
+        "--make", help="Make Origin", action=lazy("origin:OriginMakeAction"), nargs=0
+    )
+    return origin_parser
+
+
+@functools.cache
+def build_module_parser():
+    module_parser = LoggerParser(
+        prog="module", description="Framer CLI", add_help=False
+    )
+    module_parser.add_argument(
+        "-h", "--help", help="Show Help", action=ShowHelpAction, nargs=0
+    )
+    module_parser.add_argument(
+        "-l",
+        "--list",
+        help="List Modules",
+        action=lazy("module:ModuleListAction"),
+        nargs=0,
+    )
+    module_parser.add_argument(
+        "--sync-pkg",
+        help="Sync Installed Package To Framerpkg",
+        action=lazy("module:SyncPackageAction"),
+        nargs=0,
+    )
+    module_parser.add_argument(
+        "--info",
+        help="Show Module Info",
+        action=lazy("module:ModuleInfoAction"),
+        nargs=1,
+        metavar="MODULE",
+    )
+    module_parser.add_argument(
+        "--enable",
+        help="Enable Module",
+        action=lazy("module:ModuleEnableAction"),
+        nargs=1,
+        metavar="MODULE",
+    )
+    module_parser.add_argument(
+        "--disable",
+        help="Disable Module",
+        action=lazy("module:ModuleDisableAction"),
+        nargs=1,
+        metavar="MODULE",
+    )
+    module_parser.add_argument(
+        "--del",
+        help="Delete Module",
+        action=lazy("module:ModuleDelAction"),
+        nargs=1,
+        metavar="MODULE",
+    )
+    module_parser.add_argument(
+        "-s",
+        "--search",
+        help="Search Module",
+        action=lazy("module:ModuleSearchAction"),
+        nargs=1,
+        metavar="KEYWORD",
+    )
+    module_parser.add_argument(
+        "--overwrite",
+        help="Install Module and Override Old",
+        action=lazy("module:ModuleInstallConfigAction"),
+        nargs=0,
+    )
+    module_parser.add_argument(
+        "--zip",
+        help="Install Module as Zip, Loaded by Zipimport",
+        action=lazy("module:ModuleInstallConfigAction"),
+        nargs=0,
+    )
+    module_parser.add_argument(
+        "--checked-hash",
+        help="Precompile as Checked Hash Bytecode",
+        action=lazy("module:ModuleInstallConfigAction"),
+        nargs=0,
+    )
+    module_parser.add_argument(
+        "--wheelhouse",
+        help="Find Pip Dependencies In Local Wheelhouse",
+        action=lazy("module:ModuleInstallConfigAction"),
+        nargs=1,
+        metavar="DIR",
+    )
+    module_parser.add_argument(
+        "--offline",
+        help="Install Pip Dependencies Without Package Index",
+        action=lazy("module:ModuleInstallConfigAction"),
+        nargs=0,
+    )
+    module_parser.add_argument(
+        "-i",
+        "--install",
+        help="Install Module",
+        action=lazy("module:ModuleInstallAction"),
+        nargs=1,
+        metavar="MODULE",
+    )
+    module_parser.add_argument(
+        "--sync-back",
+        help="Sync Package Back",
+        action=lazy("module:ModuleSyncBackAction"),
+        nargs=0,
+    )
+    module_parser.add_argument(
+        "--compile",
+        help="Precompile Installed Modules Bytecode",
+        action=lazy("module:ModuleCompileAction"),
+        nargs=0,
+    )
+    module_parser.add_argument(
+        "--create",
+        help="Create Empty Framer Modules",
+        action=lazy("module:ModuleCreateAction"),
+        nargs=1,
+        metavar="NAME",
+    )
+    return module_parser
+
+
+sub_parsers = {
+    "env": build_env_parser,
+    "runner": build_runner_parser,
+    "origin": build_origin_parser,
+    "module": build_module_parser,
+}
+
+
+@functools.cache
+def build_full_parser(commands: tuple):
+    main_parser = build_main_parser()
+    main_subparsers = main_parser.add_subparsers(dest="subparsers")
+    for name, build in sub_parsers.items():
+        parents = [build()] if name in commands else []
+        main_subparsers.add_parser(name, parents=parents, add_help=False)
+    return main_parser
+
+
+def run(args: list):
+
+    # subcommand first, build only its parser
+    if len(args) > 0 and args[0] in sub_parsers:
+        return sub_parsers[args[0]]().parse_args(args[1:])
+
+    # main options, subcommands after them get full parsers
+    commands = tuple(sorted({a for a in args if a in sub_parsers}))
+    return build_full_parser(commands).parse_args(args)
+
+
+def main():
+    sys.excepthook = helper.global_except_hook
+
+    # show help if no arguments
+    if len(sys.argv) == 1:
+        run(["--help"])
+
+    # parse arguments
+    else:
+        run(sys.argv[1:])
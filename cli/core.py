@@ -0,0 +1,228 @@
+import os
+import sys
+import shlex
+import random
+import argparse
+
+from .. import config
+from .. import helper
+from . import logger, python, run
+
+# framer repo
+framer_repo = "https://github.com/FramerOrg/Framer.git"
+
+# shell session
+shell_history = os.path.expanduser("~/.framer_history")
+shell_state = {
+    "active": False,
+}
+
+
+class OpenShellAction(argparse.Action):
+    def __call__(self, parser, namespace, values, option_string=None):
+        if shell_state["active"]:
+            logger("Shell Already Open")
+            return
+
+        # script file, piped stdin or interactive prompt
+        if values is not None and values != "-":
+            with open(values, "r", encoding="UTF-8") as f:
+                lines = f.read().splitlines()
+            failed = self.run_batch(lines)
+        elif values == "-" or not sys.stdin.isatty():
+            failed = self.run_batch(sys.stdin.read().splitlines())
+        else:
+            failed = self.run_interactive()
+        if failed:
+            sys.exit(1)
+
+    def run_batch(self, lines):
+
+        # stop on first failed command, keep what ran before
+        with ShellSession():
+            for number, line in enumerate(lines, 1):
+                if self.execute(line) == False:
+                    logger(f"Shell Stopped At Line {number}: {line}")
+                    return True
+        return False
+
+    def run_interactive(self):
+        import readline
+
+        # load history
+        try:
+            readline.read_history_file(shell_history)
+        except OSError:
+            pass
+        readline.set_history_length(1000)
+
+        with ShellSession():
+            while True:
+                try:
+                    line = input("Framer> ")
+                except EOFError:
+                    print()
+                    break
+                except KeyboardInterrupt:
+                    print()
+                    continue
+                if line.strip().lower() in ("exit", "quit"):
+                    break
+                self.execute(line)
+
+                # write config between prompts, other tools may read it
+                config.flush()
+
+        # save history
+        try:
+            readline.write_history_file(shell_history)
+        except OSError:
+            pass
+        return False
+
+    def execute(self, line: str) -> bool:
+        line = line.strip()
+        if line == "" or line.startswith("#"):
+            return True
+        try:
+            args = shlex.split(line)
+        except ValueError as e:
+            logger(f"Invalid Command: {e}")
+            return False
+
+        # fresh flags for every command
+        for name in ("runner", "module"):
+            module = sys.modules.get(f"{__package__}.{name}")
+            if module is not None:
+                module.reset_config()
+
+        try:
+            run(args)
+        except SystemExit as e:
+            return e.code is None or e.code == 0
+        except Exception as e:
+            logger(f"{type(e).__name__}: {e}")
+            return False
+        return True
+
+
+class ShellSession(config.batch):
+    def __enter__(self):
+        shell_state["active"] = True
+        super().__enter__()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        shell_state["active"] = False
+        super().__exit__(exc_type, exc_value, traceback)
+
+
+class TestFramerAction(argparse.Action):
+    def __call__(self, parser, namespace, values, option_string=None):
+        logger("Testing Framer...")
+        config.flush()
+        self.generate_test_file()
+
+        try:
+            os.system(f"{python} {self.test_file}")
+        finally:
+            if os.path.exists(self.test_file):
+                os.remove(self.test_file)
+
+    def generate_test_file(self):
+        test_file = (
+            "test_framer_"
+            + "".join(
+                random.sample(
+                    "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789", 10
+                )
+            )
+            + ".py"
+        )
+        helper.write_file(
+            test_file,
+            """import Framer
+
+if __name__ == "__main__":
+    Framer.init(link_to=__name__, log_name="CLI", hook_error=True)
+    logger("Hello Framer!")""",
+        )
+        self.test_file = test_file
+        logger(f"Create {test_file}")
+
+
+# runtime files written into the project
+project_ignore = [
+    ".framer.lock",
+    ".framer-daemon.sock",
+    ".framer-daemon.log",
+    "framer_download_cache/",
+]
+
+
+class InitProjectAction(argparse.Action):
+    def __call__(self, parser, namespace, values, option_string=None):
+        logger("Init Project...")
+        if helper.no_framerpkg():
+            helper.init_framerpkg()
+        if helper.no_framer_modules():
+            helper.clean_dir("./framer_modules")
+        self.update_ignore()
+        logger("Init Project Done")
+
+    # runtime files of the cli, kept out of version control
+    @staticmethod
+    def update_ignore():
+        lines = []
+        if os.path.isfile("./.gitignore"):
+            lines = helper.read_file("./.gitignore").splitlines()
+        missing = [entry for entry in project_ignore if entry not in lines]
+        if len(missing) > 0:
+            helper.write_file("./.gitignore", "\n".join(lines + missing) + "\n")
+
+
+class ModuleCLIAction(argparse.Action):
+    def __call__(self, parser, namespace, values, option_string=None):
+        module = values[0]
+        args = values[1:]
+        installed_modules = helper.load_installed_modules()
+
+        # if module not installed
+        if module not in installed_modules:
+            raise ImportError(f"Module {module} not installed")
+
+        # resident daemon keeps modules warm
+        from . import daemon
+
+        code = daemon.forward(module, args)
+        if code is not None:
+            if code != 0:
+                sys.exit(code)
+            return
+
+        # import module
+        helper.mount_modules()
+        module_obj = __import__(module)
+
+        # if no entry point
+        if not hasattr(module_obj, "cliMain"):
+            raise ImportError(f"Module {module} has no Entry Point: cliMain")
+
+        # run entry point
+        module_obj.cliMain(args)
+
+
+class FramerUpdateAction(argparse.Action):
+    def __call__(self, parser, namespace, values, option_string=None):
+        logger("Update Framer...")
+        helper.clean_dir("update_tmp")
+        fetch_status = self.exec_command("git clone {} update_tmp".format(framer_repo))
+        if fetch_status != 0:
+            logger("Fetch Framer Failed")
+            helper.clean_dir("update_tmp", remove=True)
+            return
+        helper.clean_dir("Framer", remove=True)
+        os.rename("update_tmp", "Framer")
+        logger("Update Framer Done")
+
+    def exec_command(self, command):
+        return os.system(command)
@@ -0,0 +1,364 @@
+import os
+import io
+import sys
+import json
+import time
+import socket
+import struct
+import argparse
+import importlib
+import traceback
+
+from .. import helper
+from . import logger, python
+
+# daemon files
+SOCKET_PATH = "./.framer-daemon.sock"
+LOG_PATH = "./.framer-daemon.log"
+
+# frame kinds, header is kind + payload length
+# stdin is pulled by the daemon, size request then data
+FRAME_REQUEST = b"r"
+FRAME_STDIN = b"i"
+FRAME_STDOUT = b"o"
+FRAME_STDERR = b"e"
+FRAME_EXIT = b"x"
+FRAME_DECLINE = b"d"
+frame_header = struct.Struct(">cI")
+
+# daemon config, overridden by framerpkg "daemon"
+daemon_defaults = {
+    "init": False,
+    "idle_timeout": 600,
+    "start_timeout": 60,
+}
+
+# framer package for the daemon process
+package = __name__.split(".")[0]
+
+# env vars read by init, a change needs a fresh init
+FRAMER_ENV_PREFIX = "FRAMER_"
+
+# shell bookkeeping, differs between calls of the same session
+volatile_env = ("_", "OLDPWD", "SHLVL")
+
+
+def daemon_config():
+    framerpkg = {} if helper.no_framerpkg() else helper.load_framerpkg()
+    return {**daemon_defaults, **framerpkg.get("daemon", {})}
+
+
+def send_frame(conn, kind: bytes, data: bytes):
+    conn.sendall(frame_header.pack(kind, len(data)) + data)
+
+
+def recv_exact(conn, size: int) -> bytes:
+    data = bytearray()
+    while len(data) < size:
+        chunk = conn.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("Daemon Connection Closed")
+        data += chunk
+    return bytes(data)
+
+
+def recv_frame(conn):
+    kind, size = frame_header.unpack(recv_exact(conn, frame_header.size))
+    return kind, recv_exact(conn, size)
+
+
+def scan_modules():
+    stats = []
+    for path in ("./framerpkg.json", "./env.json"):
+        if os.path.isfile(path):
+            stat = os.stat(path)
+            stats.append((path, stat.st_mtime_ns, stat.st_size))
+    for root, dirs, files in os.walk("./framer_modules"):
+        dirs[:] = [d for d in dirs if not d.startswith(".") and d != "__pycache__"]
+        for fname in files:
+            path = os.path.join(root, fname)
+            stat = os.stat(path)
+            stats.append((path, stat.st_mtime_ns, stat.st_size))
+    return sorted(stats)
+
+
+# client
+def connect():
+    if not os.path.exists(SOCKET_PATH):
+        return None
+    conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        conn.connect(SOCKET_PATH)
+    except OSError:
+        conn.close()
+        return None
+    return conn
+
+
+def request(conn, message: dict) -> int:
+    with conn:
+        send_frame(conn, FRAME_REQUEST, json.dumps(message).encode("UTF-8"))
+
+        # relay streams until exit code
+        while True:
+            kind, data = recv_frame(conn)
+            if kind == FRAME_EXIT:
+                return int(data)
+            if kind == FRAME_DECLINE:
+                return None
+            if kind == FRAME_STDIN:
+                send_frame(conn, FRAME_STDIN, read_stdin(int(data)))
+                continue
+            stream = sys.stdout if kind == FRAME_STDOUT else sys.stderr
+            stream.write(data.decode("UTF-8", "replace"))
+            stream.flush()
+
+
+def read_stdin(size: int) -> bytes:
+    if sys.stdin is None:
+        return b""
+    return os.read(sys.stdin.fileno(), size)
+
+
+def forward(module: str, args: list):
+    conn = connect()
+    if conn is None:
+        return None
+
+    # the daemon declines callers with another env, None runs in-process
+    return request(
+        conn,
+        {"command": "module", "module": module, "args": args, "env": dict(os.environ)},
+    )
+
+
+def framer_env(env) -> dict:
+    return {k: v for k, v in env.items() if k.startswith(FRAMER_ENV_PREFIX)}
+
+
+def other_env(env) -> dict:
+    return {
+        k: v
+        for k, v in env.items()
+        if not k.startswith(FRAMER_ENV_PREFIX) and k not in volatile_env
+    }
+
+
+class RemoteStdin(io.RawIOBase):
+    def __init__(self, conn):
+        super().__init__()
+        self.conn = conn
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        send_frame(self.conn, FRAME_STDIN, str(len(buffer)).encode())
+        data = recv_frame(self.conn)[1]
+        buffer[: len(data)] = data
+        return len(data)
+
+
+# server
+class DaemonServer:
+    def __init__(self, config: dict):
+        self.config = config
+        self.framer = None
+        self.fingerprint = None
+        self.started = time.time()
+        self.served = 0
+
+    def serve(self):
+        conn = connect()
+        if conn is not None:
+            conn.close()
+            logger("Daemon Already Running")
+            return
+        self.load()
+
+        # stale socket from a dead daemon
+        if os.path.exists(SOCKET_PATH):
+            os.remove(SOCKET_PATH)
+
+        # owner only socket
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        umask = os.umask(0o077)
+        try:
+            server.bind(SOCKET_PATH)
+        finally:
+            os.umask(umask)
+        server.listen(16)
+        server.settimeout(self.config["idle_timeout"])
+        logger(f"Daemon Listening On {SOCKET_PATH}, PID {os.getpid()}")
+
+        try:
+            while True:
+                try:
+                    conn, _ = server.accept()
+                except socket.timeout:
+                    logger("Daemon Idle Timeout")
+                    break
+                with conn:
+                    conn.settimeout(None)
+                    try:
+                        if self.handle(conn) == False:
+                            break
+                    except (OSError, ValueError) as e:
+                        logger(f"Daemon Request Failed: {e}")
+        finally:
+            server.close()
+            if os.path.exists(SOCKET_PATH):
+                os.remove(SOCKET_PATH)
+            logger("Daemon Stopped")
+
+    def load(self):
+        self.fingerprint = scan_modules()
+        helper.mount_modules()
+
+        # full framer init, modules keep their state
+        if self.config["init"]:
+            self.framer = importlib.import_module(package).init(log_name="Daemon")
+
+    def reload(self, env: dict):
+        logger("Module Files Or Env Changed, Reloading...")
+
+        # old scheduler, workers and threads would keep running old jobs
+        if self.framer is not None:
+            importlib.import_module(package).shutdown(self.framer)
+            self.framer = None
+        helper.purge_modules(helper.load_installed_modules())
+
+        # FRAMER_* vars change only here, while no framer threads run
+        for key in framer_env(os.environ):
+            del os.environ[key]
+        os.environ.update(framer_env(env))
+        self.load()
+
+    def stale(self, env: dict) -> bool:
+        if scan_modules() != self.fingerprint:
+            return True
+        return framer_env(env) != framer_env(os.environ)
+
+    def handle(self, conn):
+
+        # start probes connect without a request
+        try:
+            message = json.loads(recv_frame(conn)[1])
+        except ConnectionError:
+            return True
+
+        if message["command"] == "stop":
+            send_frame(conn, FRAME_EXIT, b"0")
+            return False
+
+        if message["command"] == "status":
+            status = {
+                "pid": os.getpid(),
+                "uptime": round(time.time() - self.started, 3),
+                "served": self.served,
+                "init": self.framer is not None,
+            }
+            send_frame(conn, FRAME_STDOUT, helper.json_dump(status).encode() + b"\n")
+            send_frame(conn, FRAME_EXIT, b"0")
+            return True
+
+        if message["command"] == "module":
+            env = message.get("env", os.environ)
+
+            # the process env is shared with the daemon threads, commands
+            # from another env run in the caller instead
+            if other_env(env) != other_env(os.environ):
+                logger("Caller Env Differs, Declined")
+                send_frame(conn, FRAME_DECLINE, b"")
+                return True
+            if self.stale(env):
+                self.reload(env)
+            code = self.run_module(conn, message["module"], message["args"])
+            send_frame(conn, FRAME_EXIT, str(code).encode())
+            self.served += 1
+        return True
+
+    def run_module(self, conn, module: str, args: list) -> int:
+        streams = sys.stdout, sys.stderr, sys.stdin
+        sys.stdout = helper.CustomStdout(
+            lambda text: send_frame(conn, FRAME_STDOUT, text.encode("UTF-8"))
+        )
+        sys.stderr = helper.CustomStdout(
+            lambda text: send_frame(conn, FRAME_STDERR, text.encode("UTF-8"))
+        )
+        sys.stdin = io.TextIOWrapper(io.BufferedReader(RemoteStdin(conn)), "UTF-8")
+
+        # same checks as in process module CLI
+        try:
+            if module not in helper.load_installed_modules():
+                raise ImportError(f"Module {module} not installed")
+            module_obj = importlib.import_module(module)
+            if not hasattr(module_obj, "cliMain"):
+                raise ImportError(f"Module {module} has no Entry Point: cliMain")
+            module_obj.cliMain(args)
+            return 0
+        except SystemExit as e:
+            if e.code is None or isinstance(e.code, int):
+                return e.code or 0
+            print(e.code, file=sys.stderr)
+            return 1
+        except Exception:
+            traceback.print_exc()
+            return 1
+        finally:
+            sys.stdout, sys.stderr, sys.stdin = streams
+
+
+class DaemonAction(argparse.Action):
+    def __call__(self, parser, namespace, values, option_string=None):
+        getattr(self, values[0])()
+
+    def start(self):
+        import subprocess
+
+        conn = connect()
+        if conn is not None:
+            conn.close()
+            logger("Daemon Already Running")
+            return
+
+        # detached from this terminal
+        logger("Start Daemon...")
+        with open(LOG_PATH, "a", encoding="UTF-8") as log:
+            process = subprocess.Popen(
+                [python, "-u", "-m", package, "--daemon", "serve"],
+                stdin=subprocess.DEVNULL,
+                stdout=log,
+                stderr=subprocess.STDOUT,
+                start_new_session=True,
+            )
+
+        # socket appears once modules are loaded
+        deadline = time.monotonic() + daemon_config()["start_timeout"]
+        while time.monotonic() < deadline and process.poll() is None:
+            conn = connect()
+            if conn is not None:
+                conn.close()
+                logger(f"Daemon Started, PID {process.pid}")
+                return
+            time.sleep(0.05)
+        logger(f"Daemon Start Failed, See {LOG_PATH}")
+        sys.exit(1)
+
+    def serve(self):
+        DaemonServer(daemon_config()).serve()
+
+    def stop(self):
+        conn = connect()
+        if conn is None:
+            logger("Daemon Not Running")
+            return
+        request(conn, {"command": "stop"})
+        logger("Daemon Stopped")
+
+    def status(self):
+        conn = connect()
+        if conn is None:
+            logger("Daemon Not Running")
+            return
+        request(conn, {"command": "status"})
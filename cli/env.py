@@ -0,0 +1,64 @@
+import argparse
+
+from .. import helper
+from . import logger
+
+
+class EnvInitAction(argparse.Action):
+    def __call__(self, parser, namespace, values, option_string=None):
+        logger("Init Env File...")
+        if helper.no_env():
+            helper.init_env()
+        logger("Init Env File Done")
+
+
+class EnvListAction(argparse.Action):
+    def __call__(self, parser, namespace, values, option_string=None):
+        env = helper.load_env()
+        logger(
+            "Env Links: \n- {}".format(
+                "\n- ".join([f"{key} => {value}" for key, value in env.items()])
+            )
+        )
+
+
+class EnvSetAction(argparse.Action):
+    def __call__(self, parser, namespace, values, option_string=None):
+        key = values[0]
+        value = self.parse_env_value(values[1])
+        if helper.no_env():
+            logger("No Env File, Use --init First")
+            return
+
+        # write env file
+        logger(f"Set Env {key} => {value}")
+        with helper.edit_env() as env:
+            env[key] = value
+
+    def parse_env_value(self, value):
+        if ":" not in value:
+            return value
+        else:
+            value_type, value = value.split(":", 1)
+            if value_type == "str":
+                return value
+            elif value_type == "int":
+                return int(value)
+            elif value_type == "float":
+                return float(value)
+            elif value_type == "bool":
+                return value.lower() == "true"
+            else:
+                logger(f"Invalid value type: {value_type}")
+                return f"{value_type}:{value}"
+
+
+class EnvDelAction(argparse.Action):
+    def __call__(self, parser, namespace, values, option_string=None):
+        key = values[0]
+
+        # write env file
+        logger(f"Delete Env {key}")
+        with helper.edit_env() as env:
+            if key in env:
+                del env[key]
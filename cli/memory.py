@@ -0,0 +1,73 @@
+import os
+import sys
+import time
+import signal
+import argparse
+
+from .. import helper
+from ..memory import memory_defaults, report_path, REPORT_TIMEOUT, MEMORY_ENV
+from . import logger
+
+
+def memory_config():
+    framerpkg = {} if helper.no_framerpkg() else helper.load_framerpkg()
+    return {**memory_defaults, **framerpkg.get("memory", {})}
+
+
+# whether a process catches a signal, None when unknown
+def signal_caught(pid: int, signum: int):
+    try:
+        with open(f"/proc/{pid}/status", "r") as f:
+            for line in f:
+                if line.startswith("SigCgt:"):
+                    return bool(int(line.split()[1], 16) >> (signum - 1) & 1)
+    except OSError:
+        return None
+    return None
+
+
+def modified_time(path: str):
+    try:
+        return os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+class MemoryReportAction(argparse.Action):
+    def __call__(self, parser, namespace, values, option_string=None):
+        pid = int(values[0])
+        config = memory_config()
+        signum = getattr(signal, config["signal"] or "", None)
+        if signum is None:
+            logger("Memory Report Signal Disabled")
+            sys.exit(1)
+
+        # an unhandled signal would kill the process
+        if signal_caught(pid, signum) == False:
+            logger(
+                f"Process {pid} Does Not Handle {config['signal']}, "
+                f'Set "watch" In Framerpkg "memory" Or {MEMORY_ENV}=watch'
+            )
+            sys.exit(1)
+
+        # relative report paths are resolved in the process directory
+        path = report_path(config["output"], pid)
+        if not os.path.isabs(path) and os.path.isdir(f"/proc/{pid}/cwd"):
+            path = os.path.join(f"/proc/{pid}/cwd", path)
+
+        before = modified_time(path)
+        try:
+            os.kill(pid, signum)
+        except ProcessLookupError:
+            logger(f"Process {pid} Not Found")
+            sys.exit(1)
+        logger(f"Requested Memory Report From {pid}...")
+
+        deadline = time.monotonic() + REPORT_TIMEOUT
+        while modified_time(path) == before:
+            if time.monotonic() > deadline:
+                logger(f"No Report From {pid} After {REPORT_TIMEOUT}s")
+                sys.exit(1)
+            time.sleep(0.1)
+        with open(path, "r") as f:
+            sys.stdout.write(f.read())
@@ -0,0 +1,605 @@
+import os
+import argparse
+
+from .. import helper
+from . import logger, python, run
+
+# init install config
+install_config = {
+    "overwrite": False,
+    "archive": False,
+    "checked_hash": False,
+    "wheelhouse": None,
+    "offline": False,
+}
+
+# pip requirements collected during one install run
+install_state = {
+    "depth": 0,
+    "pip_requirements": [],
+}
+install_defaults = dict(install_config)
+
+
+def reset_config():
+    install_config.update(install_defaults)
+    install_state.update(depth=0, pip_requirements=[])
+
+
+class ModuleListAction(argparse.Action):
+    def __call__(self, parser, namespace, values, option_string=None):
+        modules = helper.load_installed_modules()
+        logger("Installed Modules: \n- {}".format("\n- ".join(modules)))
+
+
+class SyncPackageAction(argparse.Action):
+    def __call__(self, parser, namespace, values, option_string=None):
+
+        # load installed modules
+        modules = helper.load_installed_modules()
+        logger("Sync Modules To Framerpkg...")
+
+        # load framerpkg
+        if helper.no_framerpkg():
+            run(["--init"])
+
+        # add modules
+        with helper.edit_framerpkg() as framerpkg:
+            framerpkg["modules"] = modules
+        logger("Sync Done")
+
+
+class ModuleInfoAction(argparse.Action):
+    def __call__(self, parser, namespace, values, option_string=None):
+        helper.mount_modules()
+        module_name = values[0]
+        module_info = __import__(module_name).moduleInfo
+        logger(f"Module {module_name} Info: \n{helper.json_dump(module_info)}")
+
+
+class ModuleEnableAction(argparse.Action):
+    def __call__(self, parser, namespace, values, option_string=None):
+        module_name = values[0]
+        with helper.edit_framerpkg() as framerpkg:
+            if module_name in framerpkg["disable"]:
+                framerpkg["disable"].remove(module_name)
+        logger(f"Enable Module {module_name}")
+
+
+class ModuleDisableAction(argparse.Action):
+    def __call__(self, parser, namespace, values, option_string=None):
+        module_name = values[0]
+        with helper.edit_framerpkg() as framerpkg:
+            if module_name not in framerpkg["disable"]:
+                framerpkg["disable"].append(module_name)
+        logger(f"Disable Module {module_name}")
+
+
+class ModuleDelAction(argparse.Action):
+    def __call__(self, parser, namespace, values, option_string=None):
+        module_name = values[0]
+        logger(f"Delete Module {module_name}...")
+        modules = helper.load_installed_modules()
+        if module_name in modules and helper.is_archive(module_name):
+            os.remove(helper.module_path(module_name))
+        elif module_name in modules:
+            helper.clean_dir(f"./framer_modules/{module_name}", remove=True)
+        with helper.edit_lock() as lock:
+            lock["modules"].pop(module_name, None)
+        run(["module", "--sync-pkg"])
+        logger(f"Delete Done")
+
+
+class ModuleSearchAction(argparse.Action):
+    def __call__(self, parser, namespace, values, option_string=None):
+        from .. import search
+
+        result = search.search(self.load_store(), values[0])
+
+        # show result
+        if len(result) > 0:
+            logger("Search Result: \n- {}".format("\n- ".join(result)))
+        else:
+            logger("Search Result: No Match")
+
+    @staticmethod
+    def load_store():
+        from .. import store
+
+        # sync module
+        if store.no_store():
+            run(["origin", "--sync"])
+        return store.open_store()
+
+
+class ModuleInstallConfigAction(argparse.Action):
+    def __call__(self, parser, namespace, values, option_string=None):
+        if option_string == "--overwrite":
+            install_config["overwrite"] = True
+        if option_string == "--zip":
+            install_config["archive"] = True
+        if option_string == "--checked-hash":
+            install_config["checked_hash"] = True
+        if option_string == "--wheelhouse":
+            install_config["wheelhouse"] = values[0]
+        if option_string == "--offline":
+            install_config["offline"] = True
+
+
+class PipBatch:
+    def __enter__(self):
+        install_state["depth"] += 1
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        install_state["depth"] -= 1
+        if install_state["depth"] == 0 and exc_type is None:
+            self.flush()
+        elif install_state["depth"] == 0:
+            install_state["pip_requirements"] = []
+
+    @staticmethod
+    def add(requirements):
+        install_state["pip_requirements"] += requirements
+
+    @staticmethod
+    def flush():
+        import subprocess
+
+        requirements = install_state["pip_requirements"]
+        install_state["pip_requirements"] = []
+
+        # skip satisfied requirements without starting pip
+        missing = helper.pip_unsatisfied(requirements)
+        if len(missing) == 0:
+            return
+        logger("Install Pip Dependencies: \n- {}".format("\n- ".join(missing)))
+
+        # one resolution for every module
+        command = [python, "-m", "pip", "install"]
+        wheelhouse = install_config["wheelhouse"]
+        if wheelhouse is None and not helper.no_framerpkg():
+            wheelhouse = helper.load_framerpkg().get("wheelhouse")
+        if wheelhouse is not None:
+            command += ["--find-links", wheelhouse, "--prefer-binary"]
+        if install_config["offline"]:
+            command += ["--no-index"]
+        status = subprocess.run(command + missing).returncode
+        if status != 0:
+            logger(f"Install Pip Dependencies Failed, Exit {status}")
+
+
+class ModuleInstallAction(argparse.Action):
+    def __call__(self, parser, namespace, values, option_string=None):
+        with PipBatch():
+            self.install(values[0])
+
+    def install(self, module_name):
+        from .. import search
+
+        origin_store = ModuleSearchAction.load_store()
+        search_list = search.resolve(origin_store, module_name)
+        installed_modules = helper.load_installed_modules()
+
+        # get target install
+        target_install = ""
+        if len(search_list) == 0:
+            logger(f"Module {module_name} Not Found, Use --search For Similar Names")
+            return
+        if len(search_list) > 1 and not self.same_content(origin_store, search_list):
+            logger(
+                "Module {} Found: \n- {}".format(module_name, "\n- ".join(search_list))
+            )
+            target_install = input("Install: ")
+        if target_install == "":
+            target_install = search_list[0]
+        target_install_name = target_install.split("@")[0]
+        logger(f"Install Module {target_install}...")
+
+        # check module exist
+        if (
+            target_install_name in installed_modules
+            and install_config["overwrite"] == False
+        ):
+            logger("Module Already Installed, Use --overwrite To Reinstall")
+            return
+
+        # fetch and extract
+        m_name = target_install.split("@")[0]
+        module_entry = origin_store.get(target_install)
+        if module_entry is None:
+            logger(f"Module {target_install} Not Found")
+            return
+
+        # overwrite tries a delta from the installed tree first
+        archive = install_config["archive"]
+        locked = None
+        if target_install_name in installed_modules and not archive:
+            locked = self.fetch_delta(m_name, module_entry["download"])
+        if locked is None:
+            locked = self.fetch_module(
+                m_name,
+                module_entry["download"],
+                module_entry.get("content_hash"),
+                archive,
+                self.find_mirrors(origin_store, m_name, module_entry),
+            )
+        if locked is None:
+            return
+
+        # record in lockfile
+        with helper.edit_lock() as lock:
+            lock["modules"][m_name] = {
+                "source": target_install,
+                "origin": target_install.split("@", 1)[1],
+                **locked,
+            }
+
+        # precompile bytecode
+        helper.compile_modules([m_name], install_config["checked_hash"])
+
+        # add to framerpkg
+        run(["module", "--sync-pkg"])
+
+        # scan dependencies
+        PipBatch.add(module_entry["require"].get("pip_dependencies", []))
+        require = module_entry["require"]["dependencies"]
+        for r in require:
+            run(["module", "--install", r])
+        logger(f"Install Done")
+
+    # same module from several origins, identical file.zip
+    @staticmethod
+    def same_content(origin_store, keys: list) -> bool:
+        entries = [origin_store.get(key) or {} for key in keys]
+        return (
+            len({key.split("@")[0] for key in keys}) == 1
+            and entries[0].get("content_hash") is not None
+            and all(
+                e.get("content_hash") == entries[0]["content_hash"] for e in entries
+            )
+        )
+
+    # declared mirrors and origins serving the same content hash
+    @staticmethod
+    def find_mirrors(origin_store, m_name: str, module_entry: dict) -> list:
+        from .. import search
+
+        mirrors = list(module_entry.get("mirrors", []))
+        content_hash = module_entry.get("content_hash")
+        if content_hash is not None:
+            for key, _ in origin_store.named(search.normalize(m_name)):
+                entry = origin_store.get(key)
+                if (
+                    key.split("@")[0] == m_name
+                    and entry.get("content_hash") == content_hash
+                ):
+                    mirrors += [entry["download"], *entry.get("mirrors", [])]
+        return [m for m in dict.fromkeys(mirrors) if m != module_entry["download"]]
+
+    @staticmethod
+    def fetch_module(
+        m_name: str,
+        download: str,
+        content_hash: str = None,
+        archive: bool = False,
+        mirrors=(),
+    ):
+        import zipfile
+
+        # make install dir
+        helper.clean_dir("./framer_download_cache")
+
+        # get file, mirrors pick the fastest healthy origin
+        if len(mirrors) > 0:
+            status = ModuleInstallAction.mirror_file_get(
+                [download, *mirrors], "./framer_download_cache/file.zip", content_hash
+            )
+        else:
+            status = ModuleInstallAction.http_file_get(
+                download,
+                "./framer_download_cache/file.zip",
+            )
+        if status == False:
+            helper.clean_dir("./framer_download_cache", remove=True)
+            return None
+
+        # verify file
+        file_hash = helper.hash_file("./framer_download_cache/file.zip")
+        if content_hash is not None and file_hash != content_hash:
+            logger(f"Module {m_name} Hash Mismatch, Expect {content_hash}")
+            helper.clean_dir("./framer_download_cache", remove=True)
+            return None
+
+        # keep as zip for zipimport
+        if archive:
+            helper.clean_dir(f"./framer_modules/{m_name}", remove=True)
+            helper.create_module_archive(
+                "./framer_download_cache/file.zip",
+                f"./framer_modules/{m_name}.zip",
+                m_name,
+            )
+
+        # extract file
+        else:
+            if os.path.isfile(f"./framer_modules/{m_name}.zip"):
+                os.remove(f"./framer_modules/{m_name}.zip")
+            helper.clean_dir(f"./framer_modules/{m_name}")
+            with zipfile.ZipFile("./framer_download_cache/file.zip", "r") as zf:
+                zf.extractall(f"./framer_modules/{m_name}")
+
+        # remove cache
+        helper.clean_dir("./framer_download_cache", remove=True)
+        locked = {
+            "download": download,
+            "content_hash": file_hash,
+            "tree_hash": helper.hash_tree(helper.module_path(m_name)),
+        }
+        if archive:
+            locked["archive"] = True
+        if len(mirrors) > 0:
+            locked["mirrors"] = list(mirrors)
+        return locked
+
+    @staticmethod
+    def fetch_delta(m_name: str, download: str, target: str = None):
+        import zipfile
+
+        module_dir = f"./framer_modules/{m_name}"
+        base_url = download.rsplit("/", 1)[0]
+        if not os.path.isdir(module_dir):
+            return None
+
+        # get build info
+        helper.clean_dir("./framer_download_cache")
+        try:
+            status = ModuleInstallAction.http_file_get(
+                f"{base_url}/build.json", "./framer_download_cache/build.json", retry=1
+            )
+            if status == False:
+                return None
+            build = helper.json_load(
+                helper.read_file("./framer_download_cache/build.json")
+            )
+            if target is not None and build["tree_hash"] != target:
+                return None
+            locked = {
+                "download": download,
+                "content_hash": build["content_hash"],
+                "tree_hash": build["tree_hash"],
+            }
+
+            # check installed tree
+            local_hash = helper.hash_tree(module_dir)
+            if local_hash == build["tree_hash"]:
+                logger(f"Module {m_name} Already Up To Date")
+                return locked
+            delta = build.get("deltas", {}).get(local_hash)
+            if delta is None or delta["size"] >= build["size"]:
+                return None
+
+            # get delta
+            status = ModuleInstallAction.http_file_get(
+                f"{base_url}/{delta['file']}", "./framer_download_cache/delta.zip"
+            )
+            if status == False:
+                return None
+            if (
+                helper.hash_file("./framer_download_cache/delta.zip")
+                != delta["content_hash"]
+            ):
+                logger(f"Module {m_name} Delta Hash Mismatch")
+                return None
+
+            # apply delta
+            with zipfile.ZipFile("./framer_download_cache/delta.zip", "r") as zf:
+                zf.extractall(module_dir)
+            for fname in delta["delete"]:
+                if os.path.isfile(f"{module_dir}/{fname}"):
+                    os.remove(f"{module_dir}/{fname}")
+            if helper.hash_tree(module_dir) != build["tree_hash"]:
+                logger(f"Module {m_name} Delta Result Mismatch")
+                return None
+            logger(
+                "Module {} Updated By Delta, {} Of {} Bytes".format(
+                    m_name, delta["size"], build["size"]
+                )
+            )
+            return locked
+        finally:
+            helper.clean_dir("./framer_download_cache", remove=True)
+
+    @staticmethod
+    def mirror_file_get(urls: list, save_to: str, content_hash: str = None) -> bool:
+        from .. import mirror
+
+        try:
+            mirror.Downloader(urls, logger=logger).download(save_to, content_hash)
+            return True
+        except KeyboardInterrupt:
+            logger("KeyboardInterrupt, Stop Fetch...")
+            return False
+        except mirror.MirrorError as e:
+            logger(f"Fetch Failed: {e}")
+            return False
+
+    @staticmethod
+    def http_file_get(url: str, save_to: str, retry=3) -> bool:
+        import urllib.request
+
+        logger(f"Fetch {url}")
+        while retry > 0:
+            try:
+                response = urllib.request.urlopen(
+                    urllib.request.Request(
+                        url,
+                        headers={
+                            "User-Agent": "Framer-CLI/1.0 (Official)",
+                            "Cache-Control": "no-cache",
+                            "Pragma": "no-cache",
+                        },
+                    )
+                )
+                with open(save_to, "wb") as f:
+                    f.write(response.read())
+                return True
+            except KeyboardInterrupt:
+                logger("KeyboardInterrupt, Stop Fetch...")
+                return False
+            except Exception:
+                logger(f"Fetch {url} Failed, Retry {retry}...")
+                retry -= 1
+        logger(f"Fetch {url} Failed")
+        return False
+
+
+class ModuleSyncBackAction(argparse.Action):
+    def __call__(self, parser, namespace, values, option_string=None):
+        with PipBatch():
+            self.sync_back()
+
+            # pip dependencies of every module in the project
+            for module_name in helper.load_installed_modules():
+                PipBatch.add(
+                    helper.load_require(module_name).get("pip_dependencies", [])
+                )
+
+    def sync_back(self):
+        framerpkg = helper.load_framerpkg()
+        module_list = framerpkg["modules"]
+
+        # check framer_modules
+        if helper.no_framer_modules():
+            helper.clean_dir("./framer_modules")
+
+        # overwrite resolves everything from origins again
+        if install_config["overwrite"] == True:
+            self.sync_from_origins(module_list)
+            return
+
+        # check installed trees against lockfile
+        lock = helper.load_lock()
+        installed_modules = helper.load_installed_modules()
+        fetched_modules = []
+        unresolved = []
+        for module_name in module_list:
+            locked = lock["modules"].get(module_name)
+
+            # not locked, local module or never installed
+            if locked is None:
+                if module_name not in installed_modules:
+                    unresolved.append(module_name)
+                continue
+
+            # up to date
+            archive = locked.get("archive", False)
+            if (
+                module_name in installed_modules
+                and helper.is_archive(module_name) == archive
+                and locked["tree_hash"]
+                == helper.hash_tree(helper.module_path(module_name))
+            ):
+                continue
+
+            # fetch locked version
+            logger(f"Module {module_name} Out Of Sync, Fetch Locked Version...")
+            fetched = None
+            if module_name in installed_modules and not archive:
+                fetched = ModuleInstallAction.fetch_delta(
+                    module_name, locked["download"], locked["tree_hash"]
+                )
+            if fetched is None:
+                fetched = ModuleInstallAction.fetch_module(
+                    module_name,
+                    locked["download"],
+                    locked["content_hash"],
+                    archive,
+                    locked.get("mirrors", ()),
+                )
+            if fetched is None or fetched["tree_hash"] != locked["tree_hash"]:
+                logger(f"Module {module_name} Locked Version Unavailable")
+                unresolved.append(module_name)
+            else:
+                fetched_modules.append(module_name)
+
+        # precompile fetched modules together
+        if len(fetched_modules) > 0:
+            helper.compile_modules(fetched_modules, install_config["checked_hash"])
+
+        # resolve the rest from origins
+        if len(unresolved) > 0:
+            self.sync_from_origins(unresolved, replace=installed_modules)
+        logger("Sync Back Done")
+
+    def sync_from_origins(self, module_list, replace=()):
+
+        # sync origin cache
+        run(["origin", "--sync"])
+
+        # install modules
+        for module_name in module_list:
+            overwrite = install_config["overwrite"]
+            if module_name in replace:
+                install_config["overwrite"] = True
+            try:
+                run(["module", "--install", module_name])
+            finally:
+                install_config["overwrite"] = overwrite
+
+
+class ModuleCompileAction(argparse.Action):
+    def __call__(self, parser, namespace, values, option_string=None):
+        modules = helper.load_installed_modules()
+        logger("Compile Modules...")
+        count = helper.compile_modules(modules, install_config["checked_hash"])
+        logger(f"Compile Done, {count} Files")
+
+
+class ModuleCreateAction(argparse.Action):
+    def __call__(self, parser, namespace, values, option_string=None):
+
+        # init module dir
+        name = values[0]
+        logger(f"Create Module {name}...")
+        installed_modules = helper.load_installed_modules()
+        if name in installed_modules:
+            logger(f"Module {name} Already Exists")
+            return
+        helper.clean_dir(f"./framer_modules/{name}")
+
+        # create __init__.py
+        helper.write_file(
+            f"./framer_modules/{name}/__init__.py",
+            """moduleInfo = {
+    "author": "your name",
+    "description": "your description here",
+    "hooker": False,
+}
+
+from .module import moduleMain
+""",
+        )
+
+        # create module.py
+        helper.write_file(
+            f"./framer_modules/{name}/module.py",
+            """class moduleMain:
+    def __init__(self, framer, logger):
+        self.framer = framer
+        self.logger = logger
+""",
+        )
+
+        # create require.json
+        helper.write_file(
+            f"./framer_modules/{name}/require.json",
+            helper.json_dump(
+                {"dependencies": [], "option_dependencies": [], "pip_dependencies": []}
+            ),
+        )
+
+        # precompile bytecode
+        helper.compile_modules([name], install_config["checked_hash"])
+
+        # add to framerpkg
+        run(["module", "--sync-pkg"])
+        logger(f"Create Done")
@@ -0,0 +1,283 @@
+import os
+import argparse
+
+from .. import helper
+from . import logger, run
+
+# builds kept for delta packages
+maker_history = 10
+
+
+class OriginAddAction(argparse.Action):
+    def __call__(self, parser, namespace, values, option_string=None):
+
+        # origin url
+        origin = values[0]
+        logger(f"Add {origin}")
+
+        # load framerpkg
+        if helper.no_framerpkg():
+            run(["--init"])
+
+        # add origin
+        with helper.edit_framerpkg() as framerpkg:
+            if origin not in framerpkg["origins"]:
+                framerpkg["origins"].append(origin)
+        logger(f"Add Done")
+
+
+class OriginDelAction(argparse.Action):
+    def __call__(self, parser, namespace, values, option_string=None):
+        origin = values[0]
+        logger(f"Delete {origin}")
+
+        # load framerpkg
+        if helper.no_framerpkg():
+            run(["--init"])
+
+        # delete origin
+        with helper.edit_framerpkg() as framerpkg:
+            if origin in framerpkg["origins"]:
+                framerpkg["origins"].remove(origin)
+        logger(f"Delete Done")
+
+
+class OriginListAction(argparse.Action):
+    def __call__(self, parser, namespace, values, option_string=None):
+        framerpkg = helper.load_framerpkg()
+        logger("Origins: \n- {}".format("\n- ".join(framerpkg["origins"])))
+
+
+class OriginSyncAction(argparse.Action):
+    def __call__(self, parser, namespace, values, option_string=None):
+        from .. import store
+
+        framerpkg = helper.load_framerpkg()
+        origin_store = store.open_store()
+
+        # fetch origins
+        for origin_url in framerpkg["origins"]:
+            origin_map = helper.json_load(self.http_text_get(f"{origin_url}/map.json"))
+            origin_modules = origin_map["modules"]
+            origin_hashes = origin_map.get("hashes", {})
+            origin_mirrors = origin_map.get("mirrors", [])
+            origin_module_cache = {}
+
+            # fetch modules
+            for module_name in origin_modules:
+
+                # get module info
+                module_info = helper.json_load(
+                    self.http_text_get(f"{origin_url}/{module_name}/info.json")
+                )
+
+                # make new module name
+                local_module_name = "{}@{}".format(module_name, origin_map["name"])
+
+                # fetch require
+                require = helper.json_load(
+                    self.http_text_get(f"{origin_url}/{module_name}/require.json")
+                )
+
+                # save module map, mirrors serve the same file.zip
+                origin_module_cache[local_module_name] = {
+                    **module_info,
+                    "download": f"{origin_url}/{module_name}/file.zip",
+                    "content_hash": origin_hashes.get(module_name),
+                    "mirrors": [f"{m}/{module_name}/file.zip" for m in origin_mirrors],
+                    "require": require,
+                }
+
+            # save origin result
+            added, updated, removed = origin_store.sync_origin(
+                origin_url, origin_map["name"], origin_module_cache
+            )
+            logger(
+                f"Origin {origin_map['name']}: "
+                f"{added} Added, {updated} Updated, {removed} Removed"
+            )
+
+        # drop deleted origins
+        origin_store.remove_origins(framerpkg["origins"])
+        logger("Sync Done")
+
+    def http_text_get(self, url, retry=3):
+        import urllib.request
+
+        logger(f"Fetch {url}")
+        while retry > 0:
+            try:
+                response = urllib.request.urlopen(
+                    urllib.request.Request(
+                        url,
+                        headers={
+                            "User-Agent": "Framer-CLI/1.0 (Official)",
+                            "Cache-Control": "no-cache",
+                            "Pragma": "no-cache",
+                        },
+                    )
+                )
+                return response.read().decode("utf-8")
+            except KeyboardInterrupt:
+                logger("KeyboardInterrupt, Stop Fetch...")
+                return None
+            except Exception:
+                logger(f"Fetch {url} Failed, Retry {retry}...")
+                retry -= 1
+        logger(f"Fetch {url} Failed")
+        return None
+
+
+class OriginMakeAction(argparse.Action):
+    def __call__(self, parser, namespace, values, option_string=None):
+
+        # init maker dir
+        base_dir = "./maker_release"
+        if not os.path.isdir(base_dir):
+            helper.clean_dir(base_dir)
+        helper.mount_modules()
+
+        # load target modules, zip installed modules are not sources
+        modules = sorted(
+            m for m in helper.load_installed_modules() if not helper.is_archive(m)
+        )
+        logger("Target To Make: \n- {}".format("\n- ".join(modules)))
+
+        # load maker config
+        if not os.path.exists("./origin-maker.json"):
+            maker_config = {
+                "name": input("Enter Name: "),
+                "base": input("Enter Base URL: "),
+            }
+            helper.write_file("./origin-maker.json", helper.json_dump(maker_config))
+        maker_config = helper.json_load(helper.read_file("./origin-maker.json"))
+        logger(
+            "Maker Config: \n- {}".format(
+                "\n- ".join([f"{key}: {value}" for key, value in maker_config.items()])
+            )
+        )
+
+        # remove modules no longer released
+        for fname in os.listdir(base_dir):
+            if os.path.isdir(f"{base_dir}/{fname}") and fname not in modules:
+                logger(f"Remove Module {fname}")
+                helper.clean_dir(f"{base_dir}/{fname}", remove=True)
+
+        # process modules
+        changed = {}
+        for module_name in modules:
+            module_base = f"{base_dir}/{module_name}"
+            manifest = helper.hash_manifest(f"./framer_modules/{module_name}")
+            tree_hash = helper.hash_tree(f"./framer_modules/{module_name}", manifest)
+
+            # reuse unchanged build
+            build = self.load_build(module_base)
+            if (
+                build is not None
+                and build["tree_hash"] == tree_hash
+                and os.path.isfile(f"{module_base}/file.zip")
+            ):
+                logger(f"Module {module_name} Unchanged, Reuse Build")
+                continue
+            logger(f"Process Module {module_name}")
+
+            # make module dir
+            if not os.path.isdir(module_base):
+                helper.clean_dir(module_base)
+
+            # write module info
+            moduleInfo = __import__(module_name).moduleInfo
+            json_module_info = helper.json_dump(moduleInfo)
+            self.write_if_changed(f"{module_base}/info.json", json_module_info)
+            logger("Module {} Info: \n{}".format(module_name, json_module_info))
+
+            # copy version require
+            require = helper.json_dump(helper.load_require(module_name))
+            self.write_if_changed(f"{module_base}/require.json", require)
+            logger("Copy Module {} Require: \n{}".format(module_name, require))
+            changed[module_name] = (manifest, tree_hash, build)
+
+        # zip changed modules and deltas from previous builds
+        jobs = []
+        for module_name, (manifest, tree_hash, build) in changed.items():
+            source_dir = f"./framer_modules/{module_name}"
+            module_base = f"{base_dir}/{module_name}"
+            jobs.append((source_dir, f"{module_base}/file.zip", None))
+
+            # delta holds changed files, deleted files are listed in build.json
+            history = self.update_history(module_base, manifest, tree_hash, build)
+            helper.clean_dir(f"{module_base}/delta")
+            deltas = {}
+            for base_hash in history[1:]:
+                base_manifest = helper.json_load(
+                    helper.read_file(f"{module_base}/history/{base_hash}.json")
+                )
+                files = [f for f, h in manifest.items() if base_manifest.get(f) != h]
+                deltas[base_hash] = {
+                    "file": f"delta/{base_hash}.zip",
+                    "delete": sorted(set(base_manifest) - set(manifest)),
+                }
+                jobs.append((source_dir, f"{module_base}/delta/{base_hash}.zip", files))
+            changed[module_name] = (tree_hash, history, deltas)
+        if len(jobs) > 1:
+            import concurrent.futures
+
+            with concurrent.futures.ProcessPoolExecutor() as pool:
+                list(pool.map(helper.create_zip, *zip(*jobs)))
+        elif len(jobs) == 1:
+            helper.create_zip(*jobs[0])
+
+        # record builds
+        for module_name, (tree_hash, history, deltas) in changed.items():
+            module_base = f"{base_dir}/{module_name}"
+            for delta in deltas.values():
+                delta["size"] = os.path.getsize(f"{module_base}/{delta['file']}")
+                delta["content_hash"] = helper.hash_file(
+                    f"{module_base}/{delta['file']}"
+                )
+            build = {
+                "tree_hash": tree_hash,
+                "content_hash": helper.hash_file(f"{module_base}/file.zip"),
+                "size": os.path.getsize(f"{module_base}/file.zip"),
+                "history": history,
+                "deltas": deltas,
+            }
+            helper.write_file(f"{module_base}/build.json", helper.json_dump(build))
+
+        # make origin map, hashes let installs match mirrors
+        hashes = {
+            m: self.load_build(f"{base_dir}/{m}")["content_hash"] for m in modules
+        }
+        origin_map = helper.json_dump(
+            {**maker_config, "modules": modules, "hashes": hashes}
+        )
+        self.write_if_changed(f"{base_dir}/map.json", origin_map)
+        logger(f"Make Origin Map: \n{origin_map}")
+        logger(f"Make Done, {len(changed)} Of {len(modules)} Modules Rebuilt")
+
+    @staticmethod
+    def update_history(module_base, manifest, tree_hash, build):
+        history = [] if build is None else build.get("history", [])
+        history = [tree_hash] + [h for h in history if h != tree_hash]
+        history = history[:maker_history]
+
+        # keep manifests of recent builds only
+        history_dir = f"{module_base}/history"
+        os.makedirs(history_dir, exist_ok=True)
+        helper.write_file(f"{history_dir}/{tree_hash}.json", helper.json_dump(manifest))
+        for fname in os.listdir(history_dir):
+            if fname.removesuffix(".json") not in history:
+                os.remove(f"{history_dir}/{fname}")
+        return history
+
+    @staticmethod
+    def load_build(module_base):
+        if not os.path.isfile(f"{module_base}/build.json"):
+            return None
+        return helper.json_load(helper.read_file(f"{module_base}/build.json"))
+
+    @staticmethod
+    def write_if_changed(path, content):
+        if os.path.isfile(path) and helper.read_file(path) == content:
+            return
+        helper.write_file(path, content)
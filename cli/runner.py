@@ -0,0 +1,353 @@
+import os
+import sys
+import time
+import argparse
+import itertools
+import threading
+import selectors
+import subprocess
+import collections
+
+# pipe sizing, linux only
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from .. import config
+from ..profiler import PROFILE_ENV
+from ..reload import RELOAD_ENV
+from . import logger, python
+
+# init runner config
+runner_config = {
+    "exit_on_finish": False,
+    "restart_on_error": False,
+    "restart_sleep": 1,
+    "restart_on_file_change": False,
+    "profile": None,
+    "hot_reload": False,
+    "capture": True,
+    "crash_lines": 200,
+}
+runner_defaults = dict(runner_config)
+
+# seconds between child exit and file change checks
+POLL_INTERVAL = 0.5
+
+# output capture, forwarded bytes beyond the backlog are dropped
+PIPE_SIZE = 1024 * 1024
+CHUNK_SIZE = PIPE_SIZE
+MAX_BACKLOG = 8 * 1024 * 1024
+
+
+def reset_config():
+    runner_config.update(runner_defaults)
+
+
+class RunnerConfigAction(argparse.Action):
+    def __call__(self, parser, namespace, values, option_string=None):
+        if option_string == "--exit-on-finish":
+            runner_config["exit_on_finish"] = True
+        if option_string == "--restart-on-error":
+            runner_config["restart_on_error"] = True
+        if option_string == "--restart-sleep":
+            runner_config["restart_sleep"] = int(values[0])
+        if option_string == "--restart-on-file-change":
+            runner_config["restart_on_file_change"] = True
+        if option_string == "--profile":
+            runner_config["profile"] = values if values is not None else "on"
+        if option_string == "--hot-reload":
+            runner_config["hot_reload"] = True
+        if option_string == "--no-capture":
+            runner_config["capture"] = False
+        if option_string == "--crash-lines":
+            runner_config["crash_lines"] = int(values[0])
+
+
+# child output through pipes, prefixed and forwarded in batches
+# the reader never waits on the terminal, so the child is never blocked
+class OutputCapture:
+    def __init__(self, process, generation: int, lines: int):
+        self.name = f"w{process.pid} g{generation}"
+        self.prefix = f"[{self.name}] ".encode()
+        self.lines = max(lines, 1)
+
+        # ring of whole line blocks holding at least the last lines
+        self.ring = collections.deque()
+        self.ring_lines = 0
+        self.dropped = 0
+        self.done = False
+
+        # per stream, target and unfinished line
+        self.streams = {
+            process.stdout: [sys.stdout, b""],
+            process.stderr: [sys.stderr, b""],
+        }
+
+        # forwarded batches, (target, data)
+        self.backlog = []
+        self.backlog_size = 0
+        self.ready = threading.Condition()
+
+        self.selector = selectors.DefaultSelector()
+        for pipe in self.streams:
+            os.set_blocking(pipe.fileno(), False)
+
+            # a larger pipe absorbs bursts while the reader is descheduled
+            if fcntl is not None and hasattr(fcntl, "F_SETPIPE_SZ"):
+                try:
+                    fcntl.fcntl(pipe.fileno(), fcntl.F_SETPIPE_SZ, PIPE_SIZE)
+                except OSError:
+                    pass
+            self.selector.register(pipe, selectors.EVENT_READ)
+        self.reader = threading.Thread(
+            target=self.read, name="runner:reader", daemon=True
+        )
+        self.writer = threading.Thread(
+            target=self.write, name="runner:writer", daemon=True
+        )
+        self.reader.start()
+        self.writer.start()
+
+    def read(self):
+        try:
+            while len(self.selector.get_map()) > 0:
+                for key, _ in self.selector.select():
+                    try:
+                        chunk = os.read(key.fd, CHUNK_SIZE)
+                    except BlockingIOError:
+                        continue
+                    if not chunk:
+                        self.selector.unregister(key.fileobj)
+                        key.fileobj.close()
+                        continue
+                    self.feed(key.fileobj, chunk)
+        finally:
+            self.selector.close()
+
+    def feed(self, pipe, chunk: bytes):
+        stream = self.streams[pipe]
+
+        # whole lines only, so streams sharing a terminal do not mix lines
+        data = stream[1] + chunk
+        cut = data.rfind(b"\n") + 1
+        if len(data) - cut > CHUNK_SIZE:
+            data += b"\n"
+            cut = len(data)
+        stream[1] = data[cut:]
+        if cut == 0:
+            return
+        self.queue(stream[0], data[:cut])
+
+    def queue(self, target, data: bytes):
+
+        # ring blocks are split only on dump
+        count = data.count(b"\n")
+        self.ring.append((count, data))
+        self.ring_lines += count
+        while self.ring_lines - self.ring[0][0] >= self.lines:
+            self.ring_lines -= self.ring.popleft()[0]
+
+        # prefix by byte replace, not a line loop
+        data = self.prefix + data[:-1].replace(b"\n", b"\n" + self.prefix) + b"\n"
+
+        with self.ready:
+            if self.backlog_size + len(data) > MAX_BACKLOG:
+                self.dropped += len(data)
+                return
+            self.backlog.append((target, data))
+            self.backlog_size += len(data)
+            self.ready.notify()
+
+    def write(self):
+        while True:
+            with self.ready:
+                while len(self.backlog) == 0 and not self.done:
+                    self.ready.wait()
+                if len(self.backlog) == 0:
+                    return
+                batch, self.backlog, self.backlog_size = self.backlog, [], 0
+
+            # one write per run of the same stream, order kept
+            for target, group in itertools.groupby(batch, lambda item: item[0]):
+                self.forward(target, b"".join(data for _, data in group))
+
+    def forward(self, target, data: bytes):
+        try:
+            target.buffer.write(data)
+            target.flush()
+        except (AttributeError, ValueError):
+            target.write(data.decode("UTF-8", "replace"))
+            target.flush()
+
+    # wait for output to drain, pipes kept open by grandchildren time out
+    def close(self, timeout: float = 5):
+        self.reader.join(timeout)
+
+        # unfinished last lines
+        for stream in self.streams.values():
+            if stream[1] and not self.reader.is_alive():
+                self.queue(stream[0], stream[1] + b"\n")
+                stream[1] = b""
+        with self.ready:
+            self.done = True
+            self.ready.notify()
+        self.writer.join(timeout)
+        if self.dropped > 0:
+            logger(f"Output Of {self.name} Behind, Dropped {self.dropped} Bytes")
+
+    def dump(self):
+        lines = b"".join(data for _, data in self.ring).split(b"\n")[:-1]
+        lines = lines[-self.lines :]
+        if len(lines) == 0:
+            return
+        logger(f"Last {len(lines)} Lines Of {self.name}:")
+        self.forward(sys.stderr, b"".join(self.prefix + l + b"\n" for l in lines))
+
+
+class RunnerStartAction(argparse.Action):
+    def __call__(self, parser, namespace, values, option_string=None):
+        logger("Start Runner...")
+        config.flush()
+        command = [python] + values
+        env = {}
+        if runner_config["profile"] is not None:
+            logger(f"Profiling Enabled, Rate {runner_config['profile']}")
+            env[PROFILE_ENV] = runner_config["profile"]
+        if runner_config["hot_reload"] == True:
+            logger("Hot Reload Enabled")
+            env[RELOAD_ENV] = "on"
+        self.env = {**os.environ, **env} if len(env) > 0 else None
+        self.file_watchs = []
+        if runner_config["restart_on_file_change"] == True:
+            logger("Get File Watch List...")
+            self.get_watch_list()
+            logger("Watch List: \n- {}".format("\n- ".join(self.file_watchs)))
+
+        # run command
+        self.generation = 0
+        self.capture = None
+        self.spawn(command)
+
+        # process manage
+        try:
+            while True:
+
+                # wakes on child exit, file changes are polled
+                try:
+                    self.process.wait(timeout=POLL_INTERVAL)
+                except subprocess.TimeoutExpired:
+                    pass
+
+                # check file change
+                if self.check_file_change() == True:
+                    if runner_config["restart_on_file_change"] == True:
+                        self.stop_runner()
+                        self.sleep()
+                        self.spawn(command)
+
+                if self.process.poll() != None:
+                    self.finish_capture()
+
+                    # script run finish
+                    if self.process.returncode == 0:
+                        if runner_config["exit_on_finish"] == True:
+                            break
+                        else:
+                            logger(
+                                "Runner Exit {}, Wait Next Event...".format(
+                                    self.process.returncode
+                                )
+                            )
+                            self.sleep()
+
+                    # script run error
+                    if self.process.returncode != 0:
+                        if runner_config["restart_on_error"] == True:
+                            logger(
+                                "Runner Exit {}, Restart".format(
+                                    self.process.returncode
+                                )
+                            )
+                            self.sleep()
+                            self.spawn(command)
+                        else:
+                            break
+
+        # runner exit
+        except KeyboardInterrupt:
+            logger("KeyboardInterrupt, Stop Runner...")
+            self.stop_runner()
+        finally:
+            logger("Runner Exit {}".format(self.process.returncode))
+
+    def spawn(self, command: list):
+        self.generation += 1
+        # selectors can not wait on windows pipes
+        if runner_config["capture"] == False or os.name == "nt":
+            self.process = subprocess.Popen(command, env=self.env)
+            return
+        self.process = subprocess.Popen(
+            command,
+            env=self.env,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        self.capture = OutputCapture(
+            self.process, self.generation, runner_config["crash_lines"]
+        )
+
+    # crashed children leave their last lines behind
+    def finish_capture(self):
+        if self.capture is None:
+            return
+        self.capture.close()
+        if self.process.returncode != 0:
+            self.capture.dump()
+        self.capture = None
+
+    def get_watch_list(self):
+        self.file_watchs += [
+            f"./{fname}"
+            for fname in os.listdir(".")
+            if not fname.startswith(".")
+            and fname.endswith(".py")
+            and os.path.isfile(f"./{fname}")
+        ]
+
+        # hot reloaded modules do not restart the process
+        if runner_config["hot_reload"] == False:
+            for fbase, _, fnames in os.walk("./framer_modules"):
+                self.file_watchs += [
+                    f"{fbase}/{fname}"
+                    for fname in fnames
+                    if not fname.startswith(".")
+                    and fname.endswith(".py")
+                    and os.path.isfile(f"{fbase}/{fname}")
+                ]
+        self.modified_time = {}
+        for fname in self.file_watchs:
+            self.modified_time[fname] = os.path.getmtime(fname)
+
+    def check_file_change(self):
+        for fname in self.file_watchs:
+            if os.path.getmtime(fname) != self.modified_time[fname]:
+                self.modified_time[fname] = os.path.getmtime(fname)
+                logger(f"File {fname} Changed, Restart")
+                return True
+        return False
+
+    def sleep(self):
+        time.sleep(runner_config["restart_sleep"])
+
+    def stop_runner(self):
+        try:
+            self.process.terminate()
+            self.process.wait(timeout=120)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+        if self.capture is not None:
+            self.capture.close()
+            self.capture = None
@@ -0,0 +1,177 @@
+import os
+import json
+import contextlib
+
+# advisory locks, posix only
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# config files on disk, path => ((ino, mtime_ns, size), text, data)
+_cache = {}
+
+# changes held until flush, path => data
+_pending = {}
+
+# one hidden lock file per directory, shared by its config files
+LOCK_NAME = ".framer.lock"
+
+# held lock files, lock path => [fd, depth]
+_locks = {}
+
+# defer writes until flush, set by batch sessions
+config_state = {
+    "deferred": False,
+}
+
+
+# atomic replaces always change the inode, same size writes within one
+# mtime tick do not change the rest
+def file_stat(path: str):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+def dumps(data) -> str:
+    return json.dumps(data, indent=2, ensure_ascii=False)
+
+
+def read(path: str):
+
+    # reuse parsed data while the file is unchanged
+    stat = file_stat(path)
+    cached = _cache.get(path)
+    if cached is not None and stat is not None and cached[0] == stat:
+        return cached
+    return read_fresh(path)
+
+
+def read_fresh(path: str):
+    with open(path, "r", encoding="UTF-8") as f:
+        stat = os.fstat(f.fileno())
+        text = f.read()
+    stat = stat.st_ino, stat.st_mtime_ns, stat.st_size
+    _cache[path] = (stat, text, json.loads(text))
+    return _cache[path]
+
+
+def load(path: str):
+    if path in _pending:
+        return _pending[path]
+    return read(path)[2]
+
+
+def exists(path: str) -> bool:
+    return path in _pending or os.path.isfile(path)
+
+
+def lock_path(path: str) -> str:
+    return os.path.join(os.path.dirname(path), LOCK_NAME)
+
+
+# nested and overlapping transactions share the one held lock
+def lock(path: str):
+    path = lock_path(path)
+    held = _locks.get(path)
+    if held is not None:
+        held[1] += 1
+        return
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+    _locks[path] = [fd, 1]
+
+
+def unlock(path: str):
+    path = lock_path(path)
+    held = _locks[path]
+    held[1] -= 1
+    if held[1] == 0:
+        del _locks[path]
+        os.close(held[0])
+
+
+def write(path: str, data) -> bool:
+    text = dumps(data)
+
+    # same content, keep file untouched
+    if os.path.isfile(path) and read(path)[1] == text:
+        return False
+
+    # atomic replace, readers see old or new file
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="UTF-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    _cache[path] = (file_stat(path), text, data)
+    return True
+
+
+@contextlib.contextmanager
+def transaction(path: str, default=None):
+    lock(path)
+    try:
+
+        # fresh copy, changes only land on success
+        # the locked file is parsed again, the cache may miss a quick write
+        if path in _pending:
+            data = json.loads(dumps(_pending[path]))
+        elif default is not None and not os.path.isfile(path):
+            data = json.loads(dumps(default))
+        else:
+            data = json.loads(read_fresh(path)[1])
+        yield data
+    except BaseException:
+        unlock(path)
+        raise
+
+    # write now, or keep lock until flush
+    if not config_state["deferred"]:
+        try:
+            write(path, data)
+        finally:
+            unlock(path)
+    elif path in _pending:
+        _pending[path] = data
+        unlock(path)
+    else:
+        _pending[path] = data
+
+
+def create(path: str, data):
+    with transaction(path, default=data):
+        pass
+
+
+# every pending path is written and unlocked, the first error is raised
+def flush():
+    error = None
+    for path in sorted(_pending):
+        data = _pending.pop(path)
+        try:
+            write(path, data)
+        except Exception as e:
+            error = error or e
+        finally:
+            unlock(path)
+    if error is not None:
+        raise error
+
+
+class batch:
+    def __enter__(self):
+        config_state["deferred"] = True
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        config_state["deferred"] = False
+        flush()
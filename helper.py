@@ -1,10 +1,19 @@
 import os
 import io
+import sys
 import json
 import time
-import traceback
-import shutil
-import textwrap
+
+from . import config
+from . import metrics
+
+# framer metrics
+log_messages = metrics.registry.counter(
+    "framer_log_messages_total", "Messages logged through helper.logger", ("module",)
+)
+hooked_exceptions = metrics.registry.counter(
+    "framer_hooked_exceptions_total", "Exceptions caught by the error hook", ("type",)
+)
 
 
 def logger(from_module: str, message: str, max_width: int = None):
@@ -14,6 +23,8 @@ def logger(from_module: str, message: str, max_width: int = None):
             if len(line.strip()) == 0 or len(line) <= width:
                 result.append(line)
             else:
+                import textwrap
+
                 wrapped_lines = textwrap.wrap(
                     line, width=width, break_long_words=True, replace_whitespace=False
                 )
@@ -27,6 +38,7 @@ def logger(from_module: str, message: str, max_width: int = None):
         except (AttributeError, OSError):
             return 80
 
+    log_messages.labels(from_module).inc()
     if max_width is None:
         max_width = get_terminal_width()
 
@@ -46,6 +58,10 @@ def logger(from_module: str, message: str, max_width: int = None):
 
 
 def global_except_hook(exc_type, exc_value, exc_traceback):
+    import traceback
+
+    hooked_exceptions.labels(exc_type.__name__).inc()
+
     logger(
         "ErrHooker",
         "".join(traceback.format_exception(exc_type, exc_value, exc_traceback)),
@@ -63,6 +79,8 @@ class CustomStdout(io.TextIOBase):
 
 
 def clean_dir(path: str, remove: bool = False):
+    import shutil
+
     if os.path.exists(path):
         shutil.rmtree(path)
     if not remove:
@@ -70,25 +88,58 @@ def clean_dir(path: str, remove: bool = False):
 
 
 def load_installed_modules():
-    return [
-        m
-        for m in os.listdir("./framer_modules")
-        if os.path.isdir(f"./framer_modules/{m}") and not m.startswith(".")
+    modules = []
+    for m in os.listdir("./framer_modules"):
+        if m.startswith("."):
+            continue
+        if os.path.isdir(f"./framer_modules/{m}"):
+            modules.append(m)
+
+        # zip installed module, directory wins
+        elif m.endswith(".zip") and not os.path.isdir(f"./framer_modules/{m[:-4]}"):
+            modules.append(m[:-4])
+    return modules
+
+
+def module_path(module_name: str) -> str:
+    if os.path.isdir(f"./framer_modules/{module_name}"):
+        return f"./framer_modules/{module_name}"
+    return f"./framer_modules/{module_name}.zip"
+
+
+def is_archive(module_name: str) -> bool:
+    return module_path(module_name).endswith(".zip")
+
+
+def mount_modules():
+    paths = ["./framer_modules"] + [
+        module_path(m) for m in load_installed_modules() if is_archive(m)
     ]
+    for path in paths:
+        if path not in sys.path:
+            sys.path.append(path)
 
 
-def no_framerpkg() -> bool:
-    if not os.path.exists("./framerpkg.json") or not os.path.isfile("./framerpkg.json"):
-        return True
-    return False
+# forget imported modules, the next import reads them from disk
+def purge_modules(module_names):
+    import importlib
 
+    names = set(module_names)
+    for name in list(sys.modules):
+        if name.split(".")[0] in names:
+            del sys.modules[name]
+
+    # zip archives keep their own directory caches
+    for path in list(sys.path_importer_cache):
+        if path.startswith("./framer_modules"):
+            del sys.path_importer_cache[path]
+    zip_cache = getattr(sys.modules.get("zipimport"), "_zip_directory_cache", {})
+    zip_cache.clear()
+    importlib.invalidate_caches()
 
-def no_origin_cache() -> bool:
-    if not os.path.exists("./origin-cache.json") or not os.path.isfile(
-        "./origin-cache.json"
-    ):
-        return True
-    return False
+
+def no_framerpkg() -> bool:
+    return not config.exists("./framerpkg.json")
 
 
 def no_framer_modules() -> bool:
@@ -97,34 +148,277 @@ def no_framer_modules() -> bool:
     return False
 
 
+def no_lock() -> bool:
+    return not config.exists("./framer-lock.json")
+
+
 def no_env() -> bool:
-    if not os.path.exists("./env.json") or not os.path.isfile("./env.json"):
-        return True
-    return False
+    return not config.exists("./env.json")
 
 
 def load_env():
-    with open("./env.json", "r", encoding="UTF-8") as f:
-        return json.load(f)
+    return config.load("./env.json")
+
+
+def edit_env():
+    return config.transaction("./env.json")
+
+
+def init_env():
+    config.create("./env.json", {})
 
 
 def load_framerpkg():
-    with open("./framerpkg.json", "r", encoding="UTF-8") as f:
-        return json.load(f)
+    return config.load("./framerpkg.json")
 
 
-def load_origin_cache():
-    with open("./origin-cache.json", "r", encoding="UTF-8") as f:
-        return json.load(f)
+def edit_framerpkg():
+    return config.transaction("./framerpkg.json")
+
+
+def init_framerpkg():
+    config.create(
+        "./framerpkg.json",
+        {
+            "modules": [],
+            "disable": [],
+            "origins": [],
+        },
+    )
+
+
+def load_lock():
+    if no_lock():
+        return {"modules": {}}
+    return config.load("./framer-lock.json")
+
+
+def edit_lock():
+    return config.transaction("./framer-lock.json", default={"modules": {}})
 
 
 def load_require(module_name: str):
+    import zipfile
+
+    if is_archive(module_name):
+        with zipfile.ZipFile(module_path(module_name), "r") as zf:
+            return json.loads(zf.read(f"{module_name}/require.json"))
     with open(
         f"./framer_modules/{module_name}/require.json", "r", encoding="UTF-8"
     ) as f:
         return json.load(f)
 
 
+def load_module_info(module_name: str) -> dict:
+    import ast
+
+    # literal moduleInfo is read without importing the module
+    if is_archive(module_name):
+        import zipfile
+
+        with zipfile.ZipFile(module_path(module_name), "r") as zf:
+            source = zf.read(f"{module_name}/__init__.py")
+    else:
+        with open(f"./framer_modules/{module_name}/__init__.py", "rb") as f:
+            source = f.read()
+    for node in ast.parse(source).body:
+        if isinstance(node, ast.Assign) and any(
+            isinstance(t, ast.Name) and t.id == "moduleInfo" for t in node.targets
+        ):
+            try:
+                return ast.literal_eval(node.value)
+            except ValueError:
+                break
+    return __import__(module_name).moduleInfo
+
+
+def list_tree(path: str):
+    files = []
+    for root, dirs, fnames in os.walk(path):
+        dirs[:] = [d for d in dirs if not d.startswith(".") and d != "__pycache__"]
+        for fname in fnames:
+            if fname.startswith("."):
+                continue
+            file_path = os.path.join(root, fname)
+            files.append(os.path.relpath(file_path, path).replace(os.sep, "/"))
+    return sorted(files)
+
+
+def hash_file(path: str) -> str:
+    import hashlib
+
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+def hash_manifest(path: str) -> dict:
+    import hashlib
+    import zipfile
+
+    if not path.endswith(".zip"):
+        return {fname: hash_file(f"{path}/{fname}") for fname in list_tree(path)}
+
+    # zip installed module, sources only
+    manifest = {}
+    prefix = os.path.basename(path)[:-4] + "/"
+    with zipfile.ZipFile(path, "r") as zf:
+        for fname in zf.namelist():
+            parts = fname.removeprefix(prefix).split("/")
+            if (
+                fname.endswith("/")
+                or fname.endswith(".pyc")
+                or any(p.startswith(".") or p == "__pycache__" for p in parts)
+            ):
+                continue
+            manifest["/".join(parts)] = hashlib.sha256(zf.read(fname)).hexdigest()
+    return manifest
+
+
+def hash_tree(path: str, manifest: dict = None) -> str:
+    import hashlib
+
+    if manifest is None:
+        manifest = hash_manifest(path)
+    tree_hash = hashlib.sha256()
+    for fname in sorted(manifest):
+        tree_hash.update(fname.encode("UTF-8") + b"\0")
+        tree_hash.update(bytes.fromhex(manifest[fname]))
+    return tree_hash.hexdigest()
+
+
+def create_zip(source_dir: str, zip_path: str, files: list = None):
+    import zipfile
+
+    # check target dir
+    os.makedirs(os.path.dirname(zip_path), exist_ok=True)
+    if files is None:
+        files = list_tree(source_dir)
+
+    # fixed order and timestamps, same tree gives same bytes
+    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zf:
+        for fname in sorted(files):
+            info = zipfile.ZipInfo(fname, date_time=(1980, 1, 1, 0, 0, 0))
+            info.compress_type = zipfile.ZIP_DEFLATED
+            info.external_attr = 0o644 << 16
+            with open(f"{source_dir}/{fname}", "rb") as f:
+                zf.writestr(info, f.read())
+
+
+def create_module_archive(zip_path: str, archive_path: str, module_name: str):
+    import marshal
+    import zipfile
+    import importlib.util
+
+    archive_tmp = f"{archive_path}.tmp"
+
+    # stored package layout with embedded bytecode, import never compiles
+    with zipfile.ZipFile(zip_path, "r") as src, zipfile.ZipFile(
+        archive_tmp, "w", zipfile.ZIP_STORED
+    ) as zf:
+        for fname in sorted(src.namelist()):
+            if fname.endswith("/"):
+                continue
+            arcname = f"{module_name}/{fname}"
+            data = src.read(fname)
+            zf.writestr(zipfile.ZipInfo(arcname, (1980, 1, 1, 0, 0, 0)), data)
+            if not fname.endswith(".py"):
+                continue
+            try:
+                code = compile(data, os.path.join(archive_path, arcname), "exec")
+            except SyntaxError:
+                continue
+            zf.writestr(
+                zipfile.ZipInfo(arcname + "c", (1980, 1, 1, 0, 0, 0)),
+                importlib.util.MAGIC_NUMBER
+                + (0b01).to_bytes(4, "little")
+                + importlib.util.source_hash(data)
+                + marshal.dumps(code),
+            )
+    os.replace(archive_tmp, archive_path)
+
+
+def compile_source(path: str, checked_hash: bool = False):
+    import py_compile
+
+    if checked_hash:
+        invalidation_mode = py_compile.PycInvalidationMode.CHECKED_HASH
+    else:
+        invalidation_mode = py_compile.PycInvalidationMode.TIMESTAMP
+    return py_compile.compile(path, quiet=1, invalidation_mode=invalidation_mode)
+
+
+def compile_modules(modules: list, checked_hash: bool = False) -> int:
+    import concurrent.futures
+
+    files = []
+    for m in modules:
+        if is_archive(m):
+            continue
+        path = module_path(m)
+        files += [f"{path}/{f}" for f in list_tree(path) if f.endswith(".py")]
+
+    # small batches are cheaper than starting a pool
+    if len(files) < 64:
+        results = [compile_source(f, checked_hash) for f in files]
+    else:
+        with concurrent.futures.ProcessPoolExecutor() as pool:
+            results = list(
+                pool.map(
+                    compile_source,
+                    files,
+                    [checked_hash] * len(files),
+                    chunksize=max(len(files) // (os.cpu_count() or 1) // 4, 1),
+                )
+            )
+    return len([r for r in results if r is not None])
+
+
+def pip_unsatisfied(requirements: list) -> list:
+    import re
+    import importlib.metadata
+
+    # full specifier support when packaging is around
+    try:
+        from packaging.requirements import Requirement, InvalidRequirement
+    except ImportError:
+        Requirement = None
+
+    result = []
+    for req in dict.fromkeys(r.strip() for r in requirements if r.strip() != ""):
+
+        # a malformed entry would fail the one pip run for every module
+        if Requirement is not None:
+            try:
+                parsed = Requirement(req)
+            except InvalidRequirement as e:
+                logger("Pip", f"Skip Invalid Requirement {req!r}: {e}")
+                continue
+            if parsed.marker is not None and not parsed.marker.evaluate():
+                continue
+            name = parsed.name
+        else:
+            match = re.match(r"[A-Za-z0-9][A-Za-z0-9._-]*", req)
+            if match is None:
+                logger("Pip", f"Skip Invalid Requirement {req!r}")
+                continue
+            name = match.group(0)
+
+        # check version
+        try:
+            version = importlib.metadata.version(name)
+        except importlib.metadata.PackageNotFoundError:
+            result.append(req)
+            continue
+        if Requirement is not None:
+            if not parsed.specifier.contains(version, prereleases=True):
+                result.append(req)
+        else:
+            spec = req[len(name) :].strip()
+            if spec != "" and spec != f"=={version}":
+                result.append(req)
+    return result
+
+
 def write_file(path: str, content: str):
     with open(path, "w", encoding="UTF-8") as f:
         f.write(content)
@@ -0,0 +1,83 @@
+import atexit
+
+# hook points, (name, chained)
+# chained hooks get (module_name, value) and may return a replacement
+hook_points = (
+    ("before_import", False),
+    ("after_import", True),
+    ("before_construct", True),
+    ("after_construct", True),
+    ("init_complete", False),
+    ("shutdown", False),
+)
+
+
+class Veto(Exception):
+    pass
+
+
+def compile_notify(handlers: tuple):
+    if len(handlers) == 1:
+        return handlers[0]
+
+    def notify(*args):
+        for handler in handlers:
+            handler(*args)
+
+    return notify
+
+
+def compile_chain(handlers: tuple):
+    def chain(module_name, value):
+        for handler in handlers:
+            result = handler(module_name, value)
+            if result is not None:
+                value = result
+        return value
+
+    return chain
+
+
+class Hooks:
+    __slots__ = tuple(name for name, _ in hook_points) + ("_handlers", "_shutdown")
+
+    # raised by hook handlers to skip a module
+    Veto = Veto
+
+    def __init__(self):
+        self._handlers = {name: () for name, _ in hook_points}
+        self._shutdown = False
+        for name, _ in hook_points:
+            setattr(self, name, None)
+
+    def add(self, point: str, handler):
+        if point not in self._handlers:
+            raise ValueError(f"Invalid hook point: {point}")
+        self._handlers[point] = self._handlers[point] + (handler,)
+        self.compile(point)
+        return handler
+
+    def remove(self, point: str, handler):
+        self._handlers[point] = tuple(h for h in self._handlers[point] if h != handler)
+        self.compile(point)
+
+    def compile(self, point: str):
+
+        # no handlers, call sites skip the point entirely
+        handlers = self._handlers[point]
+        if len(handlers) == 0:
+            setattr(self, point, None)
+        elif dict(hook_points)[point]:
+            setattr(self, point, compile_chain(handlers))
+        else:
+            setattr(self, point, compile_notify(handlers))
+
+    def watch_shutdown(self, framer):
+        atexit.register(self.fire_shutdown, framer)
+
+    def fire_shutdown(self, framer):
+        if self._shutdown:
+            return
+        self._shutdown = True
+        if self.shutdown is not None:
+            self.shutdown(framer)
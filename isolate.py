@@ -0,0 +1,261 @@
+import os
+import sys
+import mmap
+import atexit
+import pickle
+import struct
+
+# shared buffer header, status and payload size
+HEADER = struct.Struct(">BQ")
+STATUS_OK = 0
+STATUS_ERROR = 1
+
+# initial shared buffer size, grows with the payload
+BUFFER_SIZE = 1024 * 1024
+
+# protocol 5 pickling corrupts memory in 3.12 subinterpreters
+PROTOCOL = 4
+
+# framer package for subinterpreters
+package = __name__.split(".")[0]
+
+# isolation state, "inside" is set within a subinterpreter
+isolate_state = {
+    "inside": False,
+    "framer": None,
+}
+
+
+class IsolateError(Exception):
+    pass
+
+
+def get_interpreters():
+
+    # per-interpreter gil needs python 3.12
+    if sys.version_info < (3, 12):
+        return None
+    try:
+        import _interpreters as interpreters
+    except ImportError:
+        try:
+            import _xxsubinterpreters as interpreters
+        except ImportError:
+            return None
+    return interpreters
+
+
+def available() -> bool:
+    return not isolate_state["inside"] and get_interpreters() is not None
+
+
+def get_framer():
+    return isolate_state["framer"]
+
+
+# shared buffer, one copy per direction and no kernel transfer
+class SharedBuffer:
+    def __init__(self, fd: int = None, size: int = BUFFER_SIZE):
+        if fd is None:
+            if hasattr(os, "memfd_create"):
+                fd = os.memfd_create("framer-isolate")
+            else:
+                import tempfile
+
+                fd = os.dup(tempfile.TemporaryFile().fileno())
+            os.ftruncate(fd, size)
+        self.fd = fd
+        self.map = mmap.mmap(fd, os.fstat(fd).st_size)
+
+    def write(self, status: int, data: bytes):
+        needed = HEADER.size + len(data)
+        if needed > len(self.map):
+            os.ftruncate(self.fd, max(needed, len(self.map) * 2))
+            self.remap()
+        HEADER.pack_into(self.map, 0, status, len(data))
+        self.map[HEADER.size : needed] = data
+
+    def read(self):
+
+        # the other side may have grown the buffer
+        if os.fstat(self.fd).st_size != len(self.map):
+            self.remap()
+        status, size = HEADER.unpack_from(self.map, 0)
+        with memoryview(self.map) as view:
+            return status, pickle.loads(view[HEADER.size : HEADER.size + size])
+
+    def remap(self):
+        self.map.close()
+        self.map = mmap.mmap(self.fd, os.fstat(self.fd).st_size)
+
+    def close(self):
+        self.map.close()
+        os.close(self.fd)
+
+
+# subinterpreter side
+def serve_init(fd: int, module_name: str, log_name: str):
+    import io
+    import importlib
+    import contextlib
+
+    isolate_state["inside"] = True
+    isolate_state["buffer"] = SharedBuffer(fd)
+
+    # quiet init of the module and its dependencies
+    with contextlib.redirect_stdout(io.StringIO()):
+        framer = importlib.import_module(package).init(
+            log_name=log_name, modules=[module_name], worker=True
+        )
+    isolate_state["framer"] = framer
+    isolate_state["module"] = getattr(framer, module_name)
+
+
+def serve_call():
+    buffer = isolate_state["buffer"]
+    try:
+        _, (op, name, args, kwargs) = buffer.read()
+        value = getattr(isolate_state["module"], name)
+        if op == "call":
+            value = value(*args, **kwargs)
+        data = pickle.dumps(value, PROTOCOL)
+    except Exception as e:
+        try:
+            error = pickle.dumps(e, PROTOCOL)
+        except Exception:
+            error = pickle.dumps(IsolateError(f"{type(e).__name__}: {e}"), PROTOCOL)
+        buffer.write(STATUS_ERROR, error)
+    else:
+        buffer.write(STATUS_OK, data)
+
+
+bootstrap_script = """
+import sys
+sys.path[:] = path.split("\\0")
+import importlib
+isolate = importlib.import_module(package + ".isolate")
+isolate.serve_init(fd, module_name, log_name)
+"""
+
+call_script = """
+isolate.serve_call()
+"""
+
+
+# framer side, in-process fallback with the same interface
+class LocalInterpreter:
+    def __init__(self, module_name: str, module=None):
+        import concurrent.futures
+
+        self.module_name = module_name
+        self.module = module
+
+        # one thread per module, calls run one at a time
+        self.executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix=f"isolate:{module_name}"
+        )
+
+    def request(self, op: str, name: str, args: tuple, kwargs: dict):
+        value = getattr(self.module, name)
+        if op == "call":
+            value = value(*args, **kwargs)
+        return value
+
+    def submit(self, op: str, name: str, args: tuple = (), kwargs: dict = None):
+        return self.executor.submit(self.request, op, name, args, kwargs or {})
+
+    def close(self):
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+
+class Interpreter(LocalInterpreter):
+    def __init__(self, module_name: str, log_name: str = "Isolate"):
+        super().__init__(module_name)
+        self.interpreters = get_interpreters()
+        self.id = self.interpreters.create()
+        self.buffer = SharedBuffer()
+        try:
+            self.run(
+                bootstrap_script,
+                {
+                    "path": "\0".join(sys.path),
+                    "package": package,
+                    "fd": self.buffer.fd,
+                    "module_name": module_name,
+                    "log_name": log_name,
+                },
+            )
+        except BaseException:
+            self.close()
+            raise
+        atexit.register(self.close)
+
+    def run(self, script: str, shared: dict = None):
+
+        # 3.12 raises on failure, 3.13+ returns the exception info
+        try:
+            failure = self.interpreters.run_string(self.id, script, shared or {})
+        except Exception as e:
+            raise IsolateError(str(e)) from None
+        if failure is not None:
+            raise IsolateError(failure.formatted)
+
+    def request(self, op: str, name: str, args: tuple, kwargs: dict):
+        self.buffer.write(STATUS_OK, pickle.dumps((op, name, args, kwargs), PROTOCOL))
+        self.run(call_script)
+        status, value = self.buffer.read()
+        if status == STATUS_ERROR:
+            raise value
+        return value
+
+    def close(self):
+        if self.id is None:
+            return
+        super().close()
+        self.interpreters.destroy(self.id)
+        self.id = None
+        self.buffer.close()
+        atexit.unregister(self.close)
+
+
+class RemoteAttribute:
+    def __init__(self, interpreter: LocalInterpreter, name: str):
+        self.interpreter = interpreter
+        self.name = name
+
+    def __call__(self, *args, **kwargs):
+        return self.submit(*args, **kwargs).result()
+
+    def submit(self, *args, **kwargs):
+        return self.interpreter.submit("call", self.name, args, kwargs)
+
+    def get(self):
+        return self.interpreter.submit("get", self.name).result()
+
+
+# stands in for the module main on the framer
+class ModuleProxy:
+    def __init__(self, interpreter: LocalInterpreter):
+        self.__dict__["_interpreter"] = interpreter
+
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return RemoteAttribute(self._interpreter, name)
+
+    def __setattr__(self, name, value):
+        if name == "moduleInfo":
+            self.__dict__[name] = value
+        else:
+            raise AttributeError(f"Isolated module attributes are read-only: {name}")
+
+    def __repr__(self):
+        return f"<Isolated module {self._interpreter.module_name}>"
+
+
+def load(module_name: str, log_name: str = "Isolate") -> ModuleProxy:
+    return ModuleProxy(Interpreter(module_name, log_name))
+
+
+def wrap(module_name: str, module) -> ModuleProxy:
+    return ModuleProxy(LocalInterpreter(module_name, module))
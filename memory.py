@@ -0,0 +1,302 @@
+import os
+import gc
+import time
+import atexit
+import threading
+
+from . import helper
+from . import metrics
+from .profiler import module_of
+
+# memory config, overridden by framerpkg "memory"
+memory_defaults = {
+    "enabled": False,
+    "watch": False,
+    "frames": 8,
+    "output": "./framer-memory-{pid}.txt",
+    "interval": None,
+    "signal": "SIGUSR2",
+    "top": 5,
+    "collect": True,
+}
+
+# seconds the cli waits for a report
+REPORT_TIMEOUT = 60
+
+# "on" traces from init, "watch" arms the signal and traces on request
+MEMORY_ENV = "FRAMER_MEMORY"
+
+module_bytes = metrics.registry.gauge(
+    "framer_memory_bytes", "Traced live memory by owning module", ("module",)
+)
+
+
+# module and allocation site of raw frames, innermost module frame wins
+def site_of(frames: tuple, owner) -> tuple:
+    for filename, lineno in frames:
+        module = owner(filename)
+        if module[0] != "[":
+            return module, f"{filename}:{lineno}"
+    filename, lineno = frames[0]
+    return owner(filename), f"{filename}:{lineno}"
+
+
+def report_path(output: str, pid: int) -> str:
+    return output.format(pid=pid)
+
+
+class Inspector:
+    def __init__(self, config: dict = None):
+        self.config = {**memory_defaults, **(config or {})}
+        self.sites = {}
+        self.owners = {}
+        self.lock = threading.Lock()
+        self.thread = None
+        self.stopped = threading.Event()
+        self.report_requested = threading.Event()
+        self.baseline = None
+        self.previous = None
+        self.reports = 0
+
+    def start(self):
+        import tracemalloc
+
+        with self.lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(self.config["frames"])
+                helper.logger(
+                    "Memory", f"Tracing Allocations, {self.config['frames']} Frames"
+                )
+        self.watch()
+
+    # reports on signal or interval, tracing starts on the first report
+    def watch(self):
+        if self.thread is not None:
+            return
+
+        # the handler only wakes the inspector
+        armed = False
+        signal_name = self.config["signal"]
+        if signal_name and threading.current_thread() is threading.main_thread():
+            import signal
+
+            if hasattr(signal, signal_name):
+                try:
+                    signal.signal(
+                        getattr(signal, signal_name),
+                        lambda signum, frame: self.report_requested.set(),
+                    )
+                    armed = True
+                except ValueError:
+                    pass
+        if not armed and self.config["interval"] is None:
+            return
+
+        self.stopped.clear()
+        self.thread = threading.Thread(
+            target=self.run, name="memory:inspector", daemon=True
+        )
+        self.thread.start()
+        atexit.register(self.stop)
+
+    def run(self):
+        interval = self.config["interval"]
+        while not self.stopped.is_set():
+            self.report_requested.wait(interval)
+            if self.stopped.is_set():
+                return
+            self.report_requested.clear()
+            try:
+                self.write()
+            except Exception as e:
+                helper.logger("Memory", f"Report Failed: {e}")
+
+    def tracing(self) -> bool:
+        import tracemalloc
+
+        return tracemalloc.is_tracing()
+
+    # live allocations, (module, site) => [size, count]
+    def snapshot(self) -> dict:
+        import tracemalloc
+
+        # cycles waiting for collection are not leaks
+        if self.config["collect"]:
+            gc.collect()
+
+        # live blocks grouped by traceback, oldest frame first
+        statistics = tracemalloc.take_snapshot().statistics("traceback")
+
+        # tracebacks repeat across snapshots, sites are resolved once
+        # only live tracebacks are kept, the cache must not leak itself
+        sites, live = self.sites, {}
+        result = {}
+        for stat in statistics:
+            traceback, size, count = stat.traceback, stat.size, stat.count
+            site = sites.get(traceback)
+            if site is None:
+                frames = [(f.filename, f.lineno) for f in reversed(traceback)]
+                site = site_of(frames, self.owner) if frames else ("[other]", "?")
+            live[traceback] = site
+
+            # the inspector's own allocations
+            if len(traceback) > 0 and traceback[-1].filename == __file__:
+                continue
+            entry = result.get(site)
+            if entry is None:
+                result[site] = [size, count]
+            else:
+                entry[0] += size
+                entry[1] += count
+        self.sites = live
+        return result
+
+    def owner(self, filename: str) -> str:
+        module = self.owners.get(filename)
+        if module is None:
+            module = self.owners[filename] = module_of(filename)
+        return module
+
+    # per module totals, module => [size, count]
+    def modules(self, snapshot: dict) -> dict:
+        result = {}
+        for (module, _), (size, count) in snapshot.items():
+            entry = result.setdefault(module, [0, 0])
+            entry[0] += size
+            entry[1] += count
+        return result
+
+    # growth per module since the last report and the baseline
+    def report(self) -> dict:
+        import tracemalloc
+
+        with self.lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(self.config["frames"])
+            snapshot = self.snapshot()
+            modules = self.modules(snapshot)
+            previous = self.previous if self.previous is not None else snapshot
+            baseline = self.baseline if self.baseline is not None else snapshot
+            last_modules = self.modules(previous)
+            base_modules = self.modules(baseline)
+
+            # site growth since the last report, grouped by module
+            sites = {}
+            for site, (size, _) in snapshot.items():
+                last = previous.get(site, (0, 0))[0]
+                if size != last:
+                    sites.setdefault(site[0], []).append((size - last, site[1], size))
+            for site, (size, _) in previous.items():
+                if site not in snapshot:
+                    sites.setdefault(site[0], []).append((-size, site[1], 0))
+
+            result = {}
+            for module in set(modules) | set(last_modules) | set(base_modules):
+                size, count = modules.get(module, (0, 0))
+                top = sorted(sites.get(module, ()), reverse=True)
+                result[module] = {
+                    "size": size,
+                    "count": count,
+                    "growth": size - last_modules.get(module, (0, 0))[0],
+                    "growth_total": size - base_modules.get(module, (0, 0))[0],
+                    "sites": top[: self.config["top"]],
+                }
+                module_bytes.labels(module).set(size)
+
+            self.previous = snapshot
+            if self.baseline is None:
+                self.baseline = snapshot
+            self.reports += 1
+            return result
+
+    def reset_baseline(self):
+        with self.lock:
+            self.baseline = None
+            self.previous = None
+
+    def format(self, result: dict) -> str:
+        import tracemalloc
+
+        traced, peak = tracemalloc.get_traced_memory()
+        lines = [
+            f"Framer Memory Report, PID {os.getpid()}, "
+            f"{time.strftime('%Y-%m-%d %H:%M:%S')}, Report {self.reports}",
+            f"Traced {format_size(traced)}, Peak {format_size(peak)}, "
+            f"Uncollectable {len(gc.garbage)}, GC Counts {gc.get_count()}",
+            "",
+            f"{'MODULE':<24} {'SIZE':>10} {'BLOCKS':>9} {'SINCE LAST':>11} "
+            f"{'SINCE BASE':>11}",
+        ]
+        ordered = sorted(
+            result.items(), key=lambda item: (item[1]["growth"], item[1]["size"])
+        )
+        for module, info in reversed(ordered):
+            lines.append(
+                f"{module:<24} {format_size(info['size']):>10} {info['count']:>9} "
+                f"{format_size(info['growth'], True):>11} "
+                f"{format_size(info['growth_total'], True):>11}"
+            )
+        for module, info in reversed(ordered):
+            if info["growth"] <= 0:
+                continue
+            lines += ["", f"{module} Growing Sites:"]
+            for growth, site, size in info["sites"]:
+                lines.append(
+                    f"  {format_size(growth, True):>11} {format_size(size):>10}  {site}"
+                )
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str = None) -> str:
+        started = time.perf_counter()
+        tracing, first = self.tracing(), self.baseline is None
+        result = self.report()
+        path = path or report_path(self.config["output"], os.getpid())
+        text = self.format(result)
+        if first:
+            started_note = "" if tracing else "Tracing Started, "
+            text += f"\n{started_note}Baseline Taken, Request Again For Growth\n"
+        tmp_path = f"{path}.tmp{os.getpid()}"
+        with open(tmp_path, "w") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+        helper.logger(
+            "Memory",
+            f"Wrote Report To {path} In {time.perf_counter() - started:.2f}s",
+        )
+        return path
+
+    def stop(self):
+        if self.thread is None:
+            return
+        self.stopped.set()
+        self.report_requested.set()
+        self.thread.join()
+        self.thread = None
+        atexit.unregister(self.stop)
+
+
+def format_size(size: int, sign: bool = False) -> str:
+    prefix = "+" if sign and size > 0 else ""
+    if abs(size) < 1024:
+        return f"{prefix}{size} B"
+    for unit in ("KiB", "MiB", "GiB"):
+        size /= 1024
+        if abs(size) < 1024 or unit == "GiB":
+            return f"{prefix}{size:.1f} {unit}"
+
+
+# inspector from config or env, armed only when requested and in the main init
+def from_config(config: dict = None, main: bool = True) -> Inspector:
+    config = dict(config or {})
+    mode = os.environ.get(MEMORY_ENV)
+    if mode:
+        config["enabled"] = mode != "watch"
+        config["watch"] = True
+    inspector = Inspector(config)
+    if not main:
+        return inspector
+    if inspector.config["enabled"]:
+        inspector.start()
+    elif inspector.config["watch"]:
+        inspector.watch()
+    return inspector
@@ -0,0 +1,307 @@
+import os
+import time
+import bisect
+import threading
+
+# metrics config, overridden by framerpkg "metrics"
+metrics_defaults = {
+    "host": "127.0.0.1",
+    "port": None,
+    "file": None,
+    "interval": 15,
+}
+
+DEFAULT_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.075,
+    0.1,
+    0.25,
+    0.5,
+    0.75,
+    1.0,
+    2.5,
+    5.0,
+    7.5,
+    10.0,
+)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+# per-thread shards, only the owner thread writes its shard
+class Sharded:
+    def __init__(self, size: int):
+        self.size = size
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.shards = []
+        self.retired = [0] * size
+
+    def new_shard(self):
+        shard = [0] * self.size
+        with self.lock:
+
+            # shards of finished threads fold into the retired totals
+            live = []
+            for thread, s in self.shards:
+                if thread.is_alive():
+                    live.append((thread, s))
+                else:
+                    self.retired = [a + b for a, b in zip(self.retired, s)]
+            live.append((threading.current_thread(), shard))
+            self.shards = live
+        self.local.shard = shard
+        return shard
+
+    def totals(self) -> list:
+        with self.lock:
+            totals = list(self.retired)
+            for _, shard in self.shards:
+                for i, v in enumerate(shard):
+                    totals[i] += v
+        return totals
+
+
+# children, one per label set
+class Counter(Sharded):
+    def __init__(self):
+        super().__init__(1)
+
+    def inc(self, amount: float = 1):
+        try:
+            self.local.shard[0] += amount
+        except AttributeError:
+            self.new_shard()[0] += amount
+
+    def samples(self, name: str):
+        yield name, "", self.totals()[0]
+
+
+class Gauge:
+    def __init__(self):
+        self.value = 0
+        self.function = None
+        self.lock = threading.Lock()
+
+    def set(self, value: float):
+        self.value = value
+
+    def inc(self, amount: float = 1):
+        with self.lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1):
+        with self.lock:
+            self.value -= amount
+
+    # evaluated at export time
+    def set_function(self, function):
+        self.function = function
+
+    def samples(self, name: str):
+        yield name, "", self.function() if self.function is not None else self.value
+
+
+class Histogram(Sharded):
+    def __init__(self, buckets: tuple = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+
+        # bucket counts, +Inf count, sum
+        super().__init__(len(self.buckets) + 2)
+
+    def observe(self, value: float):
+        try:
+            shard = self.local.shard
+        except AttributeError:
+            shard = self.new_shard()
+        shard[bisect.bisect_left(self.buckets, value)] += 1
+        shard[-1] += value
+
+    def time(self):
+        return HistogramTimer(self)
+
+    def samples(self, name: str):
+        totals = self.totals()
+
+        # buckets are cumulative
+        count = 0
+        for bound, n in zip(self.buckets + (float("inf"),), totals):
+            count += n
+            yield name + "_bucket", f'le="{format_value(bound)}"', count
+        yield name + "_sum", "", totals[-1]
+        yield name + "_count", "", count
+
+
+class HistogramTimer:
+    def __init__(self, histogram: Histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start)
+
+
+kinds = {
+    "counter": Counter,
+    "gauge": Gauge,
+    "histogram": Histogram,
+}
+
+
+def format_value(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if value == float("-inf"):
+        return "-Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Family:
+    def __init__(self, name: str, help: str, kind: str, labelnames: tuple, args):
+        self.name = name
+        self.help = help
+        self.kind = kind
+        self.labelnames = tuple(labelnames)
+        self.args = args
+        self.children = {}
+
+        # unlabeled metrics bind the child methods directly
+        if len(self.labelnames) == 0:
+            child = self.labels()
+            for method in ("inc", "dec", "set", "set_function", "observe", "time"):
+                if hasattr(child, method):
+                    setattr(self, method, getattr(child, method))
+
+    def labels(self, *values, **named):
+        if named:
+            values = tuple(named[n] for n in self.labelnames)
+        child = self.children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"Metric {self.name} takes labels {self.labelnames}")
+            child = self.children.setdefault(values, kinds[self.kind](*self.args))
+        return child
+
+    def expose(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in list(self.children.items()):
+            labels = ",".join(
+                f'{n}="{escape_label(str(v))}"' for n, v in zip(self.labelnames, values)
+            )
+            for sample, extra, value in child.samples(self.name):
+                both = ",".join(l for l in (labels, extra) if l)
+                braces = f"{{{both}}}" if both else ""
+                lines.append(f"{sample}{braces} {format_value(value)}")
+        return lines
+
+
+class Metrics:
+    def __init__(self):
+        self.families = {}
+        self.lock = threading.Lock()
+        self.server = None
+
+    # get or create, a repeated name returns the same family
+    def family(self, name, help, kind, labels, args=()) -> Family:
+        family = self.families.get(name)
+        if family is None:
+            with self.lock:
+                family = self.families.get(name)
+                if family is None:
+                    family = Family(name, help, kind, labels, args)
+                    self.families[name] = family
+        if family.kind != kind or family.labelnames != tuple(labels):
+            raise ValueError(f"Metric {name} already registered as {family.kind}")
+        return family
+
+    def counter(self, name: str, help: str = "", labels: tuple = ()) -> Family:
+        return self.family(name, help, "counter", labels)
+
+    def gauge(self, name: str, help: str = "", labels: tuple = ()) -> Family:
+        return self.family(name, help, "gauge", labels)
+
+    def histogram(
+        self,
+        name: str,
+        help: str = "",
+        labels: tuple = (),
+        buckets: tuple = DEFAULT_BUCKETS,
+    ) -> Family:
+        return self.family(name, help, "histogram", labels, (buckets,))
+
+    def unregister(self, name: str):
+        with self.lock:
+            self.families.pop(name, None)
+
+    # prometheus text exposition
+    def export(self) -> str:
+        lines = []
+        for family in sorted(list(self.families.values()), key=lambda f: f.name):
+            lines.extend(family.expose())
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path: str):
+        tmp_path = f"{path}.tmp{os.getpid()}"
+        with open(tmp_path, "w") as f:
+            f.write(self.export())
+        os.replace(tmp_path, path)
+
+    # optional http endpoint, localhost by default
+    def serve(self, port: int, host: str = "127.0.0.1"):
+        import http.server
+
+        metrics = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = metrics.export().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = http.server.ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(
+            target=self.server.serve_forever, name="metrics:http", daemon=True
+        ).start()
+        return self.server.server_address
+
+    # endpoint and file dump from the framerpkg config
+    def start(self, config: dict, scheduler):
+        config = {**metrics_defaults, **(config or {})}
+        if config["port"] is not None and self.server is None:
+            self.serve(config["port"], config["host"])
+        if config["file"] is not None:
+            scheduler.every(
+                config["interval"], self.dump, config["file"], name="metrics:dump"
+            )
+
+    def close(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+
+# process registry, shared by every init
+registry = Metrics()
@@ -0,0 +1,343 @@
+import os
+import time
+import threading
+import concurrent.futures
+
+from . import config
+from . import helper
+
+# origin health, kept across installs
+HEALTH_PATH = "./origin-health.json"
+
+# mirror config, overridden by framerpkg "mirror"
+mirror_defaults = {
+    "probe_timeout": 3,
+    "probe_grace": 0.05,
+    "timeout": 30,
+    "split_size": 4 * 1024 * 1024,
+    "max_parts": 4,
+    "max_failures": 3,
+    "cooldown": 300,
+    "alpha": 0.3,
+}
+
+# estimates for origins never measured
+DEFAULT_LATENCY = 0.5
+DEFAULT_THROUGHPUT = 1024 * 1024
+
+CHUNK_SIZE = 256 * 1024
+
+HEADERS = {
+    "User-Agent": "Framer-CLI/1.0 (Official)",
+    "Cache-Control": "no-cache",
+    "Pragma": "no-cache",
+}
+
+
+class MirrorError(Exception):
+    pass
+
+
+def mirror_config() -> dict:
+    framerpkg = {} if helper.no_framerpkg() else helper.load_framerpkg()
+    return {**mirror_defaults, **framerpkg.get("mirror", {})}
+
+
+# origin base of a module download, <base>/<module>/file.zip
+def origin_of(url: str) -> str:
+    return url.rsplit("/", 2)[0]
+
+
+def open_url(url: str, timeout: float, start: int = None, end: int = None):
+    import urllib.request
+
+    headers = dict(HEADERS)
+    if start is not None:
+        headers["Range"] = f"bytes={start}-{end}"
+    return urllib.request.urlopen(
+        urllib.request.Request(url, headers=headers), timeout=timeout
+    )
+
+
+class Health:
+    def __init__(self, config: dict, path: str = HEALTH_PATH):
+        self.config = config
+        self.path = path
+        self.lock = threading.Lock()
+        self.origins = {}
+        if os.path.isfile(path):
+            self.origins = config_load(path).get("origins", {})
+        self.changed = set()
+
+    def get(self, origin: str) -> dict:
+        return self.origins.get(origin) or {
+            "latency": None,
+            "throughput": None,
+            "failures": 0,
+            "failed_at": 0,
+            "successes": 0,
+        }
+
+    # exponentially weighted, recent transfers count most
+    def record(
+        self,
+        origin: str,
+        latency: float = None,
+        size: int = 0,
+        elapsed: float = 0,
+        failed: bool = False,
+    ):
+        alpha = self.config["alpha"]
+        with self.lock:
+            entry = self.get(origin)
+            # probes answer fine from origins failing real transfers
+            if failed:
+                entry["failures"] += 1
+                entry["failed_at"] = time.time()
+            elif size > 0:
+                entry["failures"] = 0
+                entry["successes"] += 1
+            if latency is not None:
+                last = entry["latency"]
+                entry["latency"] = (
+                    latency if last is None else last + alpha * (latency - last)
+                )
+
+            # small transfers measure latency, not throughput
+            if size >= CHUNK_SIZE and elapsed > 0:
+                rate = size / elapsed
+                last = entry["throughput"]
+                entry["throughput"] = (
+                    rate if last is None else last + alpha * (rate - last)
+                )
+            self.origins[origin] = entry
+            self.changed.add(origin)
+
+    def healthy(self, origin: str) -> bool:
+        entry = self.get(origin)
+        if entry["failures"] < self.config["max_failures"]:
+            return True
+        return time.time() - entry["failed_at"] > self.config["cooldown"]
+
+    # expected seconds to fetch size bytes, recent failures count as retries
+    def estimate(self, origin: str, size: int) -> float:
+        entry = self.get(origin)
+        latency = entry["latency"] if entry["latency"] is not None else DEFAULT_LATENCY
+        throughput = entry["throughput"] or DEFAULT_THROUGHPUT
+        return (latency + size / throughput) * (1 + entry["failures"])
+
+    def rank(self, urls: list, size: int) -> list:
+        healthy = [u for u in urls if self.healthy(origin_of(u))]
+        unhealthy = [u for u in urls if u not in healthy]
+        key = lambda u: self.estimate(origin_of(u), size)
+        return sorted(healthy, key=key) + sorted(unhealthy, key=key)
+
+    # merged into the file, other installs may have written meanwhile
+    def save(self):
+        if len(self.changed) == 0:
+            return
+        with config.transaction(self.path, default={"origins": {}}) as data:
+            for origin in self.changed:
+                data["origins"][origin] = self.origins[origin]
+        self.changed = set()
+
+
+def config_load(path: str) -> dict:
+    try:
+        return config.load(path)
+    except ValueError:
+        return {}
+
+
+# time to first byte, size and range support of one mirror
+def probe(url: str, timeout: float):
+    started = time.perf_counter()
+    with open_url(url, timeout, 0, 0) as response:
+        latency = time.perf_counter() - started
+        content_range = response.headers.get("Content-Range")
+        if response.status == 206 and content_range is not None:
+            return latency, int(content_range.rsplit("/", 1)[1]), True
+        length = response.headers.get("Content-Length")
+        return latency, int(length) if length is not None else None, False
+
+
+def fetch(url: str, path: str, timeout: float, start: int = None, end: int = None):
+    started = time.perf_counter()
+    size = 0
+    with open_url(url, timeout, start, end) as response:
+        latency = time.perf_counter() - started
+        if start is not None and response.status != 206:
+            raise MirrorError(f"{url} Ignored Range Request")
+
+        # parts write into their own slice of the file
+        with open(path, "r+b" if start is not None else "wb") as f:
+            if start is not None:
+                f.seek(start)
+            while True:
+                chunk = response.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                f.write(chunk)
+                size += len(chunk)
+    if start is not None and size != end - start + 1:
+        raise MirrorError(f"{url} Returned {size} Of {end - start + 1} Bytes")
+    return latency, size, time.perf_counter() - started
+
+
+class Downloader:
+    def __init__(self, urls: list, config: dict = None, logger=None):
+        self.urls = list(dict.fromkeys(urls))
+        self.config = config or mirror_config()
+        self.health = Health(self.config)
+        self.logger = logger or (lambda message: helper.logger("Mirror", message))
+
+    # parallel probes, stragglers slower than twice the first answer are
+    # left running and keep their recorded health
+    def probe_all(self) -> dict:
+        result = {}
+        timeout = self.config["probe_timeout"]
+        pool = concurrent.futures.ThreadPoolExecutor(len(self.urls))
+        futures = {pool.submit(probe, url, timeout): url for url in self.urls}
+        pending = set(futures)
+        started = time.monotonic()
+        deadline = started + timeout
+        try:
+            while len(pending) > 0:
+                done, pending = concurrent.futures.wait(
+                    pending,
+                    max(deadline - time.monotonic(), 0),
+                    concurrent.futures.FIRST_COMPLETED,
+                )
+                if len(done) == 0:
+                    break
+                for future in done:
+                    url = futures[future]
+                    origin = origin_of(url)
+                    try:
+                        latency, size, ranges = future.result()
+                    except Exception as e:
+                        self.logger(f"Probe {origin} Failed: {e}")
+                        self.health.record(origin, failed=True)
+                        continue
+                    self.health.record(origin, latency=latency)
+                    result[url] = (size, ranges)
+                    if len(result) == 1:
+                        waited = time.monotonic() - started
+                        deadline = min(
+                            deadline, started + waited * 2 + self.config["probe_grace"]
+                        )
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+        return result
+
+    def fetch_whole(self, url: str, path: str, content_hash: str = None) -> bool:
+        origin = origin_of(url)
+        self.logger(f"Fetch {url}")
+        try:
+            latency, size, elapsed = fetch(url, path, self.config["timeout"])
+        except KeyboardInterrupt:
+            raise
+        except Exception as e:
+            self.logger(f"Fetch From {origin} Failed: {e}")
+            self.health.record(origin, failed=True)
+            return False
+        if content_hash is not None and helper.hash_file(path) != content_hash:
+            self.logger(f"Content From {origin} Mismatch, Skip Mirror")
+            self.health.record(origin, failed=True)
+            return False
+        self.health.record(origin, latency, size, elapsed)
+        return True
+
+    # byte ranges split by expected throughput, failed parts move on
+    def fetch_split(self, urls: list, size: int, path: str):
+        urls = urls[: self.config["max_parts"]]
+        rates = [
+            self.health.get(origin_of(u))["throughput"] or DEFAULT_THROUGHPUT
+            for u in urls
+        ]
+        total = sum(rates)
+        parts, start = [], 0
+        for i, (url, rate) in enumerate(zip(urls, rates)):
+            end = (
+                size - 1 if i == len(urls) - 1 else start + int(size * rate / total) - 1
+            )
+            if end >= start:
+                parts.append((url, start, end))
+            start = end + 1
+        self.logger(
+            "Fetch {} Bytes In {} Parts From {}".format(
+                size, len(parts), ", ".join(origin_of(u) for u, _, _ in parts)
+            )
+        )
+        with open(path, "wb") as f:
+            f.truncate(size)
+
+        def run_part(part):
+            url, start, end = part
+            for candidate in [url] + [u for u in urls if u != url]:
+                origin = origin_of(candidate)
+                try:
+                    latency, got, elapsed = fetch(
+                        candidate, path, self.config["timeout"], start, end
+                    )
+                except Exception as e:
+                    self.logger(f"Part {start}-{end} From {origin} Failed: {e}")
+                    self.health.record(origin, failed=True)
+                    continue
+                self.health.record(origin, latency, got, elapsed)
+                return candidate
+            return None
+
+        # serving mirror of each part, None when a part failed everywhere
+        with concurrent.futures.ThreadPoolExecutor(len(parts)) as pool:
+            served = list(pool.map(run_part, parts))
+        return None if None in served else served
+
+    def download(self, path: str, content_hash: str = None) -> str:
+        try:
+            probed = self.probe_all() if len(self.urls) > 1 else {}
+            size = max((s for s, _ in probed.values() if s is not None), default=0)
+            ranked = self.health.rank(self.urls, size)
+
+            # mirrors failing the probe go last
+            if len(probed) > 0:
+                ranked = [u for u in ranked if u in probed] + [
+                    u for u in ranked if u not in probed
+                ]
+            self.logger(
+                "Mirrors By Expected Time: \n- {}".format(
+                    "\n- ".join(
+                        "{} {:.3f}s".format(
+                            origin_of(u), self.health.estimate(origin_of(u), size)
+                        )
+                        for u in ranked
+                    )
+                )
+            )
+
+            # large files from several range capable mirrors, verified whole
+            ranged = [u for u in ranked if probed.get(u, (None, False))[1]]
+            ranged = [
+                u for u in ranged if self.health.get(origin_of(u))["failures"] == 0
+            ]
+            if (
+                content_hash is not None
+                and size >= self.config["split_size"]
+                and len(ranged) > 1
+            ):
+                served = self.fetch_split(ranged, size, path)
+                if served is not None and helper.hash_file(path) == content_hash:
+                    return served[0]
+                self.logger("Split Fetch Failed, Fetch Whole File")
+
+            # fastest healthy mirror first, fail over in rank order
+            for url in ranked:
+                if self.fetch_whole(url, path, content_hash):
+                    return url
+            raise MirrorError("All Mirrors Failed")
+        finally:
+            self.health.save()
+
+
+def download(urls: list, path: str, content_hash: str = None) -> str:
+    return Downloader(urls).download(path, content_hash)
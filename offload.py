@@ -0,0 +1,188 @@
+import os
+import pickle
+import atexit
+import threading
+
+# buffers from this size go through shared memory
+SHM_THRESHOLD = 64 * 1024
+
+# offload config, overridden by framerpkg "offload"
+offload_defaults = {
+    "workers": None,
+    "modules": None,
+}
+
+# framer package for worker processes
+package = __name__.split(".")[0]
+
+# worker state
+worker_state = {
+    "framer": None,
+}
+
+# received segments, closed once nothing views them
+_attached = []
+
+
+def get_framer():
+    return worker_state["framer"]
+
+
+def pack(obj):
+    from multiprocessing import shared_memory
+
+    # large out-of-band buffers are copied once into shared memory
+    buffers = []
+
+    def buffer_callback(buffer):
+        view = buffer.raw()
+        if view.nbytes < SHM_THRESHOLD:
+            return True
+        buffers.append(view)
+        return False
+
+    data = pickle.dumps(obj, protocol=5, buffer_callback=buffer_callback)
+    segments = []
+    for view in buffers:
+        shm = shared_memory.SharedMemory(create=True, size=view.nbytes)
+        shm.buf[: view.nbytes] = view
+        segments.append((shm.name, view.nbytes))
+        shm.close()
+    return data, segments
+
+
+def unpack(packed):
+    from multiprocessing import shared_memory
+
+    # receiver owns the segments, objects view them in place
+    data, segments = packed
+    shms = [shared_memory.SharedMemory(name) for name, _ in segments]
+    for shm in shms:
+        shm.unlink()
+    try:
+        return pickle.loads(
+            data,
+            buffers=[shm.buf[:size] for shm, (_, size) in zip(shms, segments)],
+        )
+    finally:
+        _attached.extend(shms)
+        release_attached()
+
+
+def release_attached():
+    for shm in list(_attached):
+        try:
+            shm.close()
+        except BufferError:
+            continue
+        _attached.remove(shm)
+
+
+def discard(packed):
+    from multiprocessing import shared_memory
+
+    for name, _ in packed[1]:
+        try:
+            shm = shared_memory.SharedMemory(name)
+        except FileNotFoundError:
+            continue
+        shm.close()
+        shm.unlink()
+
+
+# worker process
+def worker_init(cwd: str, modules, parent_pid: int):
+    import io
+    import time
+    import importlib
+    import contextlib
+
+    os.chdir(cwd)
+
+    # exit with the parent, even when it is killed
+    def watch_parent():
+        while os.getppid() == parent_pid:
+            time.sleep(1)
+        os._exit(1)
+
+    threading.Thread(target=watch_parent, name="offload:watchdog", daemon=True).start()
+
+    # quiet init, task output still reaches stdout
+    with contextlib.redirect_stdout(io.StringIO()):
+        framer = importlib.import_module(package).init(
+            log_name="Offload", modules=modules, worker=True
+        )
+    worker_state["framer"] = framer
+
+
+def run_task(packed):
+    fn, args, kwargs = unpack(packed)
+    return pack(fn(*args, **kwargs))
+
+
+def run_batch(packed):
+    fn, items = unpack(packed)
+    return pack([fn(item) for item in items])
+
+
+class Offload:
+    def __init__(self, config: dict = None):
+        self.config = {**offload_defaults, **(config or {})}
+        self.pool = None
+        self.lock = threading.Lock()
+
+    def get_pool(self):
+        with self.lock:
+            if self.pool is None:
+                import multiprocessing
+                import concurrent.futures
+
+                self.pool = concurrent.futures.ProcessPoolExecutor(
+                    max_workers=self.config["workers"],
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=worker_init,
+                    initargs=(os.getcwd(), self.config["modules"], os.getpid()),
+                )
+                atexit.register(self.shutdown)
+            return self.pool
+
+    def submit(self, task, payload):
+        import concurrent.futures
+
+        packed = pack(payload)
+        result = concurrent.futures.Future()
+
+        # unpack in the parent when the worker is done
+        def done(future):
+            try:
+                result.set_result(unpack(future.result()))
+            except BaseException as e:
+                discard(packed)
+                result.set_exception(e)
+
+        self.get_pool().submit(task, packed).add_done_callback(done)
+        return result
+
+    def __call__(self, fn, *args, **kwargs):
+        return self.submit(run_task, (fn, args, kwargs))
+
+    def map(self, fn, iterable, chunksize: int = 1, timeout: float = None):
+        items = list(iterable)
+        futures = [
+            self.submit(run_batch, (fn, items[i : i + chunksize]))
+            for i in range(0, len(items), chunksize)
+        ]
+
+        # results in order, batch by batch
+        def results():
+            for future in futures:
+                yield from future.result(timeout)
+
+        return results()
+
+    def shutdown(self, wait: bool = True):
+        with self.lock:
+            if self.pool is not None:
+                self.pool.shutdown(wait=wait, cancel_futures=True)
+                self.pool = None
+        release_attached()
@@ -0,0 +1,234 @@
+import os
+import sys
+import time
+import atexit
+import threading
+
+from . import helper
+from . import metrics
+
+# profiler config, overridden by framerpkg "profiler"
+profiler_defaults = {
+    "enabled": False,
+    "rate": 97,
+    "output": "./framer-profile-{pid}.txt",
+    "interval": None,
+    "signal": "SIGUSR1",
+    "max_depth": 128,
+    "idle": False,
+    "max_stacks": 20000,
+}
+
+# leaf frames of threads blocked waiting, skipped unless "idle" is set
+idle_frames = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("selectors.py", "select"),
+    ("socket.py", "accept"),
+    ("socket.py", "readinto"),
+    ("queue.py", "get"),
+    ("subprocess.py", "_try_wait"),
+}
+
+# set by runner --profile, "on" or the sample rate
+PROFILE_ENV = "FRAMER_PROFILE"
+
+# framer package directory, its frames are attributed to framer
+package_dir = os.path.dirname(os.path.abspath(__file__))
+
+profile_samples = metrics.registry.counter(
+    "framer_profile_samples_total", "Profiler samples by owning module", ("module",)
+)
+
+
+# owning framer module of a source file
+def module_of(filename: str) -> str:
+    parts = filename.replace("\\", "/").split("/")
+    for i in range(len(parts) - 2, -1, -1):
+        if parts[i] == "framer_modules":
+            name = parts[i + 1]
+            return name[: -len(".zip")] if name.endswith(".zip") else name
+    if os.path.abspath(filename).startswith(package_dir + os.sep):
+        return "[framer]"
+    return "[other]"
+
+
+class Profiler:
+    def __init__(self, config: dict = None):
+        self.config = {**profiler_defaults, **(config or {})}
+        self.stacks = {}
+        self.folded = {}
+        self.owners = {}
+        self.thread = None
+        self.stopped = threading.Event()
+        self.dump_requested = threading.Event()
+        self.samples = 0
+        self.sampling_s = 0.0
+        self.started = None
+
+    def start(self):
+        if self.thread is not None:
+            return
+        self.started = time.perf_counter()
+        self.stopped.clear()
+        self.thread = threading.Thread(
+            target=self.run, name="profiler:sampler", daemon=True
+        )
+        self.thread.start()
+
+        # dump on signal, the handler only wakes the sampler
+        signal_name = self.config["signal"]
+        if signal_name and threading.current_thread() is threading.main_thread():
+            import signal
+
+            if hasattr(signal, signal_name):
+                signal.signal(
+                    getattr(signal, signal_name),
+                    lambda signum, frame: self.dump_requested.set(),
+                )
+        atexit.register(self.stop)
+        helper.logger(
+            "Profiler",
+            f"Sampling At {self.config['rate']}Hz, Output {self.output_path()}",
+        )
+
+    def run(self):
+        period = 1 / self.config["rate"]
+        interval = self.config["interval"]
+        last_dump = time.monotonic()
+        while not self.stopped.wait(period):
+            started = time.perf_counter()
+            self.sample()
+            self.sampling_s += time.perf_counter() - started
+
+            # dump on request or interval
+            if self.dump_requested.is_set() or (
+                interval is not None and time.monotonic() - last_dump >= interval
+            ):
+                self.dump_requested.clear()
+                last_dump = time.monotonic()
+                self.dump()
+
+    def sample(self):
+        own = threading.get_ident()
+        max_depth = self.config["max_depth"]
+        max_stacks = self.config["max_stacks"]
+        stacks = self.stacks
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+
+            # code objects leaf first, formatted only on dump
+            codes = []
+            while frame is not None and len(codes) < max_depth:
+                codes.append(frame.f_code)
+                frame = frame.f_back
+            key = tuple(codes)
+
+            # stack is [count, owner counter], owner found once per stack
+            stack = stacks.get(key)
+            if stack is None and len(stacks) >= max_stacks:
+                self.fold(codes)
+                continue
+            if stack is None:
+                stack = stacks[key] = [0, self.classify(codes)]
+            if stack[1] is not None:
+                stack[0] += 1
+                stack[1].inc()
+                self.samples += 1
+
+    # new stacks past max_stacks only count per owning module
+    def fold(self, codes: list):
+        counter = self.classify(codes)
+        if counter is None:
+            return
+        self.folded[counter] = self.folded.get(counter, 0) + 1
+        counter.inc()
+        self.samples += 1
+
+    def classify(self, codes: list):
+        leaf = codes[0]
+        if not self.config["idle"]:
+            if (os.path.basename(leaf.co_filename), leaf.co_name) in idle_frames:
+                return None
+
+        # innermost frame that belongs to a framer module
+        for code in codes:
+            module = self.owner(code.co_filename)
+            if module[0] != "[":
+                return profile_samples.labels(module)
+        return profile_samples.labels(self.owner(leaf.co_filename))
+
+    def owner(self, filename: str) -> str:
+        module = self.owners.get(filename)
+        if module is None:
+            module = self.owners[filename] = module_of(filename)
+        return module
+
+    # collapsed stacks, owning module first, root to leaf
+    def collapsed(self) -> list:
+        owners = {c: values[0] for values, c in profile_samples.children.items()}
+        lines = []
+        for codes, (count, counter) in list(self.stacks.items()):
+            if count == 0:
+                continue
+            frames = [
+                f"{c.co_name} ({os.path.basename(c.co_filename)}:{c.co_firstlineno})"
+                for c in reversed(codes)
+            ]
+            lines.append(f"{';'.join([owners[counter]] + frames)} {count}")
+        for counter, count in list(self.folded.items()):
+            lines.append(f"{owners[counter]};[other stacks] {count}")
+        return sorted(lines)
+
+    def module_samples(self) -> dict:
+        result = {}
+        for line in self.collapsed():
+            stack, count = line.rsplit(" ", 1)
+            owner = stack.split(";", 1)[0]
+            result[owner] = result.get(owner, 0) + int(count)
+        return result
+
+    def overhead(self) -> float:
+        if self.started is None:
+            return 0.0
+        return self.sampling_s / max(time.perf_counter() - self.started, 1e-9)
+
+    def output_path(self) -> str:
+        return self.config["output"].format(pid=os.getpid())
+
+    def dump(self, path: str = None):
+        path = path or self.output_path()
+        tmp_path = f"{path}.tmp{os.getpid()}"
+        with open(tmp_path, "w") as f:
+            f.write("\n".join(self.collapsed()) + "\n")
+        os.replace(tmp_path, path)
+        helper.logger(
+            "Profiler",
+            f"Wrote {self.samples} Samples To {path}, "
+            f"Overhead {self.overhead() * 100:.2f}%",
+        )
+
+    def stop(self, dump: bool = True):
+        if self.thread is None:
+            return
+        self.stopped.set()
+        self.thread.join()
+        self.thread = None
+        atexit.unregister(self.stop)
+        if dump:
+            self.dump()
+
+
+# profiler from config or runner --profile, started in the main init only
+def from_config(config: dict = None, main: bool = True) -> Profiler:
+    config = dict(config or {})
+    rate = os.environ.get(PROFILE_ENV)
+    if rate:
+        config["enabled"] = True
+        if rate != "on":
+            config["rate"] = float(rate)
+    profiler = Profiler(config)
+    if main and profiler.config["enabled"]:
+        profiler.start()
+    return profiler
@@ -0,0 +1,159 @@
+import sys
+import heapq
+
+
+class Registry:
+    __slots__ = (
+        "helper",
+        "link_to",
+        "env",
+        "logger",
+        "bus",
+        "hooks",
+        "offload",
+        "scheduler",
+        "metrics",
+        "profiler",
+        "memory",
+        "reload",
+        "_table",
+        "_info",
+        "_links",
+    )
+
+    # core fields, everything else goes to the module table
+    core_fields = (
+        "helper",
+        "link_to",
+        "env",
+        "logger",
+        "bus",
+        "hooks",
+        "offload",
+        "scheduler",
+        "metrics",
+        "profiler",
+        "memory",
+        "reload",
+    )
+
+    def __init__(self, helper, link_to=None):
+        object.__setattr__(self, "_table", {})
+        object.__setattr__(self, "_info", {})
+        object.__setattr__(self, "_links", [])
+        self.helper = helper
+        self.link_to = link_to
+
+    # module table
+    def register(self, name: str, obj, info: dict = None):
+        if hasattr(Registry, name):
+            raise ValueError(f"Module name {name} is reserved by Framer")
+        self._table[name] = obj
+        if info is not None:
+            self._info[name] = info
+        self.publish(name, obj)
+
+    def unregister(self, name: str):
+        self._table.pop(name, None)
+        self._info.pop(name, None)
+        for link in self._links:
+            link.__dict__.pop(name, None)
+
+    def module_names(self) -> list:
+        return list(self._table)
+
+    def module_info(self, name: str) -> dict:
+        return self._info.get(name)
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        try:
+            return self._table[name]
+        except KeyError:
+            raise AttributeError(f"Framer has no module {name}") from None
+
+    def __setattr__(self, name, value):
+        if name in Registry.core_fields:
+            object.__setattr__(self, name, value)
+            self.publish(name, value)
+        else:
+            self.register(name, value)
+
+    def __delattr__(self, name):
+        if name in Registry.core_fields:
+            object.__delattr__(self, name)
+            for link in self._links:
+                link.__dict__.pop(name, None)
+        else:
+            self.unregister(name)
+
+    def __contains__(self, name):
+        return name in self._table
+
+    def __iter__(self):
+        return iter(self._table.values())
+
+    def __len__(self):
+        return len(self._table)
+
+    def __dir__(self):
+        core = [f for f in Registry.core_fields if hasattr(self, f)]
+        return sorted(set(object.__dir__(self)) | set(core) | set(self._table))
+
+    def __repr__(self):
+        return "<Framer modules: {}>".format(", ".join(self._table))
+
+    # link to a caller module
+    def link(self, module_name: str):
+        module = sys.modules[module_name]
+
+        # attribute access and from-imports resolve through the registry
+        def link_getattr(name):
+            try:
+                return getattr(self, name)
+            except AttributeError:
+                raise AttributeError(
+                    f"module {module_name!r} has no attribute {name!r}"
+                ) from None
+
+        module.__getattr__ = link_getattr
+        self._links.append(module)
+
+        # bare global lookups skip module __getattr__, publish names
+        for name in Registry.core_fields:
+            if hasattr(self, name):
+                module.__dict__[name] = getattr(self, name)
+        module.__dict__.update(self._table)
+
+    def publish(self, name: str, value):
+        for link in self._links:
+            link.__dict__[name] = value
+
+
+def dependency_order(modules: list, requires: dict) -> list:
+
+    # stable topological sort, ties keep the given order
+    index = {m: i for i, m in enumerate(modules)}
+    waiting = {
+        m: {d for d in requires.get(m, []) if d in index and d != m} for m in modules
+    }
+    dependents = {m: [] for m in modules}
+    for m, deps in waiting.items():
+        for d in deps:
+            dependents[d].append(m)
+
+    ready = [index[m] for m, deps in waiting.items() if len(deps) == 0]
+    heapq.heapify(ready)
+    result = []
+    while ready:
+        m = modules[heapq.heappop(ready)]
+        result.append(m)
+        for dependent in dependents[m]:
+            waiting[dependent].discard(m)
+            if len(waiting[dependent]) == 0:
+                heapq.heappush(ready, index[dependent])
+
+    # cycles keep their given order
+    placed = set(result)
+    return result + [m for m in modules if m not in placed]
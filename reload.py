@@ -0,0 +1,229 @@
+import os
+import time
+import threading
+
+from . import helper
+from . import metrics
+from . import isolate
+from . import registry
+
+# reload config, overridden by framerpkg "reload"
+reload_defaults = {
+    "enabled": False,
+    "interval": 1.0,
+}
+
+# set by runner --hot-reload
+RELOAD_ENV = "FRAMER_RELOAD"
+
+module_reloads = metrics.registry.counter(
+    "framer_module_reloads_total",
+    "Hot reloads by module and result",
+    ("module", "result"),
+)
+
+
+# file stats of one module, directory or zip archive
+def scan_module(module_name: str) -> tuple:
+    path = helper.module_path(module_name)
+    paths = [path]
+    if os.path.isdir(path):
+        paths = []
+        for root, dirs, files in os.walk(path):
+            dirs[:] = [d for d in dirs if not d.startswith(".") and d != "__pycache__"]
+            paths += [os.path.join(root, f) for f in files if not f.startswith(".")]
+
+    # files may vanish while an editor saves
+    stats = []
+    for p in paths:
+        try:
+            stat = os.stat(p)
+        except FileNotFoundError:
+            continue
+        stats.append((p, stat.st_mtime_ns, stat.st_size))
+    return tuple(sorted(stats))
+
+
+# timestamp pycs only store whole seconds, a quick edit can look unchanged
+def drop_bytecode(old: tuple, new: tuple):
+    import importlib.util
+
+    for path, _, _ in set(new) - set(old or ()):
+        if not path.endswith(".py"):
+            continue
+        try:
+            cache = importlib.util.cache_from_source(path)
+            with open(cache, "rb") as f:
+                flags = f.read(8)[4:]
+            if flags == b"\0\0\0\0":
+                os.remove(cache)
+        except (OSError, ValueError, NotImplementedError):
+            pass
+
+
+class Reloader:
+    def __init__(
+        self, framer, log_name: str = "Framer", config: dict = None, requires=None
+    ):
+        self.framer = framer
+        self.log_name = log_name
+        self.config = {**reload_defaults, **(config or {})}
+        self.lock = threading.Lock()
+
+        # unknown fingerprints drop all bytecode of a reloaded module
+        self.fingerprints = {}
+        self.requires = dict(requires or {})
+        self.failed = set()
+        self.job = None
+
+    def logger(self, message: str):
+        helper.logger("Reload", message)
+
+    # poll module files on the scheduler
+    def start(self, scheduler):
+        if self.job is not None:
+            return
+        for m in helper.load_installed_modules():
+            self.fingerprints[m] = scan_module(m)
+        self.job = scheduler.every(
+            self.config["interval"], self.check, name="reload:watch"
+        )
+        self.logger(f"Watching Modules Every {self.config['interval']}s")
+
+    def stop(self):
+        if self.job is not None:
+            self.job.cancel()
+            self.job = None
+
+    def changed(self) -> list:
+        result = []
+        for m in helper.load_installed_modules():
+            if self.fingerprints.get(m) != scan_module(m):
+                result.append(m)
+        return result
+
+    def check(self):
+        changed = self.changed()
+        if len(changed) > 0:
+            self.reload(*changed)
+
+    # changed modules and every module depending on them
+    def affected(self, names) -> set:
+        dependents = {}
+        for m, deps in self.requires.items():
+            for dep in deps:
+                dependents.setdefault(dep, []).append(m)
+        result = set()
+        pending = list(names)
+        while len(pending) > 0:
+            m = pending.pop()
+            if m not in result and m in self.requires:
+                result.add(m)
+                pending += dependents.get(m, [])
+        return result
+
+    def reload(self, *names) -> list:
+        from . import load_module
+
+        framer = self.framer
+        with self.lock:
+            started = time.perf_counter()
+            installed = helper.load_installed_modules()
+            for m in names:
+                if m in installed:
+                    stats = scan_module(m)
+                    drop_bytecode(self.fingerprints.get(m), stats)
+                    self.fingerprints[m] = stats
+                    self.requires[m] = helper.load_require(m)["dependencies"]
+                else:
+                    self.fingerprints.pop(m, None)
+                    self.requires.pop(m, None)
+
+            # hookers patched the hook points, only a restart undoes that
+            hookers = [m for m in names if (framer.module_info(m) or {}).get("hooker")]
+            for m in hookers:
+                self.logger(f"Hooker {m} Changed, Restart To Reload")
+            affected = self.affected(m for m in names if m not in hookers)
+
+            # uninstalled modules only stop
+            for m in names:
+                if m not in installed and m in framer:
+                    self.teardown(m, getattr(framer, m))
+                    framer.unregister(m)
+
+            order = registry.dependency_order(
+                [m for m in installed if m in affected], self.requires
+            )
+            if len(order) == 0:
+                return []
+            self.logger(f"Reloading {', '.join(order)}...")
+
+            # dependents stop before their dependencies
+            for m in reversed(order):
+                if m in framer:
+                    self.teardown(m, getattr(framer, m))
+            helper.purge_modules(order)
+
+            # rebuild, each name is rebound in one step once constructed
+            disabled = set(helper.load_framerpkg()["disable"])
+            reloaded = []
+            for m in order:
+                if m in disabled:
+                    framer.unregister(m)
+                    continue
+                blocked = [d for d in self.requires[m] if d not in framer]
+                if len(blocked) > 0:
+                    self.logger(f"Skip {m}, Require {', '.join(blocked)} Not Loaded")
+                    self.fail(m)
+                    continue
+                try:
+                    info = helper.load_module_info(m)
+                    module = load_module(framer, m, info, self.log_name)
+                except framer.hooks.Veto as e:
+                    self.logger(f"Module {m} Vetoed: {e}")
+                    self.fail(m)
+                    continue
+                except Exception as e:
+                    self.logger(f"Reload {m} Failed: {type(e).__name__}: {e}")
+                    self.fail(m)
+                    continue
+                setattr(module, "moduleInfo", info)
+                framer.register(m, module, info)
+                self.failed.discard(m)
+                module_reloads.labels(m, "loaded").inc()
+                reloaded.append(m)
+            self.logger(
+                f"Reloaded {len(reloaded)}/{len(order)} Modules "
+                f"In {time.perf_counter() - started:.3f}s"
+            )
+            return reloaded
+
+    # optional moduleStop releases what the instance holds
+    def teardown(self, m: str, module):
+        try:
+            if isinstance(module, isolate.ModuleProxy):
+                try:
+                    module.moduleStop()
+                except AttributeError:
+                    pass
+                module._interpreter.close()
+            elif hasattr(module, "moduleStop"):
+                module.moduleStop()
+        except Exception as e:
+            self.logger(f"Stop {m} Failed: {type(e).__name__}: {e}")
+
+    # failed modules leave the registry and retry on the next change
+    def fail(self, m: str):
+        self.framer.unregister(m)
+        self.failed.add(m)
+        module_reloads.labels(m, "failed").inc()
+
+
+# reloader from config or runner --hot-reload
+def from_config(
+    framer, config: dict = None, log_name: str = "Framer", requires: dict = None
+) -> Reloader:
+    config = dict(config or {})
+    if os.environ.get(RELOAD_ENV):
+        config["enabled"] = True
+    return Reloader(framer, log_name, config, requires)
@@ -0,0 +1,406 @@
+import time
+import heapq
+import random
+import atexit
+import datetime
+import threading
+
+from . import helper
+
+# scheduler config, overridden by framerpkg "scheduler"
+scheduler_defaults = {
+    "workers": 4,
+    "queue_size": 1024,
+    "shutdown_timeout": 10,
+}
+
+# due timers dispatched per timer lock hold
+TIMER_BATCH = 64
+
+# seconds between queue full warnings
+FULL_LOG_INTERVAL = 10
+
+# cron fields, (low, high)
+cron_fields = (
+    (0, 59),
+    (0, 23),
+    (1, 31),
+    (1, 12),
+    (0, 7),
+)
+
+cron_aliases = {
+    "@yearly": "0 0 1 1 *",
+    "@monthly": "0 0 1 * *",
+    "@weekly": "0 0 * * 0",
+    "@daily": "0 0 * * *",
+    "@hourly": "0 * * * *",
+}
+
+
+def parse_cron(expression: str):
+    expression = cron_aliases.get(expression.strip(), expression)
+    fields = expression.split()
+    if len(fields) != len(cron_fields):
+        raise ValueError(f"Invalid cron expression: {expression}")
+
+    # each field becomes the set of allowed values
+    result = []
+    for field, (low, high) in zip(fields, cron_fields):
+        values = set()
+        for part in field.split(","):
+            part, _, step = part.partition("/")
+            if part == "*":
+                start, end = low, high
+            elif "-" in part:
+                start, end = (int(v) for v in part.split("-"))
+            else:
+                start = end = int(part)
+                if step:
+                    end = high
+            if start < low or end > high or start > end:
+                raise ValueError(f"Invalid cron field: {field}")
+            values.update(range(start, end + 1, int(step or 1)))
+        result.append(values)
+
+    # sunday is 0 or 7, python weekday counts from monday
+    result[4] = {(d - 1) % 7 for d in result[4]}
+
+    # restricted day of month and weekday match either
+    either = fields[2] != "*" and fields[4] != "*"
+    return result, either
+
+
+def cron_next(cron, after: datetime.datetime) -> datetime.datetime:
+    (minutes, hours, days, months, weekdays), either = cron
+    t = after.replace(second=0, microsecond=0) + datetime.timedelta(minutes=1)
+
+    # skip whole months, days and hours that can not match
+    # leap days can be eight years apart
+    limit = t + datetime.timedelta(days=366 * 9)
+    while t < limit:
+        if t.month not in months:
+            t = (t.replace(day=1) + datetime.timedelta(days=32)).replace(
+                day=1, hour=0, minute=0
+            )
+            continue
+        day_ok = t.day in days
+        weekday_ok = t.weekday() in weekdays
+        if not (day_ok or weekday_ok if either else day_ok and weekday_ok):
+            t = t.replace(hour=0, minute=0) + datetime.timedelta(days=1)
+            continue
+        if t.hour not in hours:
+            t = t.replace(minute=0) + datetime.timedelta(hours=1)
+            continue
+        if t.minute not in minutes:
+            t += datetime.timedelta(minutes=1)
+            continue
+        return t
+    raise ValueError("Cron expression never matches")
+
+
+class Job:
+    def __init__(self, scheduler, name, fn, args, kwargs, priority, jitter, overlap):
+        self.scheduler = scheduler
+        self.name = name
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.priority = priority
+        self.jitter = jitter
+        self.overlap = overlap
+        self.interval = None
+        self.cron = None
+        self.cron_last = None
+        self.cancelled = False
+        self.active = 0
+
+        # stats
+        self.runs = 0
+        self.errors = 0
+        self.skipped = 0
+        self.run_s = 0.0
+        self.max_run_s = 0.0
+        self.lag_s = 0.0
+        self.max_lag_s = 0.0
+
+    # next base due time on the monotonic clock, None when done
+    def next_due(self, due: float, now: float):
+        if self.interval is not None:
+            due += self.interval
+
+            # missed ticks are skipped, not run back to back
+            if due < now:
+                missed = int((now - due) // self.interval) + 1
+                self.skipped += missed
+                due += missed * self.interval
+            return due
+        if self.cron is not None:
+
+            # a timer firing early must not repeat the same minute
+            wall = datetime.datetime.now()
+            self.cron_last = cron_next(self.cron, max(wall, self.cron_last or wall))
+            return now + (self.cron_last - wall).total_seconds()
+        return None
+
+    def run(self, due: float):
+        started = time.monotonic()
+        try:
+            self.fn(*self.args, **self.kwargs)
+        except Exception as e:
+            helper.logger("Scheduler", f"Job {self.name} Failed: {e}")
+            return started - due, time.monotonic() - started, True
+        return started - due, time.monotonic() - started, False
+
+    # called with the ready lock held
+    def record(self, lag: float, elapsed: float, failed: bool):
+        self.active -= 1
+        self.errors += failed
+        self.runs += 1
+        self.run_s += elapsed
+        self.max_run_s = max(self.max_run_s, elapsed)
+        self.lag_s += lag
+        self.max_lag_s = max(self.max_lag_s, lag)
+
+    def cancel(self):
+        self.scheduler.cancel(self)
+
+    def stats(self) -> dict:
+        runs = max(self.runs, 1)
+        return {
+            "runs": self.runs,
+            "errors": self.errors,
+            "skipped": self.skipped,
+            "active": self.active,
+            "run_avg_s": self.run_s / runs,
+            "run_max_s": self.max_run_s,
+            "lag_avg_s": self.lag_s / runs,
+            "lag_max_s": self.max_lag_s,
+        }
+
+    def __repr__(self):
+        return f"<Job {self.name}>"
+
+
+class Scheduler:
+    def __init__(self, config: dict = None):
+        self.config = {**scheduler_defaults, **(config or {})}
+        self.jobs = {}
+        self.closed = False
+        self.sequence = 0
+
+        # timer heap (due, seq, job, base)
+        self.lock = threading.Lock()
+        self.timer_wakeup = threading.Condition(self.lock)
+        self.timers = []
+        self.timer_thread = None
+
+        # ready heap (priority, seq, job, due), lower priority runs first
+        self.ready_lock = threading.Lock()
+        self.work_ready = threading.Condition(self.ready_lock)
+        self.ready = []
+        self.full_logged = float("-inf")
+        self.workers = []
+        self.idle = 0
+
+    # jobs
+    def every(
+        self,
+        interval: float,
+        fn,
+        *args,
+        name: str = None,
+        priority: int = 0,
+        jitter: float = 0,
+        overlap: bool = False,
+        delay: float = None,
+        **kwargs,
+    ) -> Job:
+        if interval <= 0:
+            raise ValueError(f"Invalid interval: {interval}")
+        job = self.create(fn, args, kwargs, name, priority, jitter, overlap)
+        job.interval = interval
+        self.schedule(job, time.monotonic() + (interval if delay is None else delay))
+        return job
+
+    def cron(
+        self,
+        expression: str,
+        fn,
+        *args,
+        name: str = None,
+        priority: int = 0,
+        jitter: float = 0,
+        overlap: bool = False,
+        **kwargs,
+    ) -> Job:
+        cron = parse_cron(expression)
+        cron_next(cron, datetime.datetime.now())
+        job = self.create(fn, args, kwargs, name, priority, jitter, overlap)
+        job.cron = cron
+        self.schedule(job, job.next_due(0, time.monotonic()))
+        return job
+
+    def once(
+        self,
+        delay: float,
+        fn,
+        *args,
+        name: str = None,
+        priority: int = 0,
+        **kwargs,
+    ) -> Job:
+        job = self.create(fn, args, kwargs, name, priority, 0, True)
+        self.schedule(job, time.monotonic() + delay)
+        return job
+
+    def create(self, fn, args, kwargs, name, priority, jitter, overlap) -> Job:
+        if self.closed:
+            raise RuntimeError("Scheduler is shut down")
+        name = name or getattr(fn, "__qualname__", repr(fn))
+
+        # repeated names get a suffix
+        with self.lock:
+            base, count = name, 1
+            while name in self.jobs:
+                count += 1
+                name = f"{base}#{count}"
+            job = Job(self, name, fn, args, kwargs, priority, jitter, overlap)
+            self.jobs[name] = job
+        return job
+
+    def schedule(self, job: Job, base: float):
+        due = base + random.uniform(0, job.jitter) if job.jitter > 0 else base
+        with self.lock:
+            self.sequence += 1
+            heapq.heappush(self.timers, (due, self.sequence, job, base))
+            self.start()
+
+            # wake the timer if this job is now first
+            if self.timers[0][2] is job:
+                self.timer_wakeup.notify()
+
+    def cancel(self, job: Job):
+        with self.lock:
+            job.cancelled = True
+            self.jobs.pop(job.name, None)
+
+    # threads start with the first job
+    def start(self):
+        if self.timer_thread is not None:
+            return
+        self.timer_thread = threading.Thread(
+            target=self.run_timer, name="scheduler:timer", daemon=True
+        )
+        self.timer_thread.start()
+        atexit.register(self.shutdown)
+
+    def run_timer(self):
+        while not self.closed:
+            with self.lock:
+                if len(self.timers) == 0:
+                    self.timer_wakeup.wait()
+                    continue
+                now = time.monotonic()
+                if self.timers[0][0] > now:
+                    self.timer_wakeup.wait(self.timers[0][0] - now)
+                    continue
+
+                # due timers in bounded batches, the lock is released between
+                for _ in range(TIMER_BATCH):
+                    if len(self.timers) == 0 or self.timers[0][0] > now:
+                        break
+                    due, _, job, base = heapq.heappop(self.timers)
+                    if job.cancelled:
+                        continue
+                    self.dispatch(job, due)
+
+                    # next run, from the base time so jitter does not drift
+                    base = job.next_due(base, now)
+                    if base is None:
+                        self.jobs.pop(job.name, None)
+                        continue
+                    if job.jitter > 0:
+                        due = base + random.uniform(0, job.jitter)
+                    else:
+                        due = base
+                    self.sequence += 1
+                    heapq.heappush(self.timers, (due, self.sequence, job, base))
+
+    # called with the timer lock held
+    def dispatch(self, job: Job, due: float):
+        with self.ready_lock:
+
+            # no overlap, a due job still queued or running is skipped
+            if not job.overlap and job.active > 0:
+                job.skipped += 1
+                return
+
+            # a full queue skips jobs, logged at most every few seconds
+            if len(self.ready) >= self.config["queue_size"]:
+                job.skipped += 1
+                now = time.monotonic()
+                if now - self.full_logged >= FULL_LOG_INTERVAL:
+                    self.full_logged = now
+                    helper.logger("Scheduler", "Queue Full, Skipping Due Jobs")
+                return
+            job.active += 1
+            self.sequence += 1
+            heapq.heappush(self.ready, (job.priority, self.sequence, job, due))
+
+            # grow the pool up to its bound while nothing is idle
+            if self.idle == 0 and len(self.workers) < self.config["workers"]:
+                worker = threading.Thread(
+                    target=self.run_worker,
+                    name=f"scheduler:worker{len(self.workers)}",
+                    daemon=True,
+                )
+                self.workers.append(worker)
+                worker.start()
+            else:
+                self.work_ready.notify()
+
+    def run_worker(self):
+        while True:
+            with self.ready_lock:
+                while len(self.ready) == 0 and not self.closed:
+                    self.idle += 1
+                    self.work_ready.wait()
+                    self.idle -= 1
+                if self.closed:
+                    return
+                _, _, job, due = heapq.heappop(self.ready)
+            if job.cancelled:
+                with self.ready_lock:
+                    job.active -= 1
+                continue
+            result = job.run(due)
+            with self.ready_lock:
+                job.record(*result)
+
+    # stats
+    def stats(self, name: str = None) -> dict:
+        with self.lock, self.ready_lock:
+            names = list(self.jobs) if name is None else [name]
+            return {n: self.jobs[n].stats() for n in names if n in self.jobs}
+
+    def shutdown(self, wait: bool = True, timeout: float = None):
+        if timeout is None:
+            timeout = self.config["shutdown_timeout"]
+        with self.lock:
+            self.closed = True
+            for job in self.jobs.values():
+                job.cancelled = True
+            self.jobs = {}
+            self.timers = []
+            self.timer_wakeup.notify_all()
+        with self.ready_lock:
+            self.ready = []
+            self.work_ready.notify_all()
+
+        # running jobs finish, queued ones are dropped
+        if wait:
+            for worker in self.workers:
+                if worker is not threading.current_thread():
+                    worker.join(timeout)
+        atexit.unregister(self.shutdown)
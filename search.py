@@ -0,0 +1,99 @@
+import re
+import math
+
+# gram fields, see store
+FIELD_NAME = 0
+FIELD_TEXT = 1
+
+# name separators folded together
+name_separators = re.compile(r"[\s\-.]+")
+word_separators = re.compile(r"[^0-9a-z]+")
+
+
+def normalize(text: str) -> str:
+    return name_separators.sub("_", str(text).strip().lower())
+
+
+def trigrams(text: str) -> set:
+    padded = f" {text} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def text_trigrams(text: str) -> set:
+    grams = set()
+    for word in word_separators.split(str(text).lower()):
+        if word != "":
+            grams |= trigrams(word)
+    return grams
+
+
+def split_keyword(keyword: str):
+    provider = ""
+    if "@" in keyword:
+        keyword, provider = keyword.split("@", 1)
+    return normalize(keyword), provider.lower()
+
+
+def search(store, keyword: str, limit: int = None) -> list:
+    keyword, provider = split_keyword(keyword)
+
+    # short keywords have too few grams, scan names
+    name_hits = {}
+    text_hits = {}
+    q_grams = trigrams(keyword)
+    q_text_grams = text_trigrams(keyword)
+    if len(keyword) < 3:
+        candidates = store.scan_names(keyword)
+
+    # count gram hits
+    else:
+        for g in q_grams:
+            for i in store.postings(g, FIELD_NAME):
+                name_hits[i] = name_hits.get(i, 0) + 1
+        for g in q_text_grams:
+            for i in store.postings(g, FIELD_TEXT):
+                text_hits[i] = text_hits.get(i, 0) + 1
+
+        # only candidates able to pass a rule below are described and ranked
+        # a name containing the keyword has every gram away from the padding
+        inner = {keyword[i : i + 3] for i in range(len(keyword) - 2)}
+        need_name = min(math.ceil(len(q_grams) / 2), len(inner))
+        need_text = math.ceil(len(q_text_grams) * 0.75)
+        candidates = [i for i, hits in name_hits.items() if hits >= need_name] + [
+            i
+            for i, hits in text_hits.items()
+            if hits >= need_text and name_hits.get(i, 0) < need_name
+        ]
+
+    # rank candidates
+    ranked = []
+    for i, (key, name, m_provider) in store.describe(candidates).items():
+        if provider != "" and provider not in m_provider:
+            continue
+        name_score = name_hits.get(i, 0) / len(q_grams) if q_grams else 0
+        text_score = text_hits.get(i, 0) / len(q_text_grams) if q_text_grams else 0
+        if name == keyword:
+            bonus = 3
+        elif name.startswith(keyword):
+            bonus = 2
+        elif keyword in name:
+            bonus = 1
+        elif name_score >= 0.5 or text_score >= 0.75:
+            bonus = 0
+        else:
+            continue
+        ranked.append((-(bonus + name_score + text_score / 2), name, key))
+    ranked.sort()
+
+    result = [key for _, _, key in ranked]
+    return result if limit is None else result[:limit]
+
+
+# exact normalized name only, fuzzy matches are for --search
+def resolve(store, keyword: str) -> list:
+    name, provider = split_keyword(keyword)
+    return sorted(
+        key
+        for key, m_provider in store.named(name)
+        if provider == "" or provider in m_provider
+    )
@@ -0,0 +1,288 @@
+import os
+import json
+import sqlite3
+
+from . import helper
+from . import search
+
+# store files
+STORE_PATH = "./origin-cache.db"
+LEGACY_CACHE_PATH = "./origin-cache.json"
+
+# gram fields
+FIELD_NAME = search.FIELD_NAME
+FIELD_TEXT = search.FIELD_TEXT
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS origins (
+    url TEXT PRIMARY KEY,
+    name TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS modules (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    norm TEXT NOT NULL,
+    origin TEXT NOT NULL,
+    origin_url TEXT NOT NULL,
+    download TEXT NOT NULL,
+    info TEXT NOT NULL,
+    require TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS modules_origin_url ON modules (origin_url);
+CREATE INDEX IF NOT EXISTS modules_norm ON modules (norm);
+CREATE TABLE IF NOT EXISTS requires (
+    module_id INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    dependency TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS requires_module ON requires (module_id);
+CREATE TABLE IF NOT EXISTS grams (
+    gram TEXT NOT NULL,
+    field INTEGER NOT NULL,
+    module_id INTEGER NOT NULL,
+    PRIMARY KEY (gram, field, module_id)
+) WITHOUT ROWID;
+"""
+
+# require kinds
+require_kinds = ("dependencies", "option_dependencies", "pip_dependencies")
+
+
+class OriginStore:
+    def __init__(self, path: str = STORE_PATH):
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute("PRAGMA cache_size=-65536")
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    # lookups
+    def get(self, key: str):
+        row = self.db.execute(
+            "SELECT download, info, require FROM modules WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {
+            **json.loads(row[1]),
+            "download": row[0],
+            "require": json.loads(row[2]),
+        }
+
+    def keys(self):
+        return [row[0] for row in self.db.execute("SELECT key FROM modules")]
+
+    def origins(self):
+        return dict(self.db.execute("SELECT url, name FROM origins"))
+
+    def __len__(self):
+        return self.db.execute("SELECT COUNT(*) FROM modules").fetchone()[0]
+
+    # search support
+    def postings(self, gram: str, field: int):
+        return [
+            row[0]
+            for row in self.db.execute(
+                "SELECT module_id FROM grams WHERE gram = ? AND field = ?",
+                (gram, field),
+            )
+        ]
+
+    def scan_names(self, keyword: str):
+        return [
+            row[0]
+            for row in self.db.execute(
+                "SELECT id FROM modules WHERE instr(norm, ?) > 0", (keyword,)
+            )
+        ]
+
+    def named(self, norm: str):
+        return self.db.execute(
+            "SELECT key, lower(origin) FROM modules WHERE norm = ?", (norm,)
+        ).fetchall()
+
+    def describe(self, ids):
+        return {
+            row[0]: row[1:]
+            for row in self.db.execute(
+                "SELECT id, key, norm, lower(origin) FROM modules"
+                " WHERE id IN (SELECT value FROM json_each(?))",
+                (json.dumps(list(ids)),),
+            )
+        }
+
+    # updates
+    def sync_origin(self, url: str, name: str, modules: dict):
+        added, updated, removed = 0, 0, 0
+        with self.db:
+            self.db.execute(
+                "INSERT INTO origins (url, name) VALUES (?, ?)"
+                " ON CONFLICT (url) DO UPDATE SET name = excluded.name",
+                (url, name),
+            )
+            current = {
+                row[0]: row[1:]
+                for row in self.db.execute(
+                    "SELECT key, id, download, info, require FROM modules"
+                    " WHERE origin_url = ?",
+                    (url,),
+                )
+            }
+
+            # changed modules are replaced, ids continue after the largest
+            next_id = self.db.execute("SELECT MAX(id) FROM modules").fetchone()[0]
+            next_id = (next_id or 0) + 1
+            stale, rows, requires, postings = [], [], [], {}
+            for key, entry in modules.items():
+                row = self.encode(entry)
+                if key not in current:
+                    added += 1
+                elif current[key][1:] != row:
+                    stale.append(current[key][0])
+                    updated += 1
+                else:
+                    continue
+                self.add_module(next_id, key, url, row, rows, requires, postings)
+                next_id += 1
+
+            # vanished modules
+            for key, (module_id, *_) in current.items():
+                if key not in modules:
+                    stale.append(module_id)
+                    removed += 1
+            self.delete_modules(stale)
+
+            # bulk insert, grams in primary key order
+            self.db.executemany(
+                "INSERT INTO modules (id, key, norm, origin, origin_url, download,"
+                " info, require) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self.db.executemany(
+                "INSERT INTO requires (module_id, kind, dependency) VALUES (?, ?, ?)",
+                requires,
+            )
+            self.db.executemany(
+                "INSERT INTO grams (gram, field, module_id) VALUES (?, ?, ?)",
+                (
+                    (gram, field, module_id)
+                    for gram, field in sorted(postings)
+                    for module_id in postings[gram, field]
+                ),
+            )
+        return added, updated, removed
+
+    def remove_origins(self, keep_urls):
+        with self.db:
+            for url in self.origins():
+                if url in keep_urls:
+                    continue
+                self.delete_modules(
+                    [
+                        row[0]
+                        for row in self.db.execute(
+                            "SELECT id FROM modules WHERE origin_url = ?", (url,)
+                        )
+                    ]
+                )
+                self.db.execute("DELETE FROM origins WHERE url = ?", (url,))
+
+    @staticmethod
+    def encode(entry: dict):
+        info = {k: v for k, v in entry.items() if k not in ("download", "require")}
+        return (
+            entry["download"],
+            json.dumps(info, sort_keys=True, ensure_ascii=False),
+            json.dumps(entry["require"], sort_keys=True, ensure_ascii=False),
+        )
+
+    def add_module(
+        self, module_id: int, key: str, url: str, row: tuple, rows, requires, postings
+    ):
+        name, origin = key.split("@", 1)
+        norm = search.normalize(name)
+        rows.append((module_id, key, norm, origin, url, *row))
+
+        # requires
+        require = json.loads(row[2])
+        for kind in require_kinds:
+            requires += [(module_id, kind, dep) for dep in require.get(kind, [])]
+
+        # search grams, ids grow so postings stay sorted
+        for gram in module_grams(norm, row[1]):
+            postings.setdefault(gram, []).append(module_id)
+
+    # grams are found again from the module row, no index by module
+    def delete_modules(self, module_ids: list):
+        if len(module_ids) == 0:
+            return
+        ids = json.dumps(module_ids)
+        self.db.executemany(
+            "DELETE FROM grams WHERE gram = ? AND field = ? AND module_id = ?",
+            (
+                (gram, field, module_id)
+                for module_id, norm, info in self.db.execute(
+                    "SELECT id, norm, info FROM modules"
+                    " WHERE id IN (SELECT value FROM json_each(?))",
+                    (ids,),
+                ).fetchall()
+                for gram, field in module_grams(norm, info)
+            ),
+        )
+        self.db.execute(
+            "DELETE FROM requires WHERE module_id IN (SELECT value FROM json_each(?))",
+            (ids,),
+        )
+        self.db.execute(
+            "DELETE FROM modules WHERE id IN (SELECT value FROM json_each(?))", (ids,)
+        )
+
+    # migration
+    def import_cache(self, module_cache: dict):
+        by_origin = {}
+        for key, entry in module_cache.items():
+            name, origin = key.split("@", 1)
+            url = entry["download"]
+            suffix = f"/{name}/file.zip"
+            if url.endswith(suffix):
+                url = url[: -len(suffix)]
+            by_origin.setdefault((url, origin), {})[key] = entry
+        for (url, origin), modules in by_origin.items():
+            self.sync_origin(url, origin, modules)
+
+
+# (gram, field) of one module, info is the encoded json
+def module_grams(norm: str, info: str) -> list:
+    info = json.loads(info)
+    text = "{} {}".format(info.get("description", ""), info.get("author", ""))
+    return [(g, FIELD_NAME) for g in search.trigrams(norm)] + [
+        (g, FIELD_TEXT) for g in search.text_trigrams(text)
+    ]
+
+
+# shared store
+_store = None
+
+
+def no_store() -> bool:
+    return not os.path.isfile(STORE_PATH) and not os.path.isfile(LEGACY_CACHE_PATH)
+
+
+def open_store() -> OriginStore:
+    global _store
+    if _store is not None:
+        return _store
+
+    # migrate json cache
+    migrate = not os.path.isfile(STORE_PATH) and os.path.isfile(LEGACY_CACHE_PATH)
+    _store = OriginStore()
+    if migrate:
+        helper.logger("Store", f"Migrating {LEGACY_CACHE_PATH}...")
+        _store.import_cache(helper.json_load(helper.read_file(LEGACY_CACHE_PATH)))
+        os.replace(LEGACY_CACHE_PATH, f"{LEGACY_CACHE_PATH}.bak")
+        helper.logger("Store", f"Migrate Done, {len(_store)} Modules")
+    return _store
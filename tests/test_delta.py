@@ -0,0 +1,24 @@
+import os
+import sys
+import importlib
+import unittest
+
+# the package directory is imported by its own name, as the bench does
+package_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(package_dir))
+bench = importlib.import_module(f"{os.path.basename(package_dir)}.bench")
+
+
+class DeltaTest(unittest.TestCase):
+
+    # overwrite installs from a local origin update by delta, in fewer bytes
+    def test_overwrite_by_delta(self):
+        for result in bench.bench_delta(sizes=(500,)):
+            with self.subTest(command=result["command"]):
+                self.assertTrue(result["applied"])
+                self.assertTrue(result["by_delta"])
+                self.assertLess(result["fetched_bytes"], result["full_bytes"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,23 @@
+import os
+import sys
+import importlib
+import unittest
+
+# the package directory is imported by its own name, as the bench does
+package_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(package_dir))
+bench = importlib.import_module(f"{os.path.basename(package_dir)}.bench")
+
+
+class StartupTest(unittest.TestCase):
+
+    # total import time over a bare interpreter, and no heavy imports
+    def test_startup_budget(self):
+        for result in bench.bench_startup():
+            with self.subTest(command=result["command"]):
+                self.assertEqual(result["heavy_imports"], [])
+                self.assertLessEqual(result["import_ms"], result["budget_ms"])
+
+
+if __name__ == "__main__":
+    unittest.main()